@@ -19,11 +19,18 @@ handlers don't have to repeat work and can take advantage of a good API.
 #import hashlib
 #import hmac
 
+import functools
 from exceptions import NotImplementedError
 
 import tornado.web
+from tornado import stack_context
 #import logging
 
+from util import instrumentation
+from model.api import memo
+
+from constants import INSTRUMENTATION, SESSION_CACHE
+
 
 #logger = logging.getLogger('boilerplate.' + __name__)
 
@@ -46,6 +53,65 @@ class BaseHandler(tornado.web.RequestHandler):
         return None
 
 
+    def _execute(self, transforms, *args, **kwargs):
+        """ Execute this request with its RequestMetrics current.
+
+        The metrics stay current in every callback run on the request's
+        behalf, so asynchronous requests are measured as a whole.
+
+        """
+        self._metrics = instrumentation.RequestMetrics()
+        with stack_context.StackContext(functools.partial(
+                instrumentation.activate,
+                self._metrics)):
+            super(BaseHandler, self)._execute(transforms, *args, **kwargs)
+
+
+    def finish(self, chunk=None):
+        """ Finish this response, with Server-Timing if it's not too late.
+
+        Streamed responses have sent their headers already, so they are
+        only measured in aggregate.
+
+        """
+        if not self._headers_written:
+            self.set_header(
+                    INSTRUMENTATION.SERVER_TIMING_HEADER,
+                    instrumentation.server_timing(self._metrics))
+
+        super(BaseHandler, self).finish(chunk)
+
+
+    def on_finish(self):
+        """ Record this request's latency and forget the SqNode properties
+        memoized for it. """
+        instrumentation.REQUEST_SECONDS.observe(
+                (
+                        type(self).__name__,
+                        self.request.method,
+                        str(self.get_status())),
+                self._metrics.elapsed())
+        memo.clear()
+
+
+    def module_span(self, module):
+        """ Return a Span timing a UIModule rendered outside a template. """
+        return instrumentation.span(
+                INSTRUMENTATION.MODULE_SPAN.format(type(module).__name__))
+
+
+    def _ui_module(self, name, module):
+        """ Time each render of a UIModule in a template. """
+        render = super(BaseHandler, self)._ui_module(name, module)
+        span_name = INSTRUMENTATION.MODULE_SPAN.format(name)
+
+        def timed_render(*args, **kwargs):
+            with instrumentation.span(span_name):
+                return render(*args, **kwargs)
+
+        return timed_render
+
+
     def process_request(self):
         raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
 
@@ -81,9 +147,12 @@ class BaseHandler(tornado.web.RequestHandler):
         self.set_secure_cookie(type, tornado.escape.json_encode(cookie))
 
 
-    def get_decoded_secure_cookie(self, type):
+    def get_decoded_secure_cookie(
+            self,
+            type,
+            max_age_days=SESSION_CACHE.MAX_AGE_DAYS):
         """ Return a JSON-decoded secure cookie decrypted. """
-        cookie = self.get_secure_cookie(type)
+        cookie = self.get_secure_cookie(type, max_age_days=max_age_days)
         return tornado.escape.json_decode(cookie) if cookie else cookie
 
 
@@ -32,7 +32,7 @@ class CommentHandler(QueryHandler):
                 message)
         model.dispatch()
 
-        self.write({"is_success": model.success})
+        self.finish({"is_success": model.success})
 
 
     def process_synchronous_request(self):
@@ -50,8 +50,8 @@ class CommentHandler(QueryHandler):
         raise NotImplementedError("Unused Method: DO NOT CALL OR OVERRIDE!")
 
 
-    def get_asynchronous_content_url(self):
-        """ Generate a URL for handling asynchronous content requests. """
+    def get_asynchronous_module(self):
+        """ Return the UIModule class rendering asynchronous responses. """
         raise NotImplementedError("Unused Method: DO NOT CALL OR OVERRIDE!")
 
 
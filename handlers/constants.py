@@ -27,6 +27,39 @@ class _CookieType(object):
 COOKIE_TYPE = _CookieType()
 
 
+class _SessionCache(object):
+
+    """ _SessionCache class to describe the decoded Session cache. """
+
+    # most Sessions held before evicting the least recently used
+    @constant
+    def MAX_SIZE(self):
+        return 10000
+
+    # days a secure cookie is accepted for, as in get_secure_cookie
+    @constant
+    def MAX_AGE_DAYS(self):
+        return 31
+
+SESSION_CACHE = _SessionCache()
+
+
+class _Instrumentation(object):
+
+    """ _Instrumentation class to describe how requests are measured. """
+
+    @constant
+    def SERVER_TIMING_HEADER(self):
+        return "Server-Timing"
+
+    # span names for rendering a UIModule, by class name
+    @constant
+    def MODULE_SPAN(self):
+        return "module.{0}"
+
+INSTRUMENTATION = _Instrumentation()
+
+
 class _Cookie(object):
 
     """ _Cookie class to describe all Cookie Properties. """
@@ -103,6 +136,10 @@ class _Argument(object):
     def AUTH_STATE(self):
         return "state"
 
+    @constant
+    def BEFORE(self):
+        return "before"
+
 ARGUMENT = _Argument()
 
 
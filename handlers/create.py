@@ -42,7 +42,7 @@ class CreateGameHandler(QueryHandler):
         model.set_message(message)
         model.dispatch()
 
-        self.write({"is_success": model.success})
+        self.finish({"is_success": model.success})
 
 
     def process_synchronous_request(self):
@@ -60,8 +60,8 @@ class CreateGameHandler(QueryHandler):
         raise NotImplementedError("Unused Method: DO NOT CALL OR OVERRIDE!")
 
 
-    def get_asynchronous_content_url(self):
-        """ Generate a URL for handling asynchronous content requests. """
+    def get_asynchronous_module(self):
+        """ Return the UIModule class rendering asynchronous responses. """
         raise NotImplementedError("Unused Method: DO NOT CALL OR OVERRIDE!")
 
 
@@ -6,6 +6,8 @@ or else forward to the landing page.
 
 """
 
+import tornado.web
+
 from handlers.landing import LandingHandler
 from handlers.league import LeagueHandler
 
@@ -35,6 +37,7 @@ class HomeHandler(LeagueHandler, LandingHandler):
     """
 
     # NOT @tornado.web.authenticated because LandingHandler is not.
+    @tornado.web.asynchronous
     def get(self):
         """ Handle GET request for the Home page. """
 
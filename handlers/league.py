@@ -5,9 +5,14 @@ serving outgoing responses to League Highlights.
 
 """
 
-from util.dev import print_timing
+from tornado import gen
+
+from util.instrumentation import timed
 from model.app.league import LeagueModel
+from view.modules.dictionary import UILeagueDictionary
+from view.modules.page import UIStreamedLeaguePage
 
+from constants import ARGUMENT
 from query import QueryHandler
 
 
@@ -15,31 +20,103 @@ class LeagueHandler(QueryHandler):
 
     """ Handle a League request. """
 
-    @print_timing
+    # splits the streamed page template where the League streams in
+    STREAM_MARKER = "<!--sq-stream-->"
+
+
+    @timed("LeagueHandler.get_model")
     def get_model(self):
         """ Return a data model in response to a request for Games. """
+        model = self._construct_model()
+        model.load()
+        return model
+
+
+    @gen.engine
+    def get_model_async(self, callback):
+        """ Pass a data model to the callback without blocking the IOLoop. """
+        model = self._construct_model()
+        yield gen.Task(model.load_async)
+        callback(model)
+
+
+    def process_synchronous_request(self):
+        """ Handle a synchronous request, streaming it if enabled. """
+        if self.settings.get("stream_pages"):
+            self.process_streamed_request()
+        else:
+            super(LeagueHandler, self).process_synchronous_request()
+
+
+    @gen.engine
+    def process_streamed_request(self):
+        """ Stream a League page, flushing each piece as soon as it's ready.
+
+        The page up to the cover photo goes out before anything is loaded,
+        the TabHeader once the League is, and then the content with its
+        feed a few stories at a time.
+
+        """
+        page = UIStreamedLeaguePage(self)
+
+        (page_head, page_tail) = self._render_streamed_page(None)
+        self.write(page_head)
+        with self.module_span(page):
+            self.write(page.render_background())
+        self.flush()
+
+        model = self._construct_model()
+        yield gen.Task(model.load_context_async)
+        with self.module_span(page):
+            self.write(page.render_main_header(model))
+        self.flush()
+
+        yield gen.Task(model.load_objects_async)
+        with self.module_span(page):
+            for markup in page.render_content(model):
+                self.write(markup)
+                self.flush()
+
+        (page_head, page_tail) = self._render_streamed_page(model)
+        self.finish(page_tail)
+
+
+    def _render_streamed_page(self, model):
+        """ Return the streamed page template split around the League. """
+        page = self.render_string(
+                self.get_streamed_content_url(),
+                model=model,
+                marker=self.STREAM_MARKER)
+        return tuple(page.split(self.STREAM_MARKER, 1))
+
+
+    def _construct_model(self):
+        """ Return a LeagueModel for this request, ready to load. """
         model = LeagueModel(self.current_user)
         model.set_league_id(self._id)
-        model.load()
+        model.set_games_page(
+                LeagueModel.GAMES_PAGE_SIZE,
+                self.get_before_argument())
         return model
 
 
-    @print_timing
+    def get_before_argument(self):
+        """ Return the cursor of the Game to page back from, if any. """
+        return self.get_argument(ARGUMENT.BEFORE, None)
+
+
     def get_synchronous_content_url(self):
         """ Generate a URL for handling synchronous content requests. """
         # TODO: turn this hardcoded file path into a constant
         return "mobile/league.html"
 
 
-    @print_timing
-    def get_asynchronous_content_url(self):
-        """ Generate a URL for handling asynchronous content requests. """
+    def get_streamed_content_url(self):
+        """ Generate a URL for the page around a streamed League. """
         # TODO: turn this hardcoded file path into a constant
-        return "mobile/components/league.html"
+        return "mobile/league_stream.html"
 
 
-    @print_timing
-    def get_page_state_model_url(self):
-        """ Generate a URL for rendering a page state model. """
-        # TODO: turn this hardcoded file path into a constant
-        return "mobile/components/league_model.html"
+    def get_asynchronous_module(self):
+        """ Return the UIModule class rendering asynchronous responses. """
+        return UILeagueDictionary
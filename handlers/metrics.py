@@ -0,0 +1,24 @@
+""" Module: metrics
+
+Provide a handler exposing request instrumentation to Prometheus. It
+serves every aggregate util.instrumentation has collected since the
+process started, in Prometheus' text exposition format.
+
+"""
+
+from util import instrumentation
+
+from base import BaseHandler
+
+
+class MetricsHandler(BaseHandler):
+
+    """ Serve the process' metrics for Prometheus to scrape. """
+
+
+    def get(self):
+        """ Write every metric in Prometheus' text exposition format. """
+        self.set_header(
+                "Content-Type",
+                instrumentation.PROMETHEUS_CONTENT_TYPE)
+        self.write(instrumentation.render_prometheus())
@@ -8,12 +8,24 @@ import json
 from exceptions import NotImplementedError
 
 import tornado.web
+from tornado import gen
 
-from constants import COOKIE_TYPE, COOKIE, ARGUMENT
+from model.data.cache.lru import LruCache
+
+from constants import COOKIE_TYPE, COOKIE, ARGUMENT, SESSION_CACHE
 from base import BaseHandler
 from session import Session
 
 
+# seconds a signed session cookie is accepted for
+_SESSION_MAX_AGE = SESSION_CACHE.MAX_AGE_DAYS * 86400
+
+# decoded Sessions keyed on signed session cookie value. each one expires
+# when Tornado would stop accepting its cookie. cached Sessions are shared
+# by every request with the same cookie, so they must not be modified.
+_sessions = LruCache(SESSION_CACHE.MAX_SIZE, _SESSION_MAX_AGE)
+
+
 class QueryHandler(BaseHandler):
 
     """ Encapsulates all generic query functionality.
@@ -27,11 +39,19 @@ class QueryHandler(BaseHandler):
 
 
     def get_current_user(self):
-        """ Return current user from cookie or return None. """
-        session = None
+        """ Return current user from cookie or return None.
 
+        A session cookie seen before is served from the Session cache
+        instead of being verified and decoded again.
+
+        """
         # TODO: deal with the user deauthorizing the app
 
+        signed_value = self.get_cookie(COOKIE_TYPE.SESSION)
+        session = _sessions.get(signed_value)
+        if session is not None:
+            return session
+
         session_cookie = self.get_session_cookie()
 
         if session_cookie:
@@ -48,10 +68,15 @@ class QueryHandler(BaseHandler):
             session.set_locale(session_cookie.get(COOKIE.LOCALE))
             session.set_version(session_cookie.get(COOKIE.VERSION))
 
+            expiry = _get_session_expiry(signed_value)
+            if expiry is not None:
+                _sessions.set(signed_value, session, expiry)
+
         return session
 
 
     @tornado.web.authenticated
+    @tornado.web.asynchronous
     def get(self, id=None):
         """ Overload BaseHandler's HTTP GET responder for reads.
 
@@ -67,56 +92,46 @@ class QueryHandler(BaseHandler):
 
 
     @tornado.web.authenticated
+    @tornado.web.asynchronous
     def post(self):
         """ Overload BaseHandler's HTTP GET responder for reads. """
         self.process_request()
 
 
     def process_request(self):
-        """ Generic request processing for query handler subclasses. """
+        """ Generic request processing for query handler subclasses.
+
+        Requests are asynchronous as far as Tornado is concerned, so every
+        path through here must finish the request.
+
+        """
         if self.is_asynchronous_request():
             self.process_asynchronous_request()
         else:
             self.process_synchronous_request()
 
 
+    @gen.engine
     def process_asynchronous_request(self):
-        """ Handle an asynchronous query request. """
-        model = self.get_model()
-
-        content = self.render_string(
-                self.get_asynchronous_content_url(),
-                model=model)
+        """ Handle an asynchronous query request.
 
-        header = self.render_string(
-                self.get_tab_header_url(),
-                model=model)
+        Every fragment of the response is rendered by one UIModule from
+        a single pass over the model and written as one JSON payload.
 
-        context_model = self.render_string(
-                self.get_context_model_url(),
-                model=model)
-
-        session_model = self.render_string(
-                self.get_session_model_url(),
-                model=model)
-
-        page_state_model = self.render_string(
-                self.get_page_state_model_url(),
-                model=model)
+        """
+        model = yield gen.Task(self.get_model_async)
 
-        # TODO: make these constants!
-        self.write({
-                "content": content,
-                "header": header,
-                "context_model": context_model,
-                "session_model": session_model,
-                "page_state_model": page_state_model,
-                })
+        module = self.get_asynchronous_module()(self)
+        with self.module_span(module):
+            response = module.render(model)
+        self.finish(response)
 
 
+    @gen.engine
     def process_synchronous_request(self):
         """ Handle a synchronous query request. """
-        self.render(self.get_synchronous_content_url(), model=self.get_model())
+        model = yield gen.Task(self.get_model_async)
+        self.render(self.get_synchronous_content_url(), model=model)
 
 
     def get_model(self):
@@ -124,42 +139,31 @@ class QueryHandler(BaseHandler):
         raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
 
 
-    def get_synchronous_content_url(self):
-        """ Generate a URL for handling synchronous content requests. """
-        raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
-
-
-    def get_asynchronous_content_url(self):
-        """ Generate a URL for rendering content markup asynchronously. """
-        raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
-
-
-    def get_tab_header_url(self):
-        """ Generate a URL for rendering a tab header markup. """
-        # TODO: turn this hardcoded file path into a constant
-        return "mobile/components/tab_header.html"
+    def get_model_async(self, callback):
+        """ Pass the controller's model to the callback once it's loaded.
 
+        Fall back on the blocking get_model(). Subclasses whose models can
+        load without blocking the IOLoop should override this.
 
-    def get_context_model_url(self):
-        """ Generate a URL for rendering a context model. """
-        # TODO: turn this hardcoded file path into a constant
-        return "mobile/components/context_model.html"
+        """
+        callback(self.get_model())
 
 
-    def get_session_model_url(self):
-        """ Generate a URL for rendering a session model. """
-        # TODO: turn this hardcoded file path into a constant
-        return "mobile/components/session_model.html"
+    def get_synchronous_content_url(self):
+        """ Generate a URL for handling synchronous content requests. """
+        raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
 
 
-    def get_page_state_model_url(self):
-        """ Generate a URL for rendering a page state model. """
+    def get_asynchronous_module(self):
+        """ Return the UIModule class rendering asynchronous responses. """
         raise NotImplementedError("Abstract Method: SUBCLASS MUST OVERRIDE!")
 
 
     def get_session_cookie(self):
         """ Return a secure cookie modeling a session for a request. """
-        return self.get_decoded_secure_cookie(COOKIE_TYPE.SESSION)
+        return self.get_decoded_secure_cookie(
+                COOKIE_TYPE.SESSION,
+                SESSION_CACHE.MAX_AGE_DAYS)
 
 
     def get_asynchronous_argument(self):
@@ -184,3 +188,13 @@ class QueryHandler(BaseHandler):
             return json.loads(parameters)
         else:
             return {}
+
+
+def _get_session_expiry(signed_value):
+    """ Return when Tornado stops accepting a signed cookie, or None. """
+    try:
+        timestamp = int(signed_value.split("|")[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+    return timestamp + _SESSION_MAX_AGE
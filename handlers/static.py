@@ -0,0 +1,92 @@
+""" Module: static
+
+Serve static assets. Fingerprinted assets come from memory, compressed
+if the browser accepts it, with headers that let browsers cache them
+forever. Anything else is served by Tornado's StaticFileHandler.
+
+"""
+
+import datetime
+import os
+
+import tornado.web
+
+from util import assets
+
+
+# AssetStores keyed on media root
+_stores = {}
+
+# a year, which is as far-future as HTTP/1.1 caches are asked to honor
+CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class AssetHandler(tornado.web.StaticFileHandler):
+
+    """ Serve fingerprinted assets from memory and everything else from
+    disk.
+
+    Register this as the Application's static_handler_class.
+
+    """
+
+
+    @classmethod
+    def make_static_url(cls, settings, path):
+        """ Return the fingerprinted URL for a static asset. Tornado's
+        static_url() in handlers and templates calls this. """
+        return assets.static_url(path, settings["static_path"])
+
+
+    def get(self, path, include_body=True):
+        """ Serve a static asset.
+
+        Required:
+        str     path            asset path relative to the media root
+
+        Optional:
+        bool    include_body    False for HEAD requests
+
+        """
+        asset = self._get_store().get(path)
+        if asset is None:
+            return super(AssetHandler, self).get(path, include_body)
+
+        (content, encoding) = self._choose_encoding(asset)
+
+        self.set_header("Content-Type", asset.content_type)
+        self.set_header("Cache-Control", "public, max-age={0}".format(
+                CACHE_MAX_AGE))
+        self.set_header("Expires", datetime.datetime.utcnow() +
+                datetime.timedelta(seconds=CACHE_MAX_AGE))
+        self.set_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.set_header("Content-Encoding", encoding)
+
+        if include_body:
+            self.write(content)
+        else:
+            self.set_header("Content-Length", len(content))
+
+
+    def _get_store(self):
+        """ Return the AssetStore for this handler's media root. """
+        root = os.path.normpath(self.root)
+
+        store = _stores.get(root)
+        if store is None:
+            store = _stores.setdefault(root, assets.AssetStore(root))
+        return store
+
+
+    def _choose_encoding(self, asset):
+        """ Return the smallest (content, encoding) the browser accepts. """
+        accepted = self.request.headers.get("Accept-Encoding", "")
+
+        if asset.brotli_content is not None and "br" in accepted:
+            return (asset.brotli_content, "br")
+
+        if asset.gzip_content is not None and "gzip" in accepted:
+            return (asset.gzip_content, "gzip")
+
+        return (asset.content, None)
@@ -78,7 +78,9 @@ var constants = {
         LIST_WITH_HEADERS:      ".list-with-headers",
         FACEBOOK_LOGIN_ANCHOR:  ".facebook-login-anchor",
         OPPONENT_TAGS_GROUP:    ".opponent-tags-group",
-        COMMENT_FORM:           ".comment-form"
+        COMMENT_FORM:           ".comment-form",
+        STORY:                  ".story",
+        FEED_MORE:              ".feed-more"
     },
 
     /**
@@ -102,7 +104,8 @@ var constants = {
         SPORTS:                 "sports",
         PLAYER:                 "player",
         PAGE_TYPE:              "page-type",
-        PAGE_NAME:              "page-name"
+        PAGE_NAME:              "page-name",
+        BEFORE:                 "before"
     },
 
     /**
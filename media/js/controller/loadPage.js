@@ -35,7 +35,7 @@ var loadPageController = (function () {
     var that = Object.create(BaseController.controller);
 
     /**
-        Bind VIEW_PAGE, RELOAD_PAGE, and VIEWED_PAGE events.
+        Bind VIEW_PAGE, RELOAD_PAGE, READ_FEED_PAGE, and VIEWED_PAGE events.
     */
     that.initialize = function () {
         var events = {};
@@ -43,6 +43,7 @@ var loadPageController = (function () {
         events[Event.CLIENT.DISPLAY_DIALOG] = that.handleViewedDialog;
         events[Event.CLIENT.RELOAD_PAGE] = that.handleReloadPage;
         events[Event.CLIENT.VIEW_PAGE] = that.handleViewPage;
+        events[Event.CLIENT.READ_FEED_PAGE] = that.handleReadFeedPage;
         
         events[Event.SERVER.VIEWED_PAGE] = that.handleSuccess;
         
@@ -123,6 +124,15 @@ var loadPageController = (function () {
     that.handleReloadPage = function (href, pageStateModel) {
         that.handleSubmit(href, pageStateModel);
     };
+
+    /**
+        Request the page of the current tab's feed after a cursor.
+        @param {string} before The cursor to page back from.
+        @param {Object} pageStateModel The Page State to keep updated.
+    */
+    that.handleReadFeedPage = function (before, pageStateModel) {
+        Crud.readFeedPage(window.location.pathname, before, pageStateModel);
+    };
     
     return that;
 }());
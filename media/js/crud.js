@@ -52,7 +52,8 @@ var RESPONSE_KEY = {
     CONTENT:            "content",
     HEADER:             "header",
     CONTEXT_MODEL:      "context_model",
-    PAGE_STATE_MODEL:   "page_state_model"
+    PAGE_STATE_MODEL:   "page_state_model",
+    NEXT_CURSOR:        "next_cursor"
 };
 
 /**
@@ -100,9 +101,10 @@ function create(object_url, type, objParams, successFunction) {
     Read a url from the server.
     @param {string} url The url to fetch.
     @param {Function} successFunction The function to run on success.
+    @param {Object} params Optional query parameters to send along.
 */
-function read(url, successFunction) {
-    var requestData = {};
+function read(url, successFunction, params) {
+    var requestData = $.extend({}, params);
     requestData[REQUEST_KEY.ASYNCHRONOUS] = true;
 
     var start = new Date().getTime();
@@ -154,6 +156,22 @@ function readTab(tabURL, tabModel) {
     });
 }
 
+/**
+    Read the page of a tab's feed after a cursor and update the model.
+    @param {string} tabURL The tab's URL.
+    @param {string} before The cursor to page back from.
+    @param {Object} tabModel The pageStateModel for the tab.
+*/
+function readFeedPage(tabURL, before, tabModel) {
+    var params = {};
+    params[Const.DATA.BEFORE] = before;
+
+    read(tabURL, function (response) {
+        tabModel.setNextCursor(response[RESPONSE_KEY.NEXT_CURSOR]);
+        tabModel.setFeedPage(response[RESPONSE_KEY.CONTENT]);
+    }, params);
+}
+
 /**
     Update the PageState after a server response.
     @param {json} jsonResponse The JSON response from the server.
@@ -180,7 +198,8 @@ function updatePageState(jsonResponse, pageStateModel) {
 return {
     createGame: createGame,
     createComment: createComment,
-    readTab: readTab
+    readTab: readTab,
+    readFeedPage: readFeedPage
 };
 
 
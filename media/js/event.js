@@ -35,6 +35,7 @@ var event = {
         CREATE_COMMENT:         "client-create-comment",
         VIEW_PAGE:              "client-view-page",
         RELOAD_PAGE:            "client-reload-page",
+        READ_FEED_PAGE:         "client-read-feed-page",
         REQUEST_FACEBOOK_LOGIN: "client-request-facebook-login"
     },
     
@@ -21,6 +21,8 @@ define(
 
 var HEADER = "header";
 var CONTENT = "content";
+var FEED_PAGE = "feedPage";
+var NEXT_CURSOR = "nextCursor";
 
 /**
     Model to hold Page State and replacable html chunks.
@@ -77,6 +79,36 @@ var PageStateModel = Backbone.Model.extend({
         this.set(CONTENT, content);
     },
 
+    /**
+        Provide access to the content html of the feed's latest page.
+    */
+    feedPage: function () {
+        return this.get(FEED_PAGE);
+    },
+
+    /**
+        Provide mutator for the content html of the feed's latest page.
+        @param {string} feedPage
+    */
+    setFeedPage: function (feedPage) {
+        this.set(FEED_PAGE, feedPage);
+    },
+
+    /**
+        Provide access to the cursor for the feed's next page, if any.
+    */
+    nextCursor: function () {
+        return this.get(NEXT_CURSOR);
+    },
+
+    /**
+        Provide mutator for the cursor for the feed's next page.
+        @param {string} nextCursor null if the feed has no more pages
+    */
+    setNextCursor: function (nextCursor) {
+        this.set(NEXT_CURSOR, nextCursor);
+    },
+
     /**
         Provide access to the page's context ID.
     */
@@ -54,6 +54,7 @@ var MODEL_EVENT = {
     CHANGE_AGGREGATIONS: "change:" + "aggregations",
     CHANGE_OBJECTS: "change:" + "objects",
     CHANGE_CONTENT: "change:" + "content",
+    CHANGE_FEED_PAGE: "change:" + "feedPage",
     CHANGE_PAGE_NAME: "change:" + Const.DATA.PAGE_NAME
 };
 
@@ -175,6 +176,10 @@ var ContentView = Backbone.View.extend({
         this.sessionModel = sessionModel;
         this.pageStateModel = pageStateModel;
         this.pageStateModel.on(MODEL_EVENT.CHANGE_CONTENT, this.render, this);
+        this.pageStateModel.on(
+                MODEL_EVENT.CHANGE_FEED_PAGE,
+                this.appendFeedPage,
+                this);
 
         this.commentForms = this.$el.find(Const.CLASS.COMMENT_FORM);
         this.initializeSections(this.pageStateModel);
@@ -203,6 +208,7 @@ var ContentView = Backbone.View.extend({
         var commentFormSelector = Const.CLASS.COMMENT_FORM;
 
         _events["submit " + commentFormSelector] = "submit";
+        _events["click " + Const.CLASS.FEED_MORE] = "readFeedPage";
 
         return _events;
     },
@@ -226,6 +232,44 @@ var ContentView = Backbone.View.extend({
         return this;
     },
 
+    /**
+        Append the stories of the feed's latest page and point the more
+        link at the page after it, or remove it if there are no more.
+    */
+    appendFeedPage: function () {
+        var moreAnchor = this.$(Const.CLASS.FEED_MORE);
+        var nextCursor = this.pageStateModel.nextCursor();
+
+        $(this.pageStateModel.feedPage())
+            .find(Const.ID.FEED)
+            .children(Const.CLASS.STORY)
+            .insertBefore(moreAnchor);
+
+        if (nextCursor) {
+            moreAnchor
+                .data(Const.DATA.BEFORE, nextCursor)
+                .attr("href", "?" + Const.DATA.BEFORE + "=" +
+                        encodeURIComponent(nextCursor));
+        } else {
+            moreAnchor.remove();
+        }
+        this.scroller.refresh();
+
+        return this;
+    },
+
+    /**
+        Request the feed's next page instead of following the more link.
+        @param {Object} evt the event that triggered the click
+    */
+    readFeedPage: function (evt) {
+        EventDispatcher.trigger(
+            Event.CLIENT.READ_FEED_PAGE,
+            $(evt.currentTarget).data(Const.DATA.BEFORE),
+            this.pageStateModel);
+        return false;
+    },
+
     /**
         Submit comment form.
         @param {Object} evt the event that triggered submit
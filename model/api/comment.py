@@ -17,6 +17,8 @@ class Comment(SqEdge):
 
     """
 
+    __slots__ = ()
+
 
     @property
     def message(self):
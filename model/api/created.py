@@ -17,6 +17,8 @@ class Created(SqEdge):
 
     """
 
+    __slots__ = ()
+
     @property
     def message(self):
         """ Return the message of the created edge. """
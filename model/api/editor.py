@@ -38,26 +38,21 @@ def create_node_and_edges(prototype_node, prototype_edges):
     node = None
 
     try:
-        # create and store a new GraphNode
-        new_node = create_node(prototype_node)
-
-        # point to/from id in GraphEdges-to-be at the new GraphNode
-        for prototype_edge in prototype_edges:
-            prototype_edge.set_node_id(new_node.id())
-
         # TODO: raise an error when incomplete Edge prototypes [meaning, ones
         # missing a to/from node] are passed to create_edge(). this may already
         # be happening, but it certainly isn't a specific enough error.
 
-        # create and store new GraphEdges to/from the new GraphNode
-        new_edges = create_edges(prototype_edges)
-
-        # the new GraphNode should contain the new GraphEdges
-        new_node.set_edges(new_edges)
+        # create and store a new GraphNode and the GraphEdges to/from it in
+        # one write. a missing to/from id in a GraphEdge-to-be is filled in
+        # with the new GraphNode's id by the graph layer.
+        new_node = writer.create_node_and_edges(
+                prototype_node,
+                prototype_edges)
 
         # load the new GraphNode and GraphEdges into SqObjects
-        factory = sqfactory.get_factory()
-        node = factory.construct_node_and_edges(new_node)
+        if new_node is not None:
+            factory = sqfactory.get_factory()
+            node = factory.construct_node_and_edges(new_node)
 
     except GraphInputError as e:
         #logger.debug(e.reason)
@@ -4,15 +4,19 @@ TODO: fill this in with required methods to implement since required
 members aren't strictly members [they are pulled from properties].
 
 """
-from util.dev import print_timing
+from tornado import gen
+
+from util.instrumentation import timed
 from constants import API_NODE_TYPE, API_NODE_PROPERTY
 from constants import API_EDGE_TYPE, API_EDGE_PROPERTY
 from constants import API_CONSTANT
 from sports import SPORT
 
 from sqobject import SqNode
+from memo import memoized_property
 import loader
 import editor
+import standings
 
 
 
@@ -33,6 +37,9 @@ class Game(SqNode):
     dict    _opponents      store loaded Opponents by id
     dict    _commenters     store loaded Commenters by id
     Person  creator         store loaded Person
+    dict    _results_by_opponent_id     result edge types by Opponent id
+    dict    _opponent_ids_by_result     lists of Opponent ids by result
+    list    _rivalry_ids                competitive Opponent ids
 
     """
 
@@ -56,7 +63,7 @@ class Game(SqNode):
                 ]
 
 
-    @property
+    @memoized_property
     def comments(self):
         """ Return a list of comments on the Game, sorted with most recent
         comment last. """
@@ -67,6 +74,18 @@ class Game(SqNode):
         return comments
 
 
+    @memoized_property
+    def last_updated_ts(self):
+        """ Return when the Game or any of its comments last changed. """
+        last_updated_ts = max(self.created_ts, self.updated_ts)
+
+        comments = self.comments
+        if comments:
+            last_updated_ts = max(last_updated_ts, comments[-1].created_ts)
+
+        return last_updated_ts
+
+
     @property
     def creators_message(self):
         """ Return the creator's message. """
@@ -97,77 +116,97 @@ class Game(SqNode):
         return SPORT.ALL.get(self.sport_id)
 
 
-    @property
-    def results_by_opponent_id(self):
-        """ Return a dictionary of results keyed by opponent id. """
-        results = {}
+    def set_edges(self, edges):
+        """ Set a Game's outgoing SqEdges and index its results.
 
-        # Loop through each RESULT_EDGE_TYPE and get the result/opponent_id
-        for edge_type in API_CONSTANT.RESULT_EDGE_TYPES:
-            for edge in self.get_edges().get(edge_type, {}).values():
-                opponent_id = edge.to_node_id
-                results[opponent_id] = edge_type
+        Every result accessor reads from the index, so they're all O(1)
+        no matter how many times a Game is rendered.
 
-        return results
+        """
+        super(Game, self).set_edges(edges)
+        self._index_results()
 
 
-    @property
-    def opponent_ids_by_result(self):
-        """ Return a dictionary of opponents keyed by result. Each result
-        will have a list of opponents. """
+    def add_edge(self, edge):
+        """ Add an outgoing SqEdge and reindex results if it's one. """
+        super(Game, self).add_edge(edge)
+        if edge.type in API_CONSTANT.RESULT_EDGE_TYPES:
+            self._index_results()
+
+
+    def _index_results(self):
+        """ Index this Game's results by Opponent and Opponents by result. """
+        results = {}
         opponents = {}
 
         # Loop through each RESULT_EDGE_TYPE and get the result/opponent_id
         for edge_type in API_CONSTANT.RESULT_EDGE_TYPES:
-            edges = self.get_edges().get(edge_type)
-            if edges is not None:
+            edges_of_type = self.get_edges().get(edge_type)
+            if edges_of_type is not None:
                 opponents[edge_type] = []
-                for edge in edges.values():
+                for edge in edges_of_type.values():
                     opponent_id = edge.to_node_id
+                    results[opponent_id] = edge_type
                     opponents[edge_type].append(opponent_id)
 
-        return opponents
+        rivalry_ids = []
+        rivalry_ids.extend(opponents.get(API_EDGE_TYPE.WON_BY, []))
+        rivalry_ids.extend(opponents.get(API_EDGE_TYPE.LOST_BY, []))
+        rivalry_ids.extend(opponents.get(API_EDGE_TYPE.TIED_BY, []))
+
+        self._results_by_opponent_id = results
+        self._opponent_ids_by_result = opponents
+        self._rivalry_ids = rivalry_ids
+
+
+    @property
+    def results_by_opponent_id(self):
+        """ Return a dictionary of results keyed by opponent id. """
+        return self._results_by_opponent_id
+
+
+    @property
+    def opponent_ids_by_result(self):
+        """ Return a dictionary of opponents keyed by result. Each result
+        will have a list of opponents. """
+        return self._opponent_ids_by_result
 
 
     @property
     def winner_ids(self):
         """ Return a list of competitive Opponent IDs who won. """
-        return self.opponent_ids_by_result.get(API_EDGE_TYPE.WON_BY, [])
+        return self._opponent_ids_by_result.get(API_EDGE_TYPE.WON_BY, [])
 
 
     @property
     def loser_ids(self):
         """ Return a list of competitive Opponent IDs who lost. """
-        return self.opponent_ids_by_result.get(API_EDGE_TYPE.LOST_BY, [])
+        return self._opponent_ids_by_result.get(API_EDGE_TYPE.LOST_BY, [])
 
 
     @property
     def tier_ids(self):
         """ Return a list of competitive Opponent IDs who tied. """
-        return self.opponent_ids_by_result.get(API_EDGE_TYPE.TIED_BY, [])
+        return self._opponent_ids_by_result.get(API_EDGE_TYPE.TIED_BY, [])
 
 
     @property
     def rivalry_ids(self):
         """ Return a list of all competitive Opponent IDs for this Game. """
-        rivalry_ids = []
-        rivalry_ids.extend(self.winner_ids)
-        rivalry_ids.extend(self.loser_ids)
-        rivalry_ids.extend(self.tier_ids)
-        return rivalry_ids
+        return self._rivalry_ids
 
 
     @property
     def camaraderie_ids(self):
         """ Return a list of friendly Opponent IDs who played. """
-        return self.opponent_ids_by_result.get(API_EDGE_TYPE.PLAYED_BY, [])
+        return self._opponent_ids_by_result.get(API_EDGE_TYPE.PLAYED_BY, [])
 
 
     # TODO: maybe we should use competitive instead of rivalry
     @property
     def is_rivalry(self):
         """ Return whether this Game is competitive. """
-        return bool(self.rivalry_ids)
+        return bool(self._rivalry_ids)
 
 
     # TODO: maybe we should use friendly instead of camaraderie
@@ -263,6 +302,9 @@ class Game(SqNode):
         """ Load the Game's Opponents, Commenters, Creator and attributes into
         a Game.
 
+        The persons come without their SqEdges, which a Game never reads,
+        so the read doesn't grow with how many Games they've played.
+
         Required:
         int game_id     the id of the Game
 
@@ -270,52 +312,17 @@ class Game(SqNode):
         Game            Game SqNode
 
         """
-        # TODO: commenters should really be loaded in SqNode. This is a mess
-        # because load_neighbors returns a single list of neighbors and then we
-        # break that list up by type.
-
-        edge_types = []
-        edge_types.extend(API_CONSTANT.RESULT_EDGE_TYPES)
-        edge_types.append(API_EDGE_TYPE.HAS_COMMENT_FROM)
-        edge_types.append(API_EDGE_TYPE.CREATED_BY)
-
-        node_types = []
-        node_types.extend(API_CONSTANT.OPPONENT_NODE_TYPES)
-        # should include "PERSON_NODE_TYPES"
-
         (game, important_persons) = loader.load_neighbors(
                 game_id,
-                edge_types,
-                node_types)
-
-        # sort the folks into separate lists of opponents and commenters
-        opponent_ids = set(game.results_by_opponent_id.keys())
-        comments = game.get_edges().get(
-                API_EDGE_TYPE.HAS_COMMENT_FROM,
-                {})
-        commenter_ids = set(
-                [comment.to_node_id for comment in comments.values()])
-
-        opponents = {}
-        commenters = {}
-        creator = None
-        for person in important_persons.values():
-            id = person.id
-            if id in opponent_ids:
-                opponents[id] = person
-            if id in commenter_ids:
-                commenters[id] = person
-            if id == game.creator_id:
-                creator = person
-        game.set_opponents(opponents)
-        game.set_commenters(commenters)
-        game.set_creator(creator)
+                Game._important_person_edge_types(),
+                Game._important_person_node_types(),
+                neighbor_edges=False)
 
-        return game
+        return Game._set_important_persons(game, important_persons)
 
 
     @staticmethod
-    @print_timing
+    @timed("Game.multiload_opponents")
     def multiload_opponents(game_ids):
         """ Load multiple Games' Opponents and attributes into a dict.
 
@@ -329,17 +336,28 @@ class Game(SqNode):
 
         games = {}
 
-        for id in game_ids:
-            games[id] = Game.load_opponents(id)
+        neighbors_by_id = loader.multiload_neighbors(
+                game_ids,
+                API_CONSTANT.RESULT_EDGE_TYPES,
+                API_CONSTANT.OPPONENT_NODE_TYPES)
+
+        for id, (game, opponents) in neighbors_by_id.items():
+            if game is not None:
+                game.set_opponents(opponents)
+                games[id] = game
 
         return games
 
 
     @staticmethod
-    @print_timing
+    @timed("Game.multiload_important_persons")
     def multiload_important_persons(game_ids):
         """ Load multiple Games' Opponents, Commenters, Creator and attributes.
 
+        Read every Game's path in a single batched call, so the number of
+        database requests doesn't grow with the number of Games. Like
+        load_important_persons(), the persons come without their SqEdges.
+
         Required:
         list game_ids   the ids of the Games
 
@@ -348,14 +366,121 @@ class Game(SqNode):
 
         """
 
+        neighbors_by_id = loader.multiload_neighbors(
+                game_ids,
+                Game._important_person_edge_types(),
+                Game._important_person_node_types(),
+                neighbor_edges=False)
+
+        return Game._set_important_persons_by_id(neighbors_by_id)
+
+
+    @staticmethod
+    @gen.engine
+    def multiload_important_persons_async(game_ids, callback):
+        """ Load multiple Games' important persons without blocking.
+
+        Behave like multiload_important_persons(), but pass the Games to
+        the callback instead of blocking the IOLoop on the database.
+
+        Required:
+        list game_ids   the ids of the Games
+        func callback   called with Game SqNodes keyed on id
+
+        """
+        neighbors_by_id = yield gen.Task(
+                loader.multiload_neighbors_async,
+                game_ids,
+                Game._important_person_edge_types(),
+                Game._important_person_node_types(),
+                neighbor_edges=False)
+
+        callback(Game._set_important_persons_by_id(neighbors_by_id))
+
+
+    @staticmethod
+    def _important_person_edge_types():
+        """ Return a list of SqEdge types leading to important persons. """
+        edge_types = []
+        edge_types.extend(API_CONSTANT.RESULT_EDGE_TYPES)
+        edge_types.append(API_EDGE_TYPE.HAS_COMMENT_FROM)
+        edge_types.append(API_EDGE_TYPE.CREATED_BY)
+        return edge_types
+
+
+    @staticmethod
+    def _important_person_node_types():
+        """ Return a list of SqNode types that are important persons. """
+        node_types = []
+        node_types.extend(API_CONSTANT.OPPONENT_NODE_TYPES)
+        # should include "PERSON_NODE_TYPES"
+        return node_types
+
+
+    @staticmethod
+    def _set_important_persons_by_id(neighbors_by_id):
+        """ Sort loaded important persons into Games keyed on id.
+
+        Required:
+        dict    neighbors_by_id     (Game, dict) tuples keyed on id
+
+        Return:
+        dict                        Game SqNodes keyed on id
+
+        """
         games = {}
 
-        for id in game_ids:
-            games[id] = Game.load_important_persons(id)
+        for id, (game, important_persons) in neighbors_by_id.items():
+            if game is not None:
+                games[id] = Game._set_important_persons(
+                        game,
+                        important_persons)
 
         return games
 
 
+    @staticmethod
+    def _set_important_persons(game, important_persons):
+        """ Sort loaded important persons into a Game and return it.
+
+        Required:
+        Game    game                the Game at the start of the path
+        dict    important_persons   neighbor SqNodes keyed on id
+
+        Return:
+        Game                        Game SqNode
+
+        """
+        # TODO: commenters should really be loaded in SqNode. This is a mess
+        # because load_neighbors returns a single list of neighbors and then we
+        # break that list up by type.
+
+        # sort the folks into separate lists of opponents and commenters
+        opponent_ids = set(game.results_by_opponent_id.keys())
+        comments = game.get_edges().get(
+                API_EDGE_TYPE.HAS_COMMENT_FROM,
+                {})
+        commenter_ids = set(
+                [comment.to_node_id for comment in comments.values()])
+
+        opponents = {}
+        commenters = {}
+        creator = None
+        for person in important_persons.values():
+            id = person.id
+            if id in opponent_ids:
+                opponents[id] = person
+            if id in commenter_ids:
+                commenters[id] = person
+            if id == game.creator_id:
+                creator = person
+        game.set_opponents(opponents)
+        game.set_commenters(commenters)
+        game.set_creator(creator)
+
+        return game
+
+
     @staticmethod
     def create_game(
             league_id,
@@ -372,10 +497,21 @@ class Game(SqNode):
         dict    metrics_by_opponent Metrics keyed on Opponent id
         id      sport_id            Sport id for this Game
 
+        Ids may be given as numeric strings, as forms and JSON keys send
+        them. They're read as ints, so results are recorded against the
+        same League and Opponent ids as the Standings loaded from the graph.
+
         Return:
         Game                        newly created Game
 
+        Raises:
+        ValueError                  an id isn't a number
+
         """
+        league_id = int(league_id)
+        creator_id = int(creator_id)
+        metrics_by_opponent = dict((int(opponent_id), metrics)
+                for (opponent_id, metrics) in metrics_by_opponent.items())
 
         # FIXME: how do we handle None properties?
         if message is None:
@@ -415,4 +551,16 @@ class Game(SqNode):
                         {},
                         opponent_id))
 
-        return editor.create_node_and_edges(prototype_node, prototype_edges)
+        game = editor.create_node_and_edges(prototype_node, prototype_edges)
+
+        # keep the League's standings current without recounting them
+        if game is not None:
+            for opponent_id, metrics in metrics_by_opponent.items():
+                for metric in metrics:
+                    standings.record_result(
+                            league_id,
+                            game.id,
+                            opponent_id,
+                            metric.result)
+
+        return game
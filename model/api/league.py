@@ -4,7 +4,9 @@ TODO: fill this in with required methods to implement since required
 members aren't strictly members [they are pulled from properties].
 
 """
-from util.dev import print_timing
+from tornado import gen
+
+from util.instrumentation import timed
 from constants import API_NODE_TYPE, API_EDGE_TYPE
 from constants import API_NODE_PROPERTY, API_CONSTANT
 
@@ -92,13 +94,26 @@ class League(sqobject.SqNode):
 
 
     @staticmethod
-    @print_timing
-    def load_opponents(league_id):
-        """ Return a League with Opponents loaded from the data layer."""
+    @timed("League.load_opponents")
+    def load_opponents(league_id, with_edges=True):
+        """ Return a League with Opponents loaded from the data layer.
+
+        Required:
+        id      league_id   the id of the League
+
+        Optional:
+        bool    with_edges  whether to load the Opponents' SqEdges, which
+                            their stats are counted from
+
+        Return:
+        League              League with its Opponents
+
+        """
         (league, opponents) = loader.load_neighbors(
                 league_id,
                 [API_EDGE_TYPE.HAS_LEAGUE_MEMBER],
-                API_CONSTANT.OPPONENT_NODE_TYPES)
+                API_CONSTANT.OPPONENT_NODE_TYPES,
+                neighbor_edges=with_edges)
 
         league.set_opponents(opponents)
 
@@ -106,19 +121,70 @@ class League(sqobject.SqNode):
 
 
     @staticmethod
-    @print_timing
-    def load_games(league_id):
-        """ Return a League with opponents loaded from the data layer."""
+    @timed("League.load_games")
+    def load_games(league_id, page_size=None, before=None):
+        """ Return a League with Games loaded from the data layer.
+
+        Required:
+        id      league_id   the id of the League
+
+        Optional:
+        int     page_size   most Games to load, newest first (None=all)
+        str     before      opaque cursor of the Game to page back from
+
+        Return:
+        League              League with a page of Games
+
+        """
         (league, games) = loader.load_neighbors(
                 league_id,
                 [API_EDGE_TYPE.HAS_SCHEDULED],
-                [API_NODE_TYPE.GAME])
+                [API_NODE_TYPE.GAME],
+                page_size,
+                before)
 
         league.set_games(games)
 
         return league
 
 
+    @staticmethod
+    @gen.engine
+    def load_opponents_async(league_id, with_edges=True, callback=None):
+        """ Load a League with Opponents and pass it to the callback. """
+        (league, opponents) = yield gen.Task(
+                loader.load_neighbors_async,
+                league_id,
+                [API_EDGE_TYPE.HAS_LEAGUE_MEMBER],
+                API_CONSTANT.OPPONENT_NODE_TYPES,
+                neighbor_edges=with_edges)
+
+        league.set_opponents(opponents)
+
+        callback(league)
+
+
+    @staticmethod
+    @gen.engine
+    def load_games_async(
+            league_id,
+            page_size=None,
+            before=None,
+            callback=None):
+        """ Load a League with a page of Games and pass it to the callback. """
+        (league, games) = yield gen.Task(
+                loader.load_neighbors_async,
+                league_id,
+                [API_EDGE_TYPE.HAS_SCHEDULED],
+                [API_NODE_TYPE.GAME],
+                page_size,
+                before)
+
+        league.set_games(games)
+
+        callback(league)
+
+
     @staticmethod
     def create_league(name, creator_id, opponent_ids=[]):
         """ Create and return a League.
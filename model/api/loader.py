@@ -9,12 +9,23 @@ Provides:
     def load_edge
     def load_edges
     def load_neighbors
+    def multiload_neighbors
+    def load_node_async
+    def load_neighbors_async
+    def multiload_neighbors_async
+    def encode_cursor
+    def decode_cursor
 
 """
+import base64
+import binascii
+
+from tornado import gen
 
 from model.graph import GraphOutputError
 from model.graph import reader
 
+from exceptions import InputError
 import sqfactory
 
 # TODO make this a Singleton object and create a reference to SqFactory
@@ -186,15 +197,29 @@ def load_edges(node_id):
 def load_neighbors(
         node_id,
         edge_type_pruner=None,
-        node_type_return_filter=None):
+        node_type_return_filter=None,
+        page_size=None,
+        before=None,
+        neighbor_edges=True):
     """ Load a SqNode and its specified SqEdges and neighbor SqNodes.
 
+    Given a page size, load only the newest page of neighbors older than
+    the before cursor, and only the SqEdges leading to them. Page back by
+    passing the encode_cursor() of the oldest neighbor on this page.
+
+    Without neighbor_edges, neighbors are loaded with no SqEdges at all and
+    the start SqNode only with its SqEdges of the traversed types, for
+    callers which never read the rest.
+
     Required:
     id      node_id                 SqNode id
 
     Optional:
     list    edge_type_pruner        list of SqEdge types to traverse
     list    node_type_return_filter list of SqNode types to return
+    int     page_size               most neighbors to load
+    str     before                  opaque cursor to page back from
+    bool    neighbor_edges          whether to load neighbors' SqEdges
 
     Returns:
     tuple                           (SqNode, dict) => (start, neighbors)
@@ -209,20 +234,263 @@ def load_neighbors(
         graph_path = reader.get_path_to_neighbor_nodes(
                 node_id,
                 edge_type_pruner,
-                node_type_return_filter)
+                node_type_return_filter,
+                page_size,
+                decode_cursor(before),
+                neighbor_edges)
 
         # load nodes and edges into SqNodes and SqEdges
-        factory = sqfactory.get_factory()
-        node = factory.construct_node_and_edges(graph_path.get_start_node())
+        (node, neighbor_nodes) = _construct_neighbors(graph_path)
 
-        neighbor_nodes = {}
-        for id, graph_node in graph_path.get_neighbor_nodes().items():
-            neighbor_nodes[id] = factory.construct_node_and_edges(graph_node)
-
-    except GraphOutputError as e:
+    except (GraphOutputError, InputError) as e:
         #logger.debug(e.reason)
         print e.reason
 
     # TODO: this only works for depth-1 queries because of graph fan-out, so
     # we need something different for queries of depth-2 and up.
     return (node, neighbor_nodes)
+
+
+def multiload_neighbors(
+        node_ids,
+        edge_type_pruner=None,
+        node_type_return_filter=None,
+        neighbor_edges=True):
+    """ Load many SqNodes and their specified SqEdges and neighbor SqNodes.
+
+    Behave like load_neighbors() for each id, but read every path from the
+    graph in a single batched call.
+
+    Required:
+    list    node_ids                SqNode ids
+
+    Optional:
+    list    edge_type_pruner        list of SqEdge types to traverse
+    list    node_type_return_filter list of SqNode types to return
+    bool    neighbor_edges          whether to load neighbors' SqEdges
+
+    Returns:
+    dict                            (SqNode, dict) tuples keyed on id
+
+    """
+
+    neighbors_by_id = {}
+
+    try:
+        # get nodes, outgoing edges, neighbor nodes for all ids at once
+        graph_paths = reader.multiget_path_to_neighbor_nodes(
+                node_ids,
+                edge_type_pruner,
+                node_type_return_filter,
+                neighbor_edges)
+
+        # load nodes and edges into SqNodes and SqEdges
+        neighbors_by_id = _construct_neighbors_by_id(graph_paths)
+
+    except GraphOutputError as e:
+        #logger.debug(e.reason)
+        print e.reason
+
+    return neighbors_by_id
+
+
+@gen.engine
+def load_node_async(node_id, callback):
+    """ Load a SqNode without blocking and pass it to the callback.
+
+    Behave like load_node(), but don't block the IOLoop on the database.
+
+    Required:
+    id      node_id     id of node to fetch
+    func    callback    called with a concrete SqNode subclass (or None)
+
+    """
+
+    node = None
+
+    try:
+        graph_node = yield gen.Task(reader.get_node_async, node_id)
+
+        if graph_node:
+            factory = sqfactory.get_factory()
+            node = factory.construct_node_and_edges(graph_node)
+
+    except GraphOutputError as e:
+        #logger.debug(e.reason)
+        print e.reason
+
+    callback(node)
+
+
+@gen.engine
+def load_neighbors_async(
+        node_id,
+        edge_type_pruner=None,
+        node_type_return_filter=None,
+        page_size=None,
+        before=None,
+        neighbor_edges=True,
+        callback=None):
+    """ Load a SqNode and its neighbors and pass them to the callback.
+
+    Behave like load_neighbors(), but don't block the IOLoop on the
+    database.
+
+    Required:
+    id      node_id                 SqNode id
+    func    callback                called with (SqNode, dict)
+
+    Optional:
+    list    edge_type_pruner        list of SqEdge types to traverse
+    list    node_type_return_filter list of SqNode types to return
+    int     page_size               most neighbors to load
+    str     before                  opaque cursor to page back from
+    bool    neighbor_edges          whether to load neighbors' SqEdges
+
+    """
+
+    node = None
+    neighbor_nodes = None
+
+    try:
+        # get node, outgoing edges, neighbor nodes
+        graph_path = yield gen.Task(
+                reader.get_path_to_neighbor_nodes_async,
+                node_id,
+                edge_type_pruner,
+                node_type_return_filter,
+                page_size,
+                decode_cursor(before),
+                neighbor_edges)
+
+        # load nodes and edges into SqNodes and SqEdges
+        (node, neighbor_nodes) = _construct_neighbors(graph_path)
+
+    except (GraphOutputError, InputError) as e:
+        #logger.debug(e.reason)
+        print e.reason
+
+    callback((node, neighbor_nodes))
+
+
+@gen.engine
+def multiload_neighbors_async(
+        node_ids,
+        edge_type_pruner=None,
+        node_type_return_filter=None,
+        neighbor_edges=True,
+        callback=None):
+    """ Load many SqNodes and their neighbors and pass them to the callback.
+
+    Behave like multiload_neighbors(), but don't block the IOLoop on the
+    database.
+
+    Required:
+    list    node_ids                SqNode ids
+    func    callback                called with (SqNode, dict) tuples by id
+
+    Optional:
+    list    edge_type_pruner        list of SqEdge types to traverse
+    list    node_type_return_filter list of SqNode types to return
+    bool    neighbor_edges          whether to load neighbors' SqEdges
+
+    """
+
+    neighbors_by_id = {}
+
+    try:
+        # get nodes, outgoing edges, neighbor nodes for all ids at once
+        graph_paths = yield gen.Task(
+                reader.multiget_path_to_neighbor_nodes_async,
+                node_ids,
+                edge_type_pruner,
+                node_type_return_filter,
+                neighbor_edges)
+
+        # load nodes and edges into SqNodes and SqEdges
+        neighbors_by_id = _construct_neighbors_by_id(graph_paths)
+
+    except GraphOutputError as e:
+        #logger.debug(e.reason)
+        print e.reason
+
+    callback(neighbors_by_id)
+
+
+def encode_cursor(node):
+    """ Return an opaque cursor to page back from a SqNode.
+
+    Required:
+    SqNode  node    the oldest SqNode on a page
+
+    Return:
+    str             cursor for loading the next (older) page
+
+    """
+    return base64.urlsafe_b64encode(
+            "{0}:{1}".format(node.created_ts, node.id))
+
+
+def decode_cursor(cursor):
+    """ Return the (created_ts, id) pair behind an opaque cursor.
+
+    Required:
+    str     cursor  cursor from encode_cursor(), or None
+
+    Return:
+    tuple           (created_ts, id) or None for no cursor
+
+    Raises:
+    InputError      the cursor wasn't made by encode_cursor()
+
+    """
+    if cursor is None:
+        return None
+
+    try:
+        (created_ts, id) = base64.urlsafe_b64decode(str(cursor)).split(":")
+        return (int(created_ts), int(id))
+
+    except (TypeError, ValueError, binascii.Error, UnicodeEncodeError):
+        raise InputError("cursor", cursor)
+
+
+def _construct_neighbors(graph_path):
+    """ Construct a start SqNode and its neighbor SqNodes from a GraphPath.
+
+    Required:
+    GraphPath   graph_path  depth-1 path from a start node
+
+    Returns:
+    tuple                   (SqNode, dict) => (start, neighbors)
+
+    """
+    factory = sqfactory.get_factory()
+    node = factory.construct_node_and_edges(graph_path.get_start_node())
+
+    neighbor_nodes = {}
+    for id, graph_node in graph_path.get_neighbor_nodes().items():
+        neighbor_nodes[id] = factory.construct_node_and_edges(graph_node)
+
+    return (node, neighbor_nodes)
+
+
+def _construct_neighbors_by_id(graph_paths):
+    """ Construct (start, neighbors) tuples from GraphPaths keyed on id.
+
+    Required:
+    dict    graph_paths     GraphPaths (or None) keyed on start node id
+
+    Returns:
+    dict                    (SqNode, dict) tuples keyed on start node id
+
+    """
+    neighbors_by_id = {}
+
+    for node_id, graph_path in graph_paths.items():
+        if graph_path is None:
+            neighbors_by_id[node_id] = (None, None)
+        else:
+            neighbors_by_id[node_id] = _construct_neighbors(graph_path)
+
+    return neighbors_by_id
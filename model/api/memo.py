@@ -0,0 +1,66 @@
+""" Module: memo
+
+Memoize properties which SqNodes compute from their edges so that each
+one is computed once per request, however many UI modules ask for it.
+
+A memoized value lives on its SqNode until the SqNode's edges are set
+again or until clear() is called at the end of the request. SqNodes
+which outlive a request, like the Opponents held by League standings,
+therefore never serve a value computed for a previous request.
+
+Values are shared by every caller, so callers must copy them before
+modifying them.
+
+Provides:
+    def memoized_property
+    def forget
+    def clear
+
+"""
+import functools
+import weakref
+
+
+# SqNodes holding memoized values. weak so that clear() is the only thing
+# which needs to know about every SqNode a request loaded.
+_memoized_nodes = weakref.WeakSet()
+
+
+def memoized_property(compute):
+    """ Decorate a SqNode method as a property memoized for the request.
+
+    Required:
+    func    compute     compute the property's value from a SqNode
+
+    Return:
+    property            read-only property computing the value just once
+
+    """
+    name = compute.__name__
+
+    @functools.wraps(compute)
+    def get(node):
+        memo = node.__dict__.get("_memo")
+        if memo is None:
+            memo = node._memo = {}
+            _memoized_nodes.add(node)
+
+        try:
+            return memo[name]
+        except KeyError:
+            value = memo[name] = compute(node)
+            return value
+
+    return property(get)
+
+
+def forget(node):
+    """ Forget every value memoized for a SqNode. """
+    node.__dict__.pop("_memo", None)
+
+
+def clear():
+    """ Forget every memoized value. Call at the end of each request. """
+    for node in list(_memoized_nodes):
+        forget(node)
+    _memoized_nodes.clear()
@@ -85,3 +85,10 @@ class Opponent(object):
         """ Return the larger of win streak or result streak. """
         raise NotImplementedError(
                 "Interface Method: IMPLEMENTOR MUST OVERRIDE")
+
+
+    @property
+    def current_streaks(self):
+        """ Return a tuple of the win, loss and result streaks. """
+        raise NotImplementedError(
+                "Interface Method: IMPLEMENTOR MUST OVERRIDE")
@@ -8,7 +8,9 @@ TODO: fill this in with required methods to implement since required
 members aren't strictly members [they are pulled from properties].
 
 """
-from util.dev import print_timing
+from tornado import gen
+
+from util.instrumentation import timed
 from model.constants import NODE_PROPERTY, THIRD_PARTY
 
 from constants import API_NODE_TYPE, API_NODE_PROPERTY, API_EDGE_TYPE
@@ -130,19 +132,41 @@ class Person(sqobject.SqNode):
 
 
     @staticmethod
-    @print_timing
+    @timed("Person.load_leagues")
     def load_leagues(person_id):
-        """ Return a Person with Leagues data loaded. """
+        """ Return a Person with Leagues data loaded.
+
+        The Leagues come without their SqEdges, which grow with every Game
+        scheduled in them and are never read from here.
+
+        """
         (person, leagues) = loader.load_neighbors(
                 person_id,
                 [API_EDGE_TYPE.IN_LEAGUE],
-                [API_NODE_TYPE.LEAGUE])
+                [API_NODE_TYPE.LEAGUE],
+                neighbor_edges=False)
 
         person.set_leagues(leagues)
 
         return person
 
 
+    @staticmethod
+    @gen.engine
+    def load_leagues_async(person_id, callback):
+        """ Load a Person with Leagues data and pass it to the callback. """
+        (person, leagues) = yield gen.Task(
+                loader.load_neighbors_async,
+                person_id,
+                [API_EDGE_TYPE.IN_LEAGUE],
+                [API_NODE_TYPE.LEAGUE],
+                neighbor_edges=False)
+
+        person.set_leagues(leagues)
+
+        callback(person)
+
+
     @staticmethod
     def join_league(person_id, league_id, tagger_id=None):
         """ Add a Person to a League.
@@ -7,6 +7,7 @@ members aren't strictly members [they are pulled from properties].
 
 from constants import API_NODE_TYPE, API_EDGE_TYPE, API_NODE_PROPERTY
 
+from memo import memoized_property
 import person
 import opponent
 import editor
@@ -55,13 +56,13 @@ class Player(person.Person, opponent.Opponent):
         return comments_posted
 
 
-    @property
+    @memoized_property
     def loss_count(self):
         """ Return the number of Games this Player has lost. """
         return self._compute_count([API_EDGE_TYPE.LOST])
 
 
-    @property
+    @memoized_property
     def win_count(self):
         """ Return the number of Games this Player has won. """
         return self._compute_count([API_EDGE_TYPE.WON])
@@ -83,28 +84,30 @@ class Player(person.Person, opponent.Opponent):
                 [API_EDGE_TYPE.WON, API_EDGE_TYPE.LOST])
 
 
+    @memoized_property
+    def current_streaks(self):
+        """ Return the win, loss and result streaks looking back from now. """
+        return self._compute_current_streaks(
+                [API_EDGE_TYPE.WON],
+                [API_EDGE_TYPE.LOST])
+
+
     @property
     def current_loss_streak(self):
         """ Return a streak for LOST edges looking back from now. """
-        return self._compute_current_streak(
-                [API_EDGE_TYPE.LOST],
-                [API_EDGE_TYPE.WON, API_EDGE_TYPE.LOST])
+        return self.current_streaks[1]
 
 
     @property
     def current_win_streak(self):
         """ Return a streak for WON edges looking back from now. """
-        return self._compute_current_streak(
-                [API_EDGE_TYPE.WON],
-                [API_EDGE_TYPE.WON, API_EDGE_TYPE.LOST])
+        return self.current_streaks[0]
 
 
     @property
     def current_result_streak(self):
         """ Return the larger of current_win_streak or current_loss_streak. """
-        win_streak = self.current_win_streak
-        loss_streak = self.current_loss_streak
-        return max((win_streak, -loss_streak), key=lambda x: abs(x))
+        return self.current_streaks[2]
 
 
     @staticmethod
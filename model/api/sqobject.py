@@ -13,13 +13,13 @@ Exception
 """
 
 from __future__ import division
-from copy import deepcopy
 
 from model.constants import NODE_PROPERTY, EDGE_PROPERTY
 from model.constants import PROPERTY_KEY, PROPERTY_VALUE, THIRD_PARTY
 
 from constants import API_CONSTANT, API_NODE_PROPERTY
 from stat_computer import StatComputer
+import memo
 
 
 class SqObject(object):
@@ -36,8 +36,20 @@ class SqObject(object):
     int     _created_ts     Time that SqObject was created.
     int     _updated_ts     Time that SqObject was updated.
 
+    SqObject is slotted so that SqEdges, of which a league page loads
+    thousands, don't each carry an instance __dict__. SqNode subclasses
+    keep a __dict__ for their lazily loaded members.
+
     """
 
+    __slots__ = (
+            "_id",
+            "_type",
+            "_properties",
+            "_created_ts",
+            "_updated_ts",
+            )
+
 
     def __init__(self, graph_object):
         """ Construct a SqObject extending the __new__ python object. """
@@ -46,6 +58,8 @@ class SqObject(object):
 
         # intentionally not exposed as a property or even as a method since
         # most of the helpers defined by subclasses are access wrappers.
+        # the dict is shared with the GraphObject, which owns a private
+        # copy, so it must be copied before it's ever written to.
         self._properties = graph_object.properties()
 
         # TODO: this is only needed because SqNode doesn't subclass from
@@ -103,7 +117,8 @@ class SqNode(SqObject, StatComputer):
     metrics.
 
     Optional:
-    dict    _edges       this SqNode's outgoing SqEdges keyed on id
+    dict    _edges          this SqNode's outgoing SqEdges keyed on id
+    dict    _edges_by_time  lists of SqEdges keyed on type, oldest first
 
     """
 
@@ -174,10 +189,43 @@ class SqNode(SqObject, StatComputer):
         return [edge.to_node_id for id, edge in edges.items()]
 
 
+    def get_edges_by_time(self, edge_type):
+        """ Return a list of SqEdges of a given type, oldest first. """
+        return self._edges_by_time.get(edge_type, [])
+
+
     def set_edges(self, edges):
-        """ Set a member variable with a dict of outgoing SqEdges. """
+        """ Set a member variable with a dict of outgoing SqEdges, and
+        index each type of SqEdge by time. """
         self._edges = edges
 
+        self._edges_by_time = {}
+        for edge_type, edges_of_type in self.get_edges().items():
+            self._edges_by_time[edge_type] = sorted(
+                    edges_of_type.values(),
+                    key=lambda x: x.created_ts)
+
+        # anything memoized was computed from the old edges
+        memo.forget(self)
+
+
+    def add_edge(self, edge):
+        """ Add an outgoing SqEdge without reindexing the others.
+
+        New SqEdges are almost always the newest of their type, so they
+        are usually appended to the time index as is.
+
+        """
+        self.get_edges().setdefault(edge.type, {})[edge.id] = edge
+
+        edges_by_time = self._edges_by_time.setdefault(edge.type, [])
+        edges_by_time.append(edge)
+        if len(edges_by_time) > 1 and \
+                edges_by_time[-2].created_ts > edge.created_ts:
+            edges_by_time.sort(key=lambda x: x.created_ts)
+
+        memo.forget(self)
+
 
     def _get_property(
             self,
@@ -283,13 +331,8 @@ class SqNode(SqObject, StatComputer):
         list    all_edge_types      a list of all edge types
 
         """
-        edges = []
-        for edge_type in all_edge_types:
-            edges.extend(self.get_edges().get(edge_type, {}).values())
-        edges.sort(key=lambda x: x.created_ts, reverse=True)
-
         streak = 0
-        for e in edges:
+        for e in self._iterate_newest_first(all_edge_types):
             if e.type in streak_conditions:
                 streak += 1
             else:
@@ -297,6 +340,68 @@ class SqNode(SqObject, StatComputer):
         return streak
 
 
+    def _compute_current_streaks(self, win_edge_types, loss_edge_types):
+        """ Return the current win, loss and result streaks in one pass.
+
+        Only the edges in the current streak and the one which ended it
+        are visited.
+
+        Required:
+        list    win_edge_types      a list of edge types that are wins
+        list    loss_edge_types     a list of edge types that are losses
+
+        Return:
+        tuple   (win streak, loss streak, result streak), where the result
+                streak is the win streak, or the loss streak as a negative
+
+        """
+        all_edge_types = []
+        all_edge_types.extend(win_edge_types)
+        all_edge_types.extend(loss_edge_types)
+
+        streak = 0
+        streak_is_win = None
+        for e in self._iterate_newest_first(all_edge_types):
+            is_win = e.type in win_edge_types
+            if streak_is_win is None:
+                streak_is_win = is_win
+            elif is_win != streak_is_win:
+                break
+            streak += 1
+
+        if streak_is_win:
+            return (streak, 0, streak)
+        else:
+            return (0, streak, -streak)
+
+
+    def _iterate_newest_first(self, edge_types):
+        """ Yield the SqEdges of some types, newest first.
+
+        Merge the time index for each type. SqEdges created at the same
+        time are yielded in the order their types were listed.
+
+        """
+        edge_lists = [self.get_edges_by_time(t) for t in edge_types]
+        positions = [len(edges) for edges in edge_lists]
+
+        while True:
+            newest = None
+            newest_ts = None
+            for i, edges in enumerate(edge_lists):
+                if positions[i] > 0:
+                    ts = edges[positions[i] - 1].created_ts
+                    if newest is None or ts > newest_ts:
+                        newest = i
+                        newest_ts = ts
+
+            if newest is None:
+                return
+
+            positions[newest] -= 1
+            yield edge_lists[newest][positions[newest]]
+
+
     @staticmethod
     def assert_loaded(loaded_data):
         """ If data is not loaded, raise an error. """
@@ -555,6 +660,8 @@ class SqEdge(SqObject):
 
     """
 
+    __slots__ = ("_from_node_id", "_to_node_id")
+
 
     def __init__(self, graph_edge):
         """ Construct a SqEdge extending SqObject. """
@@ -565,9 +672,6 @@ class SqEdge(SqObject):
         #self._is_one_way = graph_edge.is_one_way()
         #self._is_unique = graph_edge.is_unique()
 
-        # FIXME remove whenSqEdges are fully implemented
-        self._properties = deepcopy(graph_edge.properties())
-
         # TODO: move as much error checking from reader/writer into here as
         # possible to avoid repetitive code and to grant class hierarchy
         # appropriate knowledge and power over itself.
@@ -0,0 +1,312 @@
+""" Module: standings
+
+Keep every League's standings in memory so that ranking a League doesn't
+have to count and sort each Opponent's result edges on every request.
+
+A League's standings are seeded from its loaded Opponents' result edges
+the first time they are asked for and are then kept current by recording
+the results of each Game as it is created. Recording a result is O(1).
+
+Standings are kept per process, so another process may create a Game we
+never hear about. Each League's standings remember the newest Game they
+were seeded with and the Games recorded since. When the standings are
+read along with the League's newest Games, every Game newer than the one
+they were seeded with must have been recorded, or the standings are
+reseeded. Otherwise reading them is O(Opponents + newest Games) and no
+result edges are counted, so the Opponents needn't even be loaded with
+their edges.
+
+Provides:
+    class Standing
+    def get_standings
+    def record_result
+    def clear
+
+"""
+from __future__ import division
+import threading
+
+from constants import API_EDGE_TYPE
+
+
+# Standing records keyed on League id and then on Opponent id.
+_standings = {}
+
+# id of the newest Game each League's standings were seeded with, keyed
+# on League id. None if the League had no Games, _UNKNOWN if not known.
+_newest_game_ids = {}
+
+# ids of the Games recorded since each League's standings were seeded,
+# keyed on League id
+_recorded_game_ids = {}
+
+# the newest Game a League's standings were seeded with wasn't known
+_UNKNOWN = object()
+
+# guard for the standings store
+_lock = threading.Lock()
+
+
+class Standing(object):
+
+    """ Standing is an Opponent's record in a League.
+
+    Expose the same stats as the Opponent interface, so a Standing can be
+    rendered wherever its Opponent would be. Anything else is read from
+    the wrapped Opponent.
+
+    Variables:
+    Opponent    _opponent   the Opponent this Standing is for
+    int         _win_count  number of Games won
+    int         _loss_count number of Games lost
+    int         _streak     current streak: positive wins, negative losses
+
+    """
+
+
+    def __init__(self, opponent, win_count=0, loss_count=0, streak=0):
+        """ Construct a Standing for an Opponent.
+
+        Required:
+        Opponent    opponent    the Opponent this Standing is for
+
+        Optional:
+        int         win_count   number of Games won
+        int         loss_count  number of Games lost
+        int         streak      positive win streak or negative loss streak
+
+        """
+        self._opponent = opponent
+        self._win_count = win_count
+        self._loss_count = loss_count
+        self._streak = streak
+
+
+    def __getattr__(self, name):
+        """ Read anything that isn't a stat from the Opponent. """
+        return getattr(self._opponent, name)
+
+
+    @property
+    def opponent(self):
+        """ Return the Opponent this Standing is for. """
+        return self._opponent
+
+
+    @property
+    def win_count(self):
+        """ Return an int representing this opponent's win count. """
+        return self._win_count
+
+
+    @property
+    def loss_count(self):
+        """ Return an int representing this opponent's loss count. """
+        return self._loss_count
+
+
+    @property
+    def win_percentage(self):
+        """ Return a float representing this opponent's win percentage. """
+        games_count = self._win_count + self._loss_count
+        if games_count == 0:
+            return 0
+        return self._win_count / games_count
+
+
+    @property
+    def loss_percentage(self):
+        """ Return a float representing this opponent's loss percentage. """
+        games_count = self._win_count + self._loss_count
+        if games_count == 0:
+            return 0
+        return self._loss_count / games_count
+
+
+    @property
+    def current_win_streak(self):
+        """ Return an int representing this opponent's win streak. """
+        return max(self._streak, 0)
+
+
+    @property
+    def current_loss_streak(self):
+        """ Return an int representing this opponent's loss streak. """
+        return max(-self._streak, 0)
+
+
+    @property
+    def current_result_streak(self):
+        """ Return the win streak, or the loss streak as a negative. """
+        return self._streak
+
+
+    @property
+    def current_streaks(self):
+        """ Return a tuple of the win, loss and result streaks. """
+        return (
+                self.current_win_streak,
+                self.current_loss_streak,
+                self._streak)
+
+
+    def record_result(self, result):
+        """ Count a Game result, given as the Opponent's result edge type. """
+        if result == API_EDGE_TYPE.WON:
+            self._win_count += 1
+            self._streak = self._streak + 1 if self._streak > 0 else 1
+
+        elif result == API_EDGE_TYPE.LOST:
+            self._loss_count += 1
+            self._streak = self._streak - 1 if self._streak < 0 else -1
+
+        # ties and friendly games don't count toward standings or streaks.
+
+
+    def set_opponent(self, opponent):
+        """ Point this Standing at a more recently loaded Opponent. """
+        self._opponent = opponent
+
+
+    @staticmethod
+    def from_opponent(opponent):
+        """ Return a new Standing computed from an Opponent's edges. """
+        return Standing(
+                opponent,
+                opponent.win_count,
+                opponent.loss_count,
+                opponent.current_result_streak)
+
+
+def get_standings(league_id, opponents, newest_game_ids=None, can_seed=True):
+    """ Return a League's standings, best record first.
+
+    If any of the League's newest Games weren't counted, every Standing is
+    reseeded from its Opponent's loaded edges. So is any Opponent we have
+    no Standing for yet. Everyone else costs a dict lookup.
+
+    Opponents loaded without their edges can't seed anything. Given them,
+    pass can_seed=False, and None is returned whenever a Standing would
+    need seeding, so the caller can load the Opponents' edges and ask
+    again.
+
+    Required:
+    id      league_id       the League these standings are for
+    list    opponents       the League's loaded Opponents
+
+    Optional:
+    list    newest_game_ids ids of the League's newest Games, newest first,
+                            or None if they weren't loaded
+    bool    can_seed        whether the Opponents were loaded with edges
+
+    Return:
+    list                Standings sorted by win count, most first, or None
+                        if they need seeding and can_seed is False
+
+    """
+    with _lock:
+        league_standings = _standings.get(league_id)
+        is_current = league_standings is not None and _is_current(
+                league_id,
+                newest_game_ids)
+
+        if not can_seed and not (is_current and all(
+                o.id in league_standings for o in opponents)):
+            return None
+
+        if not is_current:
+            league_standings = _standings[league_id] = {}
+            _recorded_game_ids[league_id] = set()
+            if newest_game_ids is None:
+                _newest_game_ids[league_id] = _UNKNOWN
+            elif newest_game_ids:
+                _newest_game_ids[league_id] = newest_game_ids[0]
+            else:
+                _newest_game_ids[league_id] = None
+
+        standings = []
+        for opponent in opponents:
+            standing = league_standings.get(opponent.id)
+
+            if standing is None:
+                standing = Standing.from_opponent(opponent)
+                league_standings[opponent.id] = standing
+            else:
+                standing.set_opponent(opponent)
+
+            standings.append(standing)
+
+    standings.sort(key=lambda x: x.win_count, reverse=True)
+
+    return standings
+
+
+def record_result(league_id, game_id, opponent_id, result):
+    """ Count a new Game result toward an Opponent's League Standing.
+
+    Opponents whose League standings haven't been seeded yet are skipped;
+    they will be seeded from the database, new result included, when
+    they are first asked for.
+
+    Required:
+    id      league_id   the League the Game was played in
+    id      game_id     the Game the result is from
+    id      opponent_id the Opponent the result is for
+    str     result      the Opponent's result edge type, e.g. WON
+
+    """
+    with _lock:
+        league_standings = _standings.get(league_id)
+        if league_standings is None:
+            return
+
+        _recorded_game_ids[league_id].add(game_id)
+
+        standing = league_standings.get(opponent_id)
+        if standing is not None:
+            standing.record_result(result)
+
+
+def clear(league_id=None):
+    """ Forget one League's standings, or every League's by default. """
+    with _lock:
+        if league_id is None:
+            _standings.clear()
+            _newest_game_ids.clear()
+            _recorded_game_ids.clear()
+        else:
+            _standings.pop(league_id, None)
+            _newest_game_ids.pop(league_id, None)
+            _recorded_game_ids.pop(league_id, None)
+
+
+def _is_current(league_id, newest_game_ids):
+    """ Return whether a League's standings counted its newest Games.
+
+    Walk the newest Games back to the one the standings were seeded with.
+    Each Game on the way must have been recorded. Once they have, the
+    standings count as seeded with the newest Game, which keeps the set
+    of recorded Games small. Call with the lock held.
+
+    """
+    if newest_game_ids is None:
+        # nothing to check against; trust what's been recorded
+        return True
+
+    newest_game_id = _newest_game_ids[league_id]
+    recorded_game_ids = _recorded_game_ids[league_id]
+
+    if not newest_game_ids:
+        return newest_game_id is None
+
+    for game_id in newest_game_ids:
+        if game_id == newest_game_id:
+            _newest_game_ids[league_id] = newest_game_ids[0]
+            recorded_game_ids.difference_update(newest_game_ids)
+            return True
+
+        if game_id not in recorded_game_ids:
+            return False
+
+    # the Game seeded with is older than any loaded, so some weren't seen
+    return False
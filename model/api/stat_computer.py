@@ -22,6 +22,8 @@ class StatComputer(object):
 
     """
 
+    __slots__ = ()
+
 
     def __init__(self):
         """ This constructor should never be called. Raise an error. """
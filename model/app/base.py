@@ -56,6 +56,7 @@ class ReadModel(BaseModel):
     dict    _aggregations   aggregated stats describing context
     list    _objects        discrete units describing context
     list    _rivals         list of Opponents (id, name)
+    dict    _rivals_by_id   rivals keyed on id, built when first needed
     list    _sports         list of Sports
 
     """
@@ -74,6 +75,7 @@ class ReadModel(BaseModel):
         self._aggregations = None
         self._objects = None
         self._rivals = None
+        self._rivals_by_id = None
         self._sports = None
 
 
@@ -112,6 +114,13 @@ class ReadModel(BaseModel):
         return self._sports
 
 
+    def get_rival(self, rival_id):
+        """ Return a rival by its id, or None. """
+        if self._rivals_by_id is None:
+            self._rivals_by_id = {r.id: r for r in self._rivals}
+        return self._rivals_by_id.get(rival_id)
+
+
 class WriteModel(BaseModel):
 
     """ Write data to a model and return success.
@@ -8,7 +8,7 @@ Using facebook-sdk (https://github.com/pythonforfacebook/facebook-sdk)
 
 """
 
-from util.dev import print_timing
+from util.instrumentation import timed
 
 from model.api.comment import Comment
 
@@ -42,7 +42,7 @@ class CommentsModel(ReadModel):
         self._comments = {}
 
 
-    @print_timing
+    @timed("CommentsModel.load")
     def load(self):
         """ Load comments for games. """
         # TODO: Reading comments without a larger context is not supported.
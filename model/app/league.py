@@ -6,12 +6,17 @@ context.
 
 """
 
-from util.dev import print_timing
+from tornado import gen
+
+from util.instrumentation import timed
 
 from model.api.sports import SPORT
 from model.api.person import Person
 from model.api.game import Game
 from model.api.league import League
+from model.api.exceptions import InputError
+from model.api import loader
+from model.api import standings
 
 from base import ReadModel
 
@@ -20,24 +25,34 @@ class LeagueModel(ReadModel):
 
     """ Load and prepare data for the View to render a League.
 
+    Games are loaded a page at a time, newest first, so the cost of a
+    request doesn't grow with a League's history.
+
     Variables:
     id  _league_id      optional league_id to request.
+    int _page_size      most Games to load
+    str _before         opaque cursor of the Game to page back from
 
     """
 
+    # number of Games on a page of a League's feed
+    GAMES_PAGE_SIZE = 20
+
 
     def __init__(self, session):
         """ Construct a ReadModel. """
         super(LeagueModel, self).__init__(session)
 
         self._league_id = None
+        self._page_size = LeagueModel.GAMES_PAGE_SIZE
+        self._before = None
         self._aggregations = {
                 "standings": None,
                 "activity": None,
                 }
 
 
-    @print_timing
+    @timed("LeagueModel.load")
     def load(self):
         """ Populate context, aggregations, objects, and opponents. """
 
@@ -47,26 +62,22 @@ class LeagueModel(ReadModel):
         # shouldn't be tricky to avoid manually loading opponents.
 
         person = Person.load_leagues(self.session.person_id)
-
-        league = None
-        if self._league_id is None:
-            # if no league was requested than get the first league
-            league = person.get_leagues().values()[0]
-        else:
-            league = person.get_leagues().get(self._league_id)
-        # TODO: if league is None than throw some 'request invalid league
-        # error'
+        league = self._select_league(person)
 
         # TODO: we don't need to load Games from League when they can be loaded
         # from Opponents [or the vice-versa] all at the same time. we should
         # never be calling set_opponents() and set_games() outside the api.
 
-        # RANKINGS LOAD
-        opponents_list = League.load_opponents(league.id).get_opponents()
-        league.set_opponents({o.id: o for o in opponents_list})
+        # RANKINGS LOAD (Opponents' edges are only read to seed standings)
+        opponents_list = League.load_opponents(
+                league.id,
+                with_edges=False).get_opponents()
 
         # GAMES LOAD (WITH OPPONENTS AND COMMENTERS)
-        games_list = League.load_games(league.id).get_games()
+        games_list = League.load_games(
+                league.id,
+                self._page_size,
+                self._before).get_games()
 
         # TODO: iterating through this list is only temporary becaue the
         # multiload should have happened in the api.
@@ -75,27 +86,177 @@ class LeagueModel(ReadModel):
         # load opponents and commenters and creator for each game {g_id: Game}
         games_dict = Game.multiload_important_persons(game_ids)
 
+        newest_game_ids = self._newest_game_ids(games_dict)
+        league_standings = standings.get_standings(
+                league.id,
+                opponents_list,
+                newest_game_ids,
+                can_seed=False)
+
+        # standings which need seeding are counted from Opponents' edges
+        if league_standings is None:
+            opponents_list = League.load_opponents(league.id).get_opponents()
+            league_standings = standings.get_standings(
+                    league.id,
+                    opponents_list,
+                    newest_game_ids)
+
+        self._populate(league, opponents_list, games_dict, league_standings)
+
+
+    @gen.engine
+    def load_async(self, callback):
+        """ Populate the model without blocking and pass it to the callback.
+
+        Load the same data as load(), but wait on the database through the
+        IOLoop so other requests can be served in the meantime.
+
+        Required:
+        func    callback    called with this LeagueModel once it's loaded
+
+        """
+        yield gen.Task(self.load_context_async)
+        yield gen.Task(self.load_objects_async)
+        callback(self)
+
+
+    @gen.engine
+    def load_context_async(self, callback):
+        """ Load just the League context without blocking.
+
+        This lets a view render what only depends on the League before
+        its Opponents and Games are loaded by load_objects_async().
+
+        Required:
+        func    callback    called with this LeagueModel once it's loaded
+
+        """
+        person = yield gen.Task(
+                Person.load_leagues_async,
+                self.session.person_id)
+        self._context = self._select_league(person)
+
+        callback(self)
+
+
+    @gen.engine
+    def load_objects_async(self, callback):
+        """ Populate the rest of the model once its context is loaded.
+
+        Opponents and Games only depend on the League, so request them
+        together.
+
+        Required:
+        func    callback    called with this LeagueModel once it's loaded
+
+        """
+        league = self._context
+
+        # RANKINGS AND GAMES LOAD (Opponents' edges are only read to seed
+        # standings)
+        (opponents_league, games_league) = yield [
+                gen.Task(
+                        League.load_opponents_async,
+                        league.id,
+                        with_edges=False),
+                gen.Task(
+                        League.load_games_async,
+                        league.id,
+                        self._page_size,
+                        self._before),
+                ]
+        opponents_list = opponents_league.get_opponents()
+        game_ids = [g.id for g in games_league.get_games()]
+
+        # load opponents and commenters and creator for each game {g_id: Game}
+        games_dict = yield gen.Task(
+                Game.multiload_important_persons_async,
+                game_ids)
+
+        newest_game_ids = self._newest_game_ids(games_dict)
+        league_standings = standings.get_standings(
+                league.id,
+                opponents_list,
+                newest_game_ids,
+                can_seed=False)
+
+        # standings which need seeding are counted from Opponents' edges
+        if league_standings is None:
+            opponents_league = yield gen.Task(
+                    League.load_opponents_async,
+                    league.id)
+            opponents_list = opponents_league.get_opponents()
+            league_standings = standings.get_standings(
+                    league.id,
+                    opponents_list,
+                    newest_game_ids)
+
+        self._populate(league, opponents_list, games_dict, league_standings)
+
+        callback(self)
+
+
+    def _select_league(self, person):
+        """ Return the requested League from a Person's Leagues. """
+        league = None
+        if self._league_id is None:
+            # if no league was requested than get the first league
+            league = person.get_leagues().values()[0]
+        else:
+            league = person.get_leagues().get(self._league_id)
+        # TODO: if league is None than throw some 'request invalid league
+        # error'
+
+        return league
+
+
+    def _newest_game_ids(self, games_dict):
+        """ Return the League's newest Game ids, newest first, or None.
+
+        Only the first page has the League's newest Games, which tell the
+        standings whether they missed any.
+
+        """
+        if self._before is not None:
+            return None
+
+        games = sorted(
+                games_dict.values(),
+                key=lambda x: (x.created_ts, x.id),
+                reverse=True)
+        return [g.id for g in games]
+
+
+    def _populate(self, league, opponents_list, games_dict, league_standings):
+        """ Populate context, aggregations, objects, and opponents.
+
+        Required:
+        League  league              League context for this model
+        list    opponents_list      League's Opponents
+        dict    games_dict          League's Games with important persons
+        list    league_standings    League's Standings, best first
+
+        """
+        league.set_opponents({o.id: o for o in opponents_list})
+
         # load league with opponents and games into generic context
         league.set_games(games_dict)
         self._context = league
 
-        # league's opponents by Win Count
-        # store the list because the league has a dict, and sort returns None
-        opponents = self._context.get_opponents()
-        opponents.sort(
-                key=lambda x: x.win_count,
-                reverse=True)
-        self._aggregations["standings"] = opponents
-        self._aggregations["activity"] = None
-
-        # store opponents loaded games in reverse order (so it's new first)
+        # store opponents loaded games in reverse order (so it's new first),
+        # breaking ties by id just like the page query does.
         games = games_dict.values()
         # sort returns None as it's in-place
         games.sort(
-                key=lambda x: x.created_ts,
+                key=lambda x: (x.created_ts, x.id),
                 reverse=True)
         self._objects = games
 
+        # league's opponents' standings by Win Count, kept current as Games
+        # are created so they don't have to be recomputed here.
+        self._aggregations["standings"] = league_standings
+        self._aggregations["activity"] = None
+
         # load opponents into rivals as well
         self._rivals = self._context.get_opponents()
 
@@ -115,6 +276,37 @@ class LeagueModel(ReadModel):
         return self._aggregations.get("activity")
 
 
+    @property
+    def next_cursor(self):
+        """ Return a cursor for the next page of Games, or None if done. """
+        if self._page_size is None or len(self._objects) < self._page_size:
+            return None
+        return loader.encode_cursor(self._objects[-1])
+
+
     def set_league_id(self, league_id):
         """ Set league id for request. """
         self._league_id = league_id
+
+
+    def set_games_page(self, page_size, before=None):
+        """ Set the page of Games to request.
+
+        An unreadable cursor is ignored, and the newest page is loaded.
+
+        Required:
+        int     page_size   most Games to load (None=all)
+
+        Optional:
+        str     before      opaque cursor of the Game to page back from
+
+        """
+        self._page_size = page_size
+        self._before = None
+
+        try:
+            loader.decode_cursor(before)
+            self._before = before
+
+        except InputError as e:
+            print e.reason
@@ -36,6 +36,12 @@ class _NodeProperty(object):
         return "edges"
 
 
+    @constant
+    def CREATED_TS(self):
+        """ CREATED_TS is a Property of Node. """
+        return "created_ts"
+
+
 NODE_PROPERTY = _NodeProperty()
 
 
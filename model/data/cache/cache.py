@@ -0,0 +1,42 @@
+""" Module: cache
+
+Provide a generic key/value cache so that the data layer can keep hot
+reads in memory without worrying about how they are stored.
+
+"""
+
+
+class SqCache(object):
+
+    """ Provide an interface for a generic Sqoreboard cache.
+
+    Keys must be hashable. A missing or expired key reads as None, so
+    None itself can't be cached. This cache is abstract and should not
+    be instantiated directly.
+
+    """
+
+
+    def get(self, key):
+        """ Return the value cached for a key, or None. """
+        raise NotImplementedError("Subclass must implement.")
+
+
+    def set(self, key, value):
+        """ Cache a value for a key. """
+        raise NotImplementedError("Subclass must implement.")
+
+
+    def delete(self, key):
+        """ Remove a key from the cache if it's there. """
+        raise NotImplementedError("Subclass must implement.")
+
+
+    def clear(self):
+        """ Remove every key from the cache. """
+        raise NotImplementedError("Subclass must implement.")
+
+
+    def ttl(self):
+        """ Return the most seconds an entry lives after it's set. """
+        raise NotImplementedError("Subclass must implement.")
@@ -0,0 +1,98 @@
+""" Module: lru
+
+Implement an in-process SqCache which holds a bounded number of entries
+for a bounded amount of time, evicting the least recently used first.
+
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from cache import SqCache
+
+
+class LruCache(SqCache):
+
+    """ Implement a least recently used SqCache with a time to live.
+
+    Variables:
+    int         _max_size   most entries held before evicting
+    int         _ttl        seconds an entry lives after it's set
+    OrderedDict _entries    (expiry, value) pairs, least recent first
+    Lock        _lock       guard for the entries
+
+    """
+
+
+    def __init__(self, max_size, ttl):
+        """ Construct a new LruCache.
+
+        Required:
+        int     max_size    most entries held before evicting
+        int     ttl         seconds an entry lives after it's set
+
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key):
+        """ Return the value cached for a key, or None if missing/expired. """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+
+            (expiry, value) = entry
+            if expiry < time.time():
+                return None
+
+            # reinsert to mark this entry as the most recently used
+            self._entries[key] = entry
+            return value
+
+
+    def set(self, key, value, expiry=None):
+        """ Cache a value for a key, evicting old entries if full.
+
+        Required:
+        str     key         key to cache the value under
+        mixed   value       value to cache
+
+        Optional:
+        float   expiry      time the entry expires, instead of ttl from now
+
+        """
+        if expiry is None:
+            expiry = time.time() + self._ttl
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expiry, value)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+    def delete(self, key):
+        """ Remove a key from the cache if it's there. """
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def clear(self):
+        """ Remove every key from the cache. """
+        with self._lock:
+            self._entries.clear()
+
+
+    def ttl(self):
+        """ Return the seconds an entry lives unless set with an expiry. """
+        return self._ttl
+
+
+    def size(self):
+        """ Return the number of entries, including expired ones. """
+        return len(self._entries)
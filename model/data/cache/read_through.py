@@ -0,0 +1,444 @@
+""" Module: read_through
+
+Serve node, index, and path reads from a SqCache, falling back on the
+database on a miss, so hot reads don't have to go over the wire.
+
+Cached reads are keyed by node id, by index lookup, and by path start
+node id, edge pruner, node return filter and whether neighbors were read
+with their edges. Each cached read remembers
+a version for every node it contains. Writers invalidate node ids by
+bumping their versions, which turns every cached read containing those
+nodes into a miss. A version is only remembered for as long as a read
+cached before it was bumped could still be in the cache.
+
+Provides:
+    class ReadThroughDatabase
+
+"""
+from collections import OrderedDict
+import time
+
+from model.constants import NODE_PROPERTY
+
+
+class ReadThroughDatabase(object):
+
+    """ Wrap a SqDatabase with a read-through SqCache.
+
+    Reads which aren't cached here, and all writes, go straight to the
+    wrapped SqDatabase.
+
+    Variables:
+    SqDatabase  _database           the database behind the cache
+    SqCache     _cache              where reads are cached
+    OrderedDict _versions           (version, time bumped) of each node id
+                                    invalidated within the cache's ttl,
+                                    least recently bumped first
+    int         _version            last version handed out
+    int         _index_generation   bumped whenever index reads go stale
+    int         _writes             bumped on every invalidation
+
+    """
+
+
+    def __init__(self, database, cache):
+        """ Construct a new ReadThroughDatabase.
+
+        Required:
+        SqDatabase  database    the database behind the cache
+        SqCache     cache       where reads are cached
+
+        """
+        self._database = database
+        self._cache = cache
+        self._versions = OrderedDict()
+        self._version = 0
+        self._index_generation = 0
+        self._writes = 0
+
+
+    def __getattr__(self, name):
+        """ Pass anything not cached here through to the database. """
+        return getattr(self._database, name)
+
+
+    def database(self):
+        """ Return the SqDatabase behind the cache. """
+        return self._database
+
+
+    def cache(self):
+        """ Return the SqCache reads are kept in. """
+        return self._cache
+
+
+    def invalidate_nodes(self, node_ids):
+        """ Make every cached read containing these node ids a miss. """
+        self._writes += 1
+        now = time.time()
+
+        for node_id in node_ids:
+            if node_id is not None:
+                self._version += 1
+                self._versions.pop(node_id, None)
+                self._versions[node_id] = (self._version, now)
+                self._cache.delete(self._node_key(node_id))
+
+        self._forget_versions(now)
+
+
+    def invalidate_indexes(self):
+        """ Make every cached index read a miss.
+
+        A new or updated node may now match any index lookup, including
+        ones which previously found nothing.
+
+        """
+        self._writes += 1
+        self._index_generation += 1
+
+
+    def read_node_and_edges(self, node_id):
+        """ Read a node and its edges, from the cache if possible. """
+        key = self._node_key(node_id)
+        node = self._get(key)
+
+        if node is None:
+            writes = self._writes
+            node = self._database.read_node_and_edges(node_id)
+            self._set(key, node, [node], writes)
+
+        return node
+
+
+    def read_node_and_edges_async(self, node_id, callback):
+        """ Read a node and its edges, from the cache if possible. """
+        key = self._node_key(node_id)
+        node = self._get(key)
+
+        if node is not None:
+            callback(node)
+            return
+
+        writes = self._writes
+
+        def handle_node(node):
+            self._set(key, node, [node], writes)
+            callback(node)
+
+        self._database.read_node_and_edges_async(node_id, handle_node)
+
+
+    def read_nodes_by_index(self, key, value, node_return_filter=None):
+        """ Return a dict of nodes for an index lookup, cached if possible. """
+        cache_key = (
+                "index",
+                self._index_generation,
+                key,
+                value,
+                self._freeze(node_return_filter))
+        nodes = self._get(cache_key)
+
+        if nodes is None:
+            writes = self._writes
+            nodes = self._database.read_nodes_by_index(
+                    key,
+                    value,
+                    node_return_filter)
+            if nodes is not None:
+                self._set(cache_key, nodes, nodes.values(), writes)
+
+        return nodes
+
+
+    def read_nodes_from_immediate_path(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a pruned, filtered path, from the cache if possible. """
+        key = self._path_key(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size,
+                before,
+                neighbor_edges)
+        path = self._get(key)
+
+        if path is None:
+            writes = self._writes
+            path = self._database.read_nodes_from_immediate_path(
+                    start_node_id,
+                    edge_pruner,
+                    node_return_filter,
+                    page_size,
+                    before,
+                    neighbor_edges)
+            self._set_path(key, path, writes)
+
+        return path
+
+
+    def read_nodes_from_immediate_path_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a pruned, filtered path, from the cache if possible. """
+        key = self._path_key(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size,
+                before,
+                neighbor_edges)
+        path = self._get(key)
+
+        if path is not None:
+            callback(path)
+            return
+
+        writes = self._writes
+
+        def handle_path(path):
+            self._set_path(key, path, writes)
+            callback(path)
+
+        self._database.read_nodes_from_immediate_path_async(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                handle_path,
+                page_size,
+                before,
+                neighbor_edges)
+
+
+    def read_nodes_from_immediate_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges=True):
+        """ Read pruned, filtered paths, reading only misses from the db. """
+        (paths, missing_ids) = self._get_paths(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter,
+                neighbor_edges)
+
+        if missing_ids:
+            writes = self._writes
+            missing_paths = self._database.read_nodes_from_immediate_paths(
+                    missing_ids,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges)
+            self._set_paths(
+                    paths,
+                    missing_paths,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges,
+                    writes)
+
+        return paths
+
+
+    def read_nodes_from_immediate_paths_async(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            neighbor_edges=True):
+        """ Read pruned, filtered paths, reading only misses from the db. """
+        (paths, missing_ids) = self._get_paths(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter,
+                neighbor_edges)
+
+        if not missing_ids:
+            callback(paths)
+            return
+
+        writes = self._writes
+
+        def handle_paths(missing_paths):
+            self._set_paths(
+                    paths,
+                    missing_paths,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges,
+                    writes)
+            callback(paths)
+
+        self._database.read_nodes_from_immediate_paths_async(
+                missing_ids,
+                edge_pruner,
+                node_return_filter,
+                handle_paths,
+                neighbor_edges)
+
+
+    def _get_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges):
+        """ Return cached paths keyed on start node id and the missing ids. """
+        paths = {}
+        missing_ids = []
+
+        for start_node_id in start_node_ids:
+            path = self._get(self._path_key(
+                    start_node_id,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges=neighbor_edges))
+            if path is None:
+                missing_ids.append(start_node_id)
+            else:
+                paths[start_node_id] = path
+
+        return (paths, missing_ids)
+
+
+    def _set_paths(
+            self,
+            paths,
+            missing_paths,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges,
+            writes):
+        """ Cache newly read paths and add them to the paths dict. """
+        if missing_paths is None:
+            return
+
+        for start_node_id, path in missing_paths.items():
+            key = self._path_key(
+                    start_node_id,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges=neighbor_edges)
+            self._set_path(key, path, writes)
+            paths[start_node_id] = path
+
+
+    def _set_path(self, key, path, writes):
+        """ Cache a path dict along with the nodes it depends on. """
+        if path is None:
+            return
+
+        nodes = []
+        for nodes_at_depth in path.values():
+            nodes.extend(nodes_at_depth.values())
+
+        self._set(key, path, nodes, writes)
+
+
+    def _get(self, key):
+        """ Return a cached value if none of its nodes were invalidated. """
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        (value, versions) = entry
+        for node_id, version in versions.items():
+            if self._get_version(node_id) != version:
+                self._cache.delete(key)
+                return None
+
+        return value
+
+
+    def _set(self, key, value, nodes, writes):
+        """ Cache a value and the versions of the nodes it contains.
+
+        Skip values read while a write happened, since they may have been
+        read before the write and invalidated by it in the meantime.
+
+        """
+        if value is None or writes != self._writes:
+            return
+
+        versions = {}
+        for node in nodes:
+            node_id = node[NODE_PROPERTY.ID]
+            versions[node_id] = self._get_version(node_id)
+
+        self._cache.set(key, (value, versions))
+
+
+    def _get_version(self, node_id):
+        """ Return a node's version, 0 if it hasn't been bumped lately. """
+        entry = self._versions.get(node_id)
+        if entry is None:
+            return 0
+        return entry[0]
+
+
+    def _forget_versions(self, now):
+        """ Forget the versions of nodes bumped longer ago than the ttl.
+
+        Every read cached before such a bump has expired. Reads cached
+        since hold its version, and a forgotten version reads as 0, so
+        they become misses just as if the node had been bumped again.
+        Versions are handed out in order, so a node bumped again later
+        never gets a version a cached read already holds.
+
+        """
+        horizon = now - self._cache.ttl()
+
+        while self._versions:
+            (node_id, (version, bumped_at)) = next(
+                    self._versions.iteritems())
+            if bumped_at >= horizon:
+                break
+            del self._versions[node_id]
+
+
+    def _node_key(self, node_id):
+        """ Return the cache key for a single node. """
+        return ("node", node_id)
+
+
+    def _path_key(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Return the cache key for a depth-1 path, or a page of one. """
+        key = (
+                "path",
+                start_node_id,
+                self._freeze(edge_pruner),
+                self._freeze(node_return_filter),
+                bool(neighbor_edges))
+
+        if page_size is not None:
+            key += (page_size, None if before is None else tuple(before))
+
+        return key
+
+
+    def _freeze(self, types):
+        """ Return a hashable, order-independent version of a type list. """
+        if types is None:
+            return None
+        return tuple(sorted(types))
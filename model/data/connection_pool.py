@@ -0,0 +1,317 @@
+""" Module: connection_pool
+
+Keep persistent HTTP/1.1 connections open to a database server so that
+each request doesn't pay for a new TCP (and TLS) handshake.
+
+Provides:
+    class ConnectionPool
+
+"""
+import errno
+import httplib
+import select
+import socket
+import threading
+import time
+
+from constants import PROTOCOL
+from data_errors import DbConnectionError
+
+
+# socket errors on a kept-alive connection the server has closed
+_DROPPED_ERRNOS = (errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
+
+
+class _ConnectionDropped(Exception):
+
+    """ The server closed a connection before it could act on a request.
+
+    Variables:
+    Exception   error       the socket or http error which showed it
+
+    """
+
+
+    def __init__(self, error):
+        super(_ConnectionDropped, self).__init__(error)
+        self.error = error
+
+
+class ConnectionPool(object):
+
+    """ Pool keep-alive HTTP connections to a single database server.
+
+    Connections are handed out most recently used first, so the
+    connections which stay warm get reused and the rest age out. A
+    connection which has been idle longer than the idle timeout, or
+    whose socket was closed by the server, is evicted instead of being
+    reused.
+
+    Variables:
+    str     _host           the host of the database server
+    int     _port           the port of the database server
+    str     _protocol       the protocol of the database server
+    int     _max_size       maximum number of open connections
+    int     _idle_timeout   seconds an unused connection stays open
+    int     _timeout        seconds to wait on a blocking socket
+    list    _idle           (connection, last used time) pairs
+    int     _open_count     number of open connections, idle or in use
+    Lock    _lock           guard for the idle list and the open count
+
+    """
+
+
+    def __init__(
+            self,
+            host,
+            port,
+            protocol=PROTOCOL.HTTP,
+            max_size=10,
+            idle_timeout=30,
+            timeout=30):
+        """ Construct a new ConnectionPool.
+
+        Required:
+        str     host            host of the database server
+        int     port            port of the database server
+
+        Optional:
+        str     protocol        PROTOCOL.HTTP or PROTOCOL.HTTPS
+        int     max_size        maximum number of open connections
+        int     idle_timeout    seconds an unused connection stays open
+        int     timeout         seconds to wait on a blocking socket
+
+        """
+        self._host = host
+        self._port = int(port)
+        self._protocol = protocol
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._idle = []
+        self._open_count = 0
+        self._lock = threading.Lock()
+
+
+    def request(self, method, path, body=None, headers=None, stream=None):
+        """ Send an HTTP request over a pooled connection.
+
+        The server may drop a reused connection between our health check
+        and the request. If a request on a reused connection fails while
+        it is being sent, or the connection is closed before any of the
+        response arrives, the request is retried once on a fresh one.
+        Nothing else is retried, least of all a timeout, since the server
+        may already have run the request and a Gremlin script may write.
+
+        Required:
+        str     method      HTTP method
+        str     path        request path on the database server
+
+        Optional:
+        str     body        request body
+        dict    headers     request headers
+        func    stream      read the HTTPResponse instead of buffering it
+
+        Return:
+        tuple               (int, str) => (status, response body), or
+                            (int, mixed) => (status, stream's return value)
+
+        Raises:
+        DbConnectionError   the request could not be completed
+
+        """
+        if headers is None:
+            headers = {}
+
+        (connection, is_reused) = self._acquire()
+
+        try:
+            return self._send(connection, method, path, body, headers, stream)
+
+        except _ConnectionDropped as dropped:
+            if not is_reused:
+                raise DbConnectionError(
+                        "ConnectionError: {0}".format(dropped.error))
+
+        # the server dropped a kept-alive connection; try one fresh one.
+        connection = self._open()
+        try:
+            return self._send(connection, method, path, body, headers, stream)
+
+        except _ConnectionDropped as dropped:
+            raise DbConnectionError(
+                    "ConnectionError: {0}".format(dropped.error))
+
+
+    def close(self):
+        """ Close every idle connection in the pool. """
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+            self._open_count -= len(idle)
+
+        for (connection, last_used) in idle:
+            connection.close()
+
+
+    def size(self):
+        """ Return the number of open connections, idle or in use. """
+        return self._open_count
+
+
+    def idle_size(self):
+        """ Return the number of idle connections ready for reuse. """
+        return len(self._idle)
+
+
+    def _send(self, connection, method, path, body, headers, stream=None):
+        """ Send a request, read the whole response, and release.
+
+        The connection is discarded if anything goes wrong.
+
+        Raises:
+        _ConnectionDropped  the server closed the connection before it
+                            could act on the request
+        DbConnectionError   the request failed in any other way
+
+        """
+        try:
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+            except (httplib.HTTPException, socket.error) as err:
+                if self._is_dropped(err):
+                    raise _ConnectionDropped(err)
+                raise
+
+            if stream is None:
+                serialized_response = response.read()
+            else:
+                serialized_response = stream(response)
+
+                # the response must be read in full before the connection
+                # is reused, even if the stream stopped early.
+                response.read()
+
+        except _ConnectionDropped:
+            self._discard(connection)
+            raise
+
+        except (httplib.HTTPException, socket.error) as err:
+            self._discard(connection)
+            raise DbConnectionError("ConnectionError: {0}".format(err))
+
+        except Exception:
+            # the connection is in an unknown state, so don't reuse it
+            self._discard(connection)
+            raise
+
+        if response.will_close:
+            self._discard(connection)
+        else:
+            self._release(connection)
+
+        return (response.status, serialized_response)
+
+
+    def _acquire(self):
+        """ Return a healthy (connection, is_reused) pair from the pool. """
+        now = time.time()
+        stale = []
+        connection = None
+
+        with self._lock:
+            while self._idle:
+                (candidate, last_used) = self._idle.pop()
+                if now - last_used > self._idle_timeout:
+                    stale.append(candidate)
+                elif not self._is_healthy(candidate):
+                    stale.append(candidate)
+                else:
+                    connection = candidate
+                    break
+
+            self._open_count -= len(stale)
+
+        for candidate in stale:
+            candidate.close()
+
+        if connection is not None:
+            return (connection, True)
+
+        return (self._open(), False)
+
+
+    def _open(self):
+        """ Open a new connection unless the pool is exhausted. """
+        with self._lock:
+            if self._open_count >= self._max_size:
+                raise DbConnectionError(
+                        "ConnectionError: pool of {0} exhausted.".format(
+                                self._max_size))
+            self._open_count += 1
+
+        if self._protocol == PROTOCOL.HTTPS:
+            connection_class = httplib.HTTPSConnection
+        else:
+            connection_class = httplib.HTTPConnection
+
+        return connection_class(
+                self._host,
+                self._port,
+                timeout=self._timeout)
+
+
+    def _release(self, connection):
+        """ Return a connection to the pool for reuse. """
+        with self._lock:
+            self._idle.append((connection, time.time()))
+
+
+    def _discard(self, connection):
+        """ Close a connection and forget about it. """
+        with self._lock:
+            self._open_count -= 1
+
+        connection.close()
+
+
+    def _is_dropped(self, error):
+        """ Check whether an error means the server closed a connection.
+
+        Only errors raised before any of the response arrived count. A
+        timeout never does, since the server may still be running the
+        request.
+
+        """
+        if isinstance(error, socket.timeout):
+            return False
+
+        if isinstance(error, socket.error):
+            return error.errno in _DROPPED_ERRNOS
+
+        # non-strict httplib only raises this for a status line which
+        # isn't HTTP when there was no status line at all.
+        if isinstance(error, httplib.BadStatusLine):
+            return not str(error.line).startswith("HTTP/")
+
+        return False
+
+
+    def _is_healthy(self, connection):
+        """ Check that an idle connection's socket is still usable.
+
+        An idle keep-alive socket should have nothing to read. If it does,
+        the server has closed it (or sent something we can't use).
+
+        """
+        sock = connection.sock
+        if sock is None:
+            return False
+
+        try:
+            (readable, writable, errored) = select.select([sock], [], [], 0)
+        except (select.error, socket.error, ValueError):
+            return False
+
+        return not readable
@@ -11,6 +11,12 @@ class _Setting(object):
     """ _Setting class to hold all Database settings constants. """
 
 
+    @constant
+    def ACTIVE_DB(self):
+        """ ACTIVE_DB is a Database settings constant. """
+        return "ACTIVE_DB"
+
+
     @constant
     def DELIMITER(self):
         """ DELIMITER is a Database settings constant. """
@@ -23,12 +29,36 @@ class _Setting(object):
         return "HOST"
 
 
+    @constant
+    def IDLE_TIMEOUT(self):
+        """ IDLE_TIMEOUT is a Database settings constant. """
+        return "IDLE_TIMEOUT"
+
+
+    @constant
+    def LOG_FILE(self):
+        """ LOG_FILE is a Database settings constant. """
+        return "LOG_FILE"
+
+
     @constant
     def LOGIN(self):
         """ LOGIN is a Database settings constant. """
         return "LOGIN"
 
 
+    @constant
+    def MAX_CONNECTIONS(self):
+        """ MAX_CONNECTIONS is a Database settings constant. """
+        return "MAX_CONNECTIONS"
+
+
+    @constant
+    def MAX_SIZE(self):
+        """ MAX_SIZE is a Database settings constant. """
+        return "MAX_SIZE"
+
+
     @constant
     def NAME(self):
         """ NAME is a Database settings constant. """
@@ -53,6 +83,24 @@ class _Setting(object):
         return "PROTOCOL"
 
 
+    @constant
+    def THRESHOLD(self):
+        """ THRESHOLD is a Database settings constant. """
+        return "THRESHOLD"
+
+
+    @constant
+    def TIMEOUT(self):
+        """ TIMEOUT is a Database settings constant. """
+        return "TIMEOUT"
+
+
+    @constant
+    def TTL(self):
+        """ TTL is a Database settings constant. """
+        return "TTL"
+
+
     @constant
     def TYPE(self):
         """ TYPE is a Database settings constant. """
@@ -79,9 +127,35 @@ class _Type(object):
         return "SECURE_NEO4J"
 
 
+    @constant
+    def MEMORY(self):
+        """ MEMORY is a type of database held in this process. """
+        return "MEMORY"
+
+
 TYPE = _Type()
 
 
+class _CacheType(object):
+
+    """ _CacheType class to hold all of our types of read cache. """
+
+
+    @constant
+    def LRU(self):
+        """ LRU is a type of cache that we use. """
+        return "LRU"
+
+
+    @constant
+    def NONE(self):
+        """ NONE turns off caching. """
+        return "NONE"
+
+
+CACHE_TYPE = _CacheType()
+
+
 class _Protocol(object):
 
     """ _Protocol class to hold the different types of protocols. """
@@ -119,6 +193,12 @@ class _Neo4j(object):
         return TYPE.NEO4J + SETTING.DELIMITER + SETTING.PORT
 
 
+    @constant
+    def LOG_FILE(self):
+        """ LOG_FILE is a Database settings constant. """
+        return "LOG_FILE"
+
+
     @constant
     def LOGIN(self):
         """ LOGIN is a Heroku Neo4j setting. """
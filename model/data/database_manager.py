@@ -5,10 +5,19 @@ to the graph layer.
 
 """
 from neo4j.db import Neo4jDatabase, SecureNeo4jDatabase
+from memory.db import MemoryDatabase
+from cache.lru import LruCache
+from cache.read_through import ReadThroughDatabase
 
-from constants import TYPE, SETTING
+from constants import TYPE, CACHE_TYPE, SETTING
 import settings
 
+
+def _pool_setting(db_value, key):
+    """ Return a database's pool setting, falling back on the default. """
+    return db_value.get(key, settings.connection_pool[key])
+
+
 # load the databases from the settings file
 _databases = {}
 for db_key, db_value in settings.databases.items():
@@ -16,22 +25,94 @@ for db_key, db_value in settings.databases.items():
     if db_value[SETTING.TYPE] == TYPE.NEO4J:
         db = Neo4jDatabase(
                 db_value[SETTING.HOST],
-                db_value[SETTING.PORT])
+                db_value[SETTING.PORT],
+                _pool_setting(db_value, SETTING.MAX_CONNECTIONS),
+                _pool_setting(db_value, SETTING.IDLE_TIMEOUT),
+                _pool_setting(db_value, SETTING.TIMEOUT))
     elif db_value[SETTING.TYPE] == TYPE.SECURE_NEO4J:
         db = SecureNeo4jDatabase(
                 db_value[SETTING.HOST],
                 db_value[SETTING.PORT],
                 db_value[SETTING.LOGIN],
-                db_value[SETTING.PASSWORD])
+                db_value[SETTING.PASSWORD],
+                _pool_setting(db_value, SETTING.MAX_CONNECTIONS),
+                _pool_setting(db_value, SETTING.IDLE_TIMEOUT),
+                _pool_setting(db_value, SETTING.TIMEOUT))
+    elif db_value[SETTING.TYPE] == TYPE.MEMORY:
+        db = MemoryDatabase()
     else:
         # TODO: add an InvalidDatabaseTypeError here
         print("add an InvalidDatabaseError here")
 
+    if db is not None and SETTING.PROTOCOL in db_value:
+        db.set_protocol(db_value[SETTING.PROTOCOL])
+
     _databases[db_key] = db
 
 _active_db = settings.active_db
 
+_cached_database = None
+
+# bumped whenever a write invalidates reads, cached or not
+_writes = 0
+
 
 def database():
     """ Return the an active Database object. """
     return _databases[_active_db]
+
+
+def cached_database():
+    """ Return the active Database object behind a read-through cache.
+
+    If caching is turned off in settings, or the active Database is held
+    in memory anyway, return the active Database.
+
+    """
+    global _cached_database
+
+    if _cached_database is None:
+        cache_type = settings.cache[SETTING.TYPE]
+        if (cache_type == CACHE_TYPE.LRU and
+                not isinstance(database(), MemoryDatabase)):
+            _cached_database = ReadThroughDatabase(
+                    database(),
+                    LruCache(
+                            settings.cache[SETTING.MAX_SIZE],
+                            settings.cache[SETTING.TTL]))
+        else:
+            _cached_database = database()
+
+    return _cached_database
+
+
+def stream_paths():
+    """ Return whether path reads should be streamed. """
+    return settings.stream_paths
+
+
+def invalidate_nodes(node_ids):
+    """ Drop cached reads containing any of these node ids, if caching. """
+    global _writes
+    _writes += 1
+
+    if isinstance(cached_database(), ReadThroughDatabase):
+        cached_database().invalidate_nodes(node_ids)
+
+
+def invalidate_indexes():
+    """ Drop cached index reads, if caching. """
+    global _writes
+    _writes += 1
+
+    if isinstance(cached_database(), ReadThroughDatabase):
+        cached_database().invalidate_indexes()
+
+
+def writes():
+    """ Return how many writes have invalidated reads so far.
+
+    Reads started before this changes may not see the latest writes.
+
+    """
+    return _writes
@@ -4,6 +4,8 @@ Provide access to a generic Sqoreboard database so that the graph
 layer doesn't have to worry about implementation details.
 
 """
+from tornado.stack_context import ExceptionStackContext
+
 from model.constants import NODE_PROPERTY, EDGE_PROPERTY
 
 from constants import PROTOCOL
@@ -138,6 +140,63 @@ class SqDatabase(object):
         raise NotImplementedError("Subclass must implement.")
 
 
+    def create_node_and_edges(self, type, properties, edges):
+        """ Create a new node and all of its edges at once and return it.
+
+        Write the node and its edges with a single request, so that the
+        cost of creating a node doesn't grow with its number of edges.
+        Either everything is written or nothing is.
+
+        Each edge is a dict with the same keys create_edge() takes as
+        arguments. An edge's from_node_id or to_node_id may be None, which
+        stands for the id of the node being created.
+
+        Required:
+        string type         type of node
+        dict properties     a dict of all the node's properties
+        list edges          edge dicts: from_node_id, to_node_id, type,
+                            properties
+
+        Returns the created Node with its created edges.
+
+        Raises:
+        DbInputError        bad input
+        DbWriteError        failed to write to database
+
+        """
+        required_properties = {
+                NODE_PROPERTY.TYPE: type,
+                }
+
+        self._assert_input(properties, required_properties)
+
+        for edge in edges:
+            required_params = {
+                    EDGE_PROPERTY.TYPE: edge.get(EDGE_PROPERTY.TYPE),
+                    }
+            self._assert_input(
+                    edge.get(EDGE_PROPERTY.PROPERTIES, {}),
+                    required_params)
+
+        try:
+            new_node = self._query_create_node_and_edges(
+                    type,
+                    properties,
+                    edges)
+            if new_node is None:
+                raise DbWriteError(
+                        "create_node_and_edges",
+                        "No new node returned from database.")
+            return new_node
+        except DbConnectionError as err:
+            raise DbWriteError("create_node_and_edges", err.reason)
+
+
+    def _query_create_node_and_edges(self, type, properties, edges):
+        """ Create, store, and return a new node with its new edges. """
+        raise NotImplementedError("Subclass must implement.")
+
+
     def update_node(self, node_id, properties):
         """ Update existing node and return it.
 
@@ -307,7 +366,10 @@ class SqDatabase(object):
             self,
             start_node_id,
             edge_pruner,
-            node_return_filter):
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
         """ Read a pruned path from the database and return a filtered dict.
 
         Prune the path based on the edges list. Restrict the returned nodes
@@ -315,11 +377,27 @@ class SqDatabase(object):
 
         No duplicate edges in traversal. No duplicates in node lists.
 
+        Given a page size, return one page of the newest nodes instead,
+        ordered by (created_ts, id) and starting strictly before the
+        "before" cursor, if any. The start node then only comes with its
+        edges to the nodes on the page, so a page costs the same however
+        many nodes there are in all.
+
+        Neighbors come with all of their edges unless neighbor_edges is
+        False, when they come with none and the start node only comes with
+        its edges of the pruned types, for callers which only need the
+        nodes themselves.
+
         Required:
         id      start_node_id       ID of node to start traversing path from
         list    edge_pruner         edge types to include in traversal
         list    node_return_filter  node types to include in result set
 
+        Optional:
+        int     page_size           most depth-1 nodes to return
+        tuple   before              (created_ts, id) to page back from
+        bool    neighbor_edges      whether depth-1 nodes have their edges
+
         Return:
         dict            path defined as: {depth:{id:node}}
 
@@ -353,25 +431,513 @@ class SqDatabase(object):
                     "node_return_filter",
                     "Required parameter not included.")
 
+        self._assert_page_input(page_size, before)
+
         try:
             return self._query_read_nodes_from_immediate_path(
                     start_node_id,
                     edge_pruner,
-                    node_return_filter)
+                    node_return_filter,
+                    page_size=page_size,
+                    before=before,
+                    neighbor_edges=neighbor_edges)
 
         except DbConnectionError as err:
             raise DbReadError("read_nodes_from_immediate_path", err.reason)
 
 
-    def _query_read_node_from_immediate_path(
+    def _query_read_nodes_from_immediate_path(
             self,
-            key,
-            value,
-            node_return_filter):
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
         """ Read and return a depth-1 set of nodes with their edges. """
         raise NotImplementedError("Subclasses must implement.")
 
 
+    def read_nodes_from_immediate_path_stream(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a pruned, filtered path, handing over one node at a time.
+
+        Behave like read_nodes_from_immediate_path(), but rather than
+        return a path dict, call visit(depth, node) with every node in the
+        path as soon as it is read. Databases which can parse responses
+        incrementally never have to hold the whole path in memory. Visits
+        must be idempotent, since a retried read may repeat some.
+
+        Required:
+        id      start_node_id       ID of node to start traversing path from
+        list    edge_pruner         edge types to include in traversal
+        list    node_return_filter  node types to include in result set
+        func    visit               called with (depth, node) for every node
+
+        Optional:
+        int     page_size           most depth-1 nodes to return
+        tuple   before              (created_ts, id) to page back from
+        bool    neighbor_edges      whether depth-1 nodes have their edges
+
+        Return:
+        bool            whether the path was found
+
+        Raises:
+        DbInputError    if parameters are missing or incorrect
+        DbReadError     db threw error
+
+        """
+        self._assert_path_input(
+                [start_node_id],
+                edge_pruner,
+                node_return_filter)
+        self._assert_page_input(page_size, before)
+
+        try:
+            return self._query_read_nodes_from_immediate_path_stream(
+                    start_node_id,
+                    edge_pruner,
+                    node_return_filter,
+                    visit,
+                    page_size=page_size,
+                    before=before,
+                    neighbor_edges=neighbor_edges)
+
+        except DbConnectionError as err:
+            raise DbReadError("read_nodes_from_immediate_path", err.reason)
+
+
+    def _query_read_nodes_from_immediate_path_stream(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a depth-1 set of nodes and visit each one.
+
+        Subclasses which can parse a path as it arrives should override
+        this. By default, read the whole path and then visit its nodes.
+
+        """
+        return self._visit_path(
+                self._query_read_nodes_from_immediate_path(
+                        start_node_id,
+                        edge_pruner,
+                        node_return_filter,
+                        page_size=page_size,
+                        before=before,
+                        neighbor_edges=neighbor_edges),
+                visit)
+
+
+    def read_nodes_from_immediate_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges=True):
+        """ Read pruned paths for many start nodes in a single request.
+
+        Behave like read_nodes_from_immediate_path() for each start node,
+        but issue one query for the whole batch instead of one per start
+        node. Start nodes which do not exist are left out of the result.
+
+        Required:
+        list    start_node_ids      IDs of nodes to start traversing from
+        list    edge_pruner         edge types to include in traversal
+        list    node_return_filter  node types to include in result set
+
+        Optional:
+        bool    neighbor_edges      whether depth-1 nodes have their edges
+
+        Return:
+        dict            paths keyed on start node id: {id:{depth:{id:node}}}
+
+        Raises:
+        DbInputError    if parameters are missing or incorrect
+        DbReadError     db threw error
+
+        """
+        self._assert_path_input(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter)
+
+        # nothing to read, so don't bother the database
+        if not start_node_ids:
+            return {}
+
+        try:
+            return self._query_read_nodes_from_immediate_paths(
+                    start_node_ids,
+                    edge_pruner,
+                    node_return_filter,
+                    neighbor_edges=neighbor_edges)
+
+        except DbConnectionError as err:
+            raise DbReadError("read_nodes_from_immediate_paths", err.reason)
+
+
+    def _query_read_nodes_from_immediate_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges=True):
+        """ Read and return depth-1 sets of nodes for many start nodes. """
+        raise NotImplementedError("Subclasses must implement.")
+
+
+    def read_node_and_edges_async(self, node_id, callback):
+        """ Read a node and its edges without blocking.
+
+        Return immediately and pass the result of read_node_and_edges()
+        to the callback once the database responds.
+
+        Required:
+        int         node_id     id of requested Node
+        function    callback    called with a node dict or None
+
+        Raises:
+        DbReadError             read failure
+
+        """
+        self._read_async(
+                "read_node_and_edges",
+                self._query_read_node_and_edges_async,
+                node_id,
+                callback=callback)
+
+
+    def _query_read_node_and_edges_async(self, node_id, callback):
+        """ Read a node and its edges and pass them to the callback.
+
+        Subclasses which can talk to their database without blocking
+        should override this. By default, block and call back at once.
+
+        """
+        callback(self._query_read_node_and_edges(node_id))
+
+
+    def read_nodes_from_immediate_path_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a pruned, filtered path without blocking.
+
+        Return immediately and pass the result of
+        read_nodes_from_immediate_path() to the callback once the database
+        responds.
+
+        Required:
+        id          start_node_id       ID of node to start traversing from
+        list        edge_pruner         edge types to include in traversal
+        list        node_return_filter  node types to include in result set
+        function    callback            called with a path dict
+
+        Optional:
+        int         page_size           most depth-1 nodes to return
+        tuple       before              (created_ts, id) to page back from
+        bool        neighbor_edges      whether depth-1 nodes have edges
+
+        Raises:
+        DbInputError    if parameters are missing or incorrect
+        DbReadError     db threw error
+
+        """
+        self._assert_path_input(
+                [start_node_id],
+                edge_pruner,
+                node_return_filter)
+        self._assert_page_input(page_size, before)
+
+        self._read_async(
+                "read_nodes_from_immediate_path",
+                self._query_read_nodes_from_immediate_path_async,
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                callback=callback,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges)
+
+
+    def _query_read_nodes_from_immediate_path_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a depth-1 set of nodes and pass them to the callback. """
+        callback(self._query_read_nodes_from_immediate_path(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges))
+
+
+    def read_nodes_from_immediate_path_stream_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a path one node at a time without blocking.
+
+        Return immediately, visit the path's nodes as they are read, and
+        pass the result of read_nodes_from_immediate_path_stream() to the
+        callback once the database is done responding.
+
+        Required:
+        id          start_node_id       ID of node to start traversing from
+        list        edge_pruner         edge types to include in traversal
+        list        node_return_filter  node types to include in result set
+        function    visit               called with (depth, node) per node
+        function    callback            called with whether the path exists
+
+        Optional:
+        int         page_size           most depth-1 nodes to return
+        tuple       before              (created_ts, id) to page back from
+        bool        neighbor_edges      whether depth-1 nodes have edges
+
+        Raises:
+        DbInputError    if parameters are missing or incorrect
+        DbReadError     db threw error
+
+        """
+        self._assert_path_input(
+                [start_node_id],
+                edge_pruner,
+                node_return_filter)
+        self._assert_page_input(page_size, before)
+
+        self._read_async(
+                "read_nodes_from_immediate_path",
+                self._query_read_nodes_from_immediate_path_stream_async,
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                visit,
+                callback=callback,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges)
+
+
+    def _query_read_nodes_from_immediate_path_stream_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a depth-1 set of nodes, visit each, and call back. """
+        callback(self._query_read_nodes_from_immediate_path_stream(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                visit,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges))
+
+
+    def read_nodes_from_immediate_paths_async(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            neighbor_edges=True):
+        """ Read pruned, filtered paths for many start nodes without blocking.
+
+        Return immediately and pass the result of
+        read_nodes_from_immediate_paths() to the callback once the database
+        responds.
+
+        Required:
+        list        start_node_ids      IDs of nodes to start traversing from
+        list        edge_pruner         edge types to include in traversal
+        list        node_return_filter  node types to include in result set
+        function    callback            called with paths keyed on start id
+
+        Optional:
+        bool        neighbor_edges      whether depth-1 nodes have edges
+
+        Raises:
+        DbInputError    if parameters are missing or incorrect
+        DbReadError     db threw error
+
+        """
+        self._assert_path_input(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter)
+
+        # nothing to read, so don't bother the database
+        if not start_node_ids:
+            callback({})
+            return
+
+        self._read_async(
+                "read_nodes_from_immediate_paths",
+                self._query_read_nodes_from_immediate_paths_async,
+                start_node_ids,
+                edge_pruner,
+                node_return_filter,
+                callback=callback,
+                neighbor_edges=neighbor_edges)
+
+
+    def _query_read_nodes_from_immediate_paths_async(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            neighbor_edges=True):
+        """ Read depth-1 sets of nodes and pass them to the callback. """
+        callback(self._query_read_nodes_from_immediate_paths(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter,
+                neighbor_edges=neighbor_edges))
+
+
+    def _read_async(self, read_type, query, *args, **kwargs):
+        """ Run an asynchronous query, raising DbReadError on failure.
+
+        A DbConnectionError may be raised right away or later, from the
+        IOLoop callback that handles the database response. The stack
+        context follows the query into that callback, so both cases
+        surface as a DbReadError to whoever is waiting on the read.
+
+        Required:
+        str         read_type   type of read, for error reporting
+        function    query       asynchronous _query_* hook to call
+
+        """
+
+        def handle_exception(type, value, traceback):
+            if isinstance(value, DbConnectionError):
+                raise DbReadError(read_type, value.reason)
+            return False
+
+        with ExceptionStackContext(handle_exception):
+            query(*args, **kwargs)
+
+
+    def _assert_path_input(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter):
+        """ Validate the input to a path read.
+
+        Required:
+        list    start_node_ids      IDs of nodes to start traversing from
+        list    edge_pruner         edge types to include in traversal
+        list    node_return_filter  node types to include in result set
+
+        Raises:
+        DbInputError    bad input
+
+        """
+        if start_node_ids is None or None in start_node_ids:
+            raise DbInputError(
+                    "start_node_ids",
+                    start_node_ids,
+                    "Required parameter not included.")
+
+        # empty list of edge types to prune for doesn't make sense
+        if edge_pruner == []:
+            raise DbInputError(
+                    "edge_pruner",
+                    edge_pruner,
+                    "Required parameter not included.")
+
+        # empty list of node types to return doesn't make sense
+        if node_return_filter == []:
+            raise DbInputError(
+                    "node_return_filter",
+                    node_return_filter,
+                    "Required parameter not included.")
+
+
+    def _visit_path(self, path, visit):
+        """ Visit every node in a path dict, returning whether it exists. """
+        if path is None:
+            return False
+
+        for depth in sorted(path):
+            for node in path[depth].values():
+                visit(depth, node)
+
+        return True
+
+
+    def _assert_page_input(self, page_size, before):
+        """ Validate the paging input to a path read.
+
+        Required:
+        int     page_size   most depth-1 nodes to return (None=all)
+        tuple   before      (created_ts, id) to page back from (None=newest)
+
+        Raises:
+        DbInputError    bad input
+
+        """
+        if page_size is not None and page_size < 1:
+            raise DbInputError(
+                    "page_size",
+                    page_size,
+                    "Page size must be positive.")
+
+        if before is None:
+            return
+
+        # a cursor only makes sense when reading a page
+        if page_size is None:
+            raise DbInputError(
+                    "before",
+                    before,
+                    "Cursor given without a page size.")
+
+        if len(before) != 2 or None in before:
+            raise DbInputError(
+                    "before",
+                    before,
+                    "Cursor must be a (created_ts, id) pair.")
+
+
     def read_edge(self, edge_id):
         raise NotImplementedError("NOT IMPLEMENTED...DO NOT CALL!")
 
@@ -0,0 +1,578 @@
+""" Module: db
+
+Implement Sqoreboard's database api over a graph held in this process's
+memory, so that small deployments, tests, and benchmarks can serve pages
+without a Neo4j server or a network hop.
+
+Nodes and edges are kept already formatted, in the same dict shapes
+response_parser builds, so a read hands back stored dicts without
+serializing or parsing anything. A stored dict is never changed once
+it's been handed out: a node which gains an edge is stored as a new dict.
+
+Nothing is persisted. The graph lasts as long as the process does.
+
+Provides:
+    class MemoryDatabase
+
+"""
+import bisect
+import threading
+
+from model.constants import NODE_PROPERTY, EDGE_PROPERTY
+from model.data.db import SqDatabase
+
+
+class MemoryDatabase(SqDatabase):
+
+    """ Implement a SqDatabase which keeps the whole graph in memory.
+
+    Each node's out edges are indexed by type as (created_ts, to node id,
+    edge id) entries, sorted by the node they lead to. A page of the newest
+    neighbors is then found by bisecting to the cursor and reading back,
+    however many neighbors there are in all.
+
+    Variables:
+    list    _nodes          formatted nodes indexed by id (None if missing)
+    list    _edges          formatted edges indexed by id (None if missing)
+    list    _adjacency      sorted out edge entries keyed on edge type,
+                            indexed by node id
+    dict    _index          node ids keyed on property key and then value
+    Lock    _lock           guard for the whole graph
+
+    """
+
+
+    def __init__(self):
+        """ Construct an empty MemoryDatabase. """
+        super(MemoryDatabase, self).__init__(None, None)
+
+        # ids start at 1, like Neo4j's, since 0 reads as a missing id
+        self._nodes = [None]
+        self._edges = [None]
+        self._adjacency = [None]
+        self._index = {}
+        self._lock = threading.Lock()
+
+
+    def base_url(self):
+        """ Return None, since the graph isn't served from anywhere. """
+        return None
+
+
+    def node_count(self):
+        """ Return the number of nodes in the graph. """
+        return len(self._nodes) - 1
+
+
+    def edge_count(self):
+        """ Return the number of edges in the graph. """
+        return len(self._edges) - 1
+
+
+    def _query_create_node(self, type, properties):
+        """ Create, store, and return a new node with no edges.
+
+        Required:
+        str     type        type of node to create
+        dict    properties  properties to set in new node
+
+        Return:
+        dict                properly formatted node
+
+        """
+        with self._lock:
+            node_id = self._add_node(type, properties)
+            return self._nodes[node_id]
+
+
+    def _query_create_edge(self, from_node_id, to_node_id, type, properties):
+        """ Create, store, and return a new edge.
+
+        Required:
+        id      from_node_id    id of outgoing node
+        id      to_node_id      id of incoming node
+        str     type            type of edge to create
+        dict    properties      properties to set in new edge
+
+        Return:
+        dict                    properly formatted edge (None if either
+                                node is missing)
+
+        """
+        from_node_id = self._node_id(from_node_id)
+        to_node_id = self._node_id(to_node_id)
+
+        with self._lock:
+            if not (self._has_node(from_node_id)
+                    and self._has_node(to_node_id)):
+                return None
+
+            edge_ids = self._add_edges([
+                    (from_node_id, to_node_id, type, properties)])
+            return self._edges[edge_ids[0]]
+
+
+    def _query_create_node_and_edges(self, type, properties, edges):
+        """ Create, store, and return a node and its edges at once.
+
+        Required:
+        str     type        type of node to create
+        dict    properties  properties to set in new node
+        list    edges       edge dicts, where a None node id is the new node
+
+        Return:
+        dict                properly formatted node with all of its new
+                            edges, in and out (None if a node is missing)
+
+        """
+        ends = [[self._node_id(edge.get(key)) for key in (
+                        EDGE_PROPERTY.FROM_NODE_ID,
+                        EDGE_PROPERTY.TO_NODE_ID)]
+                for edge in edges]
+
+        with self._lock:
+            # check every end first so that a bad edge leaves nothing behind
+            for end_node_ids in ends:
+                for node_id in end_node_ids:
+                    if node_id is not None and not self._has_node(node_id):
+                        return None
+
+            node_id = self._add_node(type, properties)
+
+            prototypes = []
+            for (edge, (from_node_id, to_node_id)) in zip(edges, ends):
+                prototypes.append((
+                        node_id if from_node_id is None else from_node_id,
+                        node_id if to_node_id is None else to_node_id,
+                        edge[EDGE_PROPERTY.TYPE],
+                        edge.get(EDGE_PROPERTY.PROPERTIES, {})))
+
+            edge_ids = self._add_edges(prototypes)
+
+            return self._with_edges(
+                    self._nodes[node_id],
+                    [self._edges[e] for e in edge_ids])
+
+
+    def _query_update_node(self, node_id, properties):
+        """ Update an existing node's properties and return it.
+
+        A node's created_ts orders the edges leading to it, so it can't be
+        changed.
+
+        """
+        node_id = self._node_id(node_id)
+
+        with self._lock:
+            if not self._has_node(node_id):
+                return None
+
+            node = self._nodes[node_id]
+            old_properties = node[NODE_PROPERTY.PROPERTIES]
+
+            new_properties = dict(old_properties)
+            new_properties.update(properties)
+            new_properties[NODE_PROPERTY.CREATED_TS] = old_properties.get(
+                    NODE_PROPERTY.CREATED_TS)
+
+            self._unindex(node_id, old_properties)
+            self._index_properties(node_id, new_properties)
+
+            node = dict(node)
+            node[NODE_PROPERTY.PROPERTIES] = new_properties
+            self._nodes[node_id] = node
+
+            return node
+
+
+    def _query_update_edge(self, edge_id, properties):
+        """ Update an existing edge's properties and return it. """
+        edge_id = self._node_id(edge_id)
+
+        with self._lock:
+            if not self._has_edge(edge_id):
+                return None
+
+            edge = dict(self._edges[edge_id])
+            new_properties = dict(edge[EDGE_PROPERTY.PROPERTIES])
+            new_properties.update(properties)
+            edge[EDGE_PROPERTY.PROPERTIES] = new_properties
+            self._edges[edge_id] = edge
+
+            from_node_id = edge[EDGE_PROPERTY.FROM_NODE_ID]
+            from_node = self._nodes[from_node_id]
+            edges = dict(from_node[NODE_PROPERTY.EDGES])
+            edges[edge_id] = edge
+            self._nodes[from_node_id] = self._with_edges(from_node, edges)
+
+            return edge
+
+
+    def _query_read_node_and_edges(self, node_id):
+        """ Read and return a node and its edges.
+
+        Required:
+        id      node_id     id of node to read
+
+        Return:
+        dict                properly formatted node (None if missing)
+
+        """
+        node_id = self._node_id(node_id)
+
+        with self._lock:
+            if not self._has_node(node_id):
+                return None
+            return self._nodes[node_id]
+
+
+    def _query_read_nodes_by_index(self, key, value, node_return_filter):
+        """ Return a dict of nodes with edges given a non-ID node property.
+
+        Required:
+        str     key                 indexed node property to look up
+        mixed   value               value (ideally unique) to look up
+        list    node_return_filter  node types to filter for (None=all)
+
+        Return:
+        dict                        properly formatted nodes keyed on id
+
+        """
+        with self._lock:
+            try:
+                node_ids = self._index.get(key, {}).get(value, [])
+            except TypeError:
+                # unhashable values, like lists, are never indexed
+                node_ids = []
+
+            return self._filter_nodes(node_ids, node_return_filter)
+
+
+    def _query_read_nodes_from_immediate_path(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read and return a depth-1 set of nodes with their edges.
+
+        Required:
+        id      start_node_id       id of node to start from
+        list    edge_pruner         edges to traverse (None=all)
+        list    node_return_filter  nodes to return (None=all)
+
+        Optional:
+        int     page_size           most neighbors to return (None=all)
+        tuple   before              (created_ts, id) to page back from
+        bool    neighbor_edges      whether neighbors come with their edges
+
+        Return:
+        dict                        formatted nodes keyed on depth and id
+        {depth: {node_id: node}}    (None if the start node is missing)
+
+        """
+        start_node_id = self._node_id(start_node_id)
+
+        with self._lock:
+            if not self._has_node(start_node_id):
+                return None
+
+            if page_size is None:
+                return self._path(
+                        start_node_id,
+                        edge_pruner,
+                        node_return_filter,
+                        neighbor_edges)
+
+            return self._path_page(
+                    start_node_id,
+                    edge_pruner,
+                    node_return_filter,
+                    page_size,
+                    before,
+                    neighbor_edges)
+
+
+    def _query_read_nodes_from_immediate_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges=True):
+        """ Read and return depth-1 sets of nodes for many start nodes.
+
+        Return:
+        dict                        formatted paths keyed on start node id
+        {start_node_id: {depth: {node_id: node}}}
+
+        """
+        start_node_ids = [self._node_id(n) for n in start_node_ids]
+
+        with self._lock:
+            paths = {}
+            for start_node_id in start_node_ids:
+                if self._has_node(start_node_id):
+                    paths[start_node_id] = self._path(
+                            start_node_id,
+                            edge_pruner,
+                            node_return_filter,
+                            neighbor_edges)
+            return paths
+
+
+    def _path(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges):
+        """ Return the whole depth-1 path from a start node.
+
+        Without neighbor_edges, the start node only comes with its edges of
+        the traversed types.
+
+        """
+        neighbor_ids = set()
+        start_edges = []
+        for entries in self._entries(start_node_id, edge_pruner):
+            for (created_ts, to_node_id, edge_id) in entries:
+                neighbor_ids.add(to_node_id)
+                start_edges.append(self._edges[edge_id])
+
+        start_node = self._nodes[start_node_id]
+        neighbors = self._filter_nodes(neighbor_ids, node_return_filter)
+        if not neighbor_edges:
+            start_node = self._with_edges(start_node, start_edges)
+            neighbors = self._without_edges(neighbors)
+
+        return {
+                0: {start_node_id: start_node},
+                1: neighbors,
+                }
+
+
+    def _path_page(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size,
+            before,
+            neighbor_edges):
+        """ Return the newest page of a depth-1 path before a cursor.
+
+        The start node only comes with its edges to the page.
+
+        """
+        node_types = self._node_types(node_return_filter)
+
+        # the newest page_size unique neighbors of each edge type hold the
+        # newest page_size unique neighbors of them all
+        candidates = {}
+        for entries in self._entries(start_node_id, edge_pruner):
+            end = len(entries)
+            if before is not None:
+                end = bisect.bisect_left(entries, tuple(before))
+
+            found = set()
+            for (created_ts, to_node_id, edge_id) in reversed(entries[:end]):
+                if len(found) == page_size:
+                    break
+                if to_node_id not in found and self._is_type(
+                        to_node_id,
+                        node_types):
+                    found.add(to_node_id)
+                    candidates[to_node_id] = created_ts
+
+        page_ids = sorted(
+                candidates,
+                key=lambda id: (candidates[id], id),
+                reverse=True)[:page_size]
+
+        page = set(page_ids)
+        neighbors = dict((id, self._nodes[id]) for id in page_ids)
+        if not neighbor_edges:
+            neighbors = self._without_edges(neighbors)
+
+        start_edges = [self._edges[edge_id]
+                for entries in self._entries(start_node_id, edge_pruner)
+                for (created_ts, to_node_id, edge_id) in entries
+                if to_node_id in page]
+
+        return {
+                0: {start_node_id: self._with_edges(
+                        self._nodes[start_node_id],
+                        start_edges)},
+                1: neighbors,
+                }
+
+
+    def _entries(self, node_id, edge_pruner):
+        """ Return the sorted out edge entries of a node, one list per
+        pruned edge type. """
+        adjacency = self._adjacency[node_id]
+
+        if edge_pruner is None:
+            return adjacency.values()
+
+        return [adjacency[type] for type in set(edge_pruner)
+                if type in adjacency]
+
+
+    def _filter_nodes(self, node_ids, node_return_filter):
+        """ Return the nodes of the filtered types keyed on id. """
+        node_types = self._node_types(node_return_filter)
+        return dict((id, self._nodes[id]) for id in node_ids
+                if self._is_type(id, node_types))
+
+
+    def _node_types(self, node_return_filter):
+        """ Return a set of node types to return, or None for all. """
+        if not node_return_filter:
+            return None
+        return set(node_return_filter)
+
+
+    def _is_type(self, node_id, node_types):
+        """ Return whether a node is one of the types (None=all). """
+        return (node_types is None or
+                self._nodes[node_id][NODE_PROPERTY.TYPE] in node_types)
+
+
+    def _node_id(self, node_id):
+        """ Return an id as an int, like Neo4j's g.v() reads it.
+
+        Ids often arrive as numeric strings, from forms and JSON keys. Any
+        other id is returned as is, to be found missing.
+
+        """
+        if isinstance(node_id, basestring):
+            try:
+                return int(node_id)
+            except ValueError:
+                pass
+        return node_id
+
+
+    def _has_node(self, node_id):
+        """ Return whether a node exists. """
+        try:
+            return 0 < node_id < len(self._nodes)
+        except TypeError:
+            return False
+
+
+    def _has_edge(self, edge_id):
+        """ Return whether an edge exists. """
+        try:
+            return 0 < edge_id < len(self._edges)
+        except TypeError:
+            return False
+
+
+    def _add_node(self, type, properties):
+        """ Store and index a node without edges and return its id. """
+        node_id = len(self._nodes)
+
+        properties = dict(properties)
+
+        self._nodes.append({
+                NODE_PROPERTY.ID: node_id,
+                NODE_PROPERTY.TYPE: type,
+                NODE_PROPERTY.PROPERTIES: properties,
+                NODE_PROPERTY.EDGES: {},
+                })
+        self._adjacency.append({})
+        self._index_properties(node_id, properties)
+
+        return node_id
+
+
+    def _add_edges(self, prototypes):
+        """ Store edges and return their ids.
+
+        Each node gaining edges is stored as a new dict just once.
+
+        Required:
+        list    prototypes  (from id, to id, type, properties) tuples
+
+        """
+        edge_ids = []
+        new_edges = {}
+
+        for (from_node_id, to_node_id, type, properties) in prototypes:
+            edge_id = len(self._edges)
+            edge = {
+                    EDGE_PROPERTY.ID: edge_id,
+                    EDGE_PROPERTY.PROPERTIES: dict(properties),
+                    EDGE_PROPERTY.FROM_NODE_ID: from_node_id,
+                    EDGE_PROPERTY.TO_NODE_ID: to_node_id,
+                    EDGE_PROPERTY.TYPE: type,
+                    }
+            self._edges.append(edge)
+            edge_ids.append(edge_id)
+
+            new_edges.setdefault(from_node_id, {})[edge_id] = edge
+
+            to_properties = self._nodes[to_node_id][NODE_PROPERTY.PROPERTIES]
+            created_ts = to_properties.get(NODE_PROPERTY.CREATED_TS)
+            entries = self._adjacency[from_node_id].setdefault(type, [])
+            entry = (created_ts, to_node_id, edge_id)
+
+            # new edges almost always lead to the newest node
+            if not entries or entries[-1] <= entry:
+                entries.append(entry)
+            else:
+                bisect.insort(entries, entry)
+
+        for (node_id, edges) in new_edges.items():
+            node = self._nodes[node_id]
+            all_edges = dict(node[NODE_PROPERTY.EDGES])
+            all_edges.update(edges)
+            self._nodes[node_id] = self._with_edges(node, all_edges)
+
+        return edge_ids
+
+
+    def _with_edges(self, node, edges):
+        """ Return a copy of a node dict with other edges.
+
+        Required:
+        dict    node    properly formatted node
+        mixed   edges   formatted edges keyed on id, or a list of them
+
+        """
+        if not isinstance(edges, dict):
+            edges = dict((e[EDGE_PROPERTY.ID], e) for e in edges)
+
+        node = dict(node)
+        node[NODE_PROPERTY.EDGES] = edges
+        return node
+
+
+    def _without_edges(self, nodes):
+        """ Return copies of nodes keyed on id, each without its edges. """
+        return dict((id, self._with_edges(node, {}))
+                for (id, node) in nodes.items())
+
+
+    def _index_properties(self, node_id, properties):
+        """ Index a node under each of its properties, like Neo4j's
+        automatic vertices index. """
+        for (key, value) in properties.items():
+            try:
+                self._index.setdefault(key, {}).setdefault(value, []).append(
+                        node_id)
+            except TypeError:
+                pass
+
+
+    def _unindex(self, node_id, properties):
+        """ Drop a node from the index entries for its properties. """
+        for (key, value) in properties.items():
+            try:
+                self._index[key][value].remove(node_id)
+            except (KeyError, TypeError, ValueError):
+                pass
@@ -101,6 +101,30 @@ class _Gremlin(object):
         return "application/json"
 
 
+    @constant
+    def AUTH_HEADER_TYPE(self):
+        """ AUTH_HEADER_TYPE is a Gremlin constant. """
+        return "Authorization"
+
+
+    @constant
+    def AUTH_HEADER(self):
+        """ AUTH_HEADER is a Gremlin constant. """
+        return "Basic {0}"
+
+
+    @constant
+    def REQUEST_METHOD(self):
+        """ REQUEST_METHOD is a Gremlin constant. """
+        return "POST"
+
+
+    @constant
+    def NO_RESPONSE_CODE(self):
+        """ NO_RESPONSE_CODE is a Gremlin constant. """
+        return 599
+
+
     @constant
     def BASE_ERROR(self):
         """ BASE_ERROR is a Gremlin constant. """
@@ -125,4 +149,150 @@ class _Gremlin(object):
         return "message"
 
 
+    @constant
+    def IDS(self):
+        """ IDS is a Gremlin constant. """
+        return "ids"
+
+
+    @constant
+    def EDGES(self):
+        """ EDGES is a Gremlin constant. """
+        return "edges"
+
+
+    @constant
+    def EDGE_TYPES(self):
+        """ EDGE_TYPES is a Gremlin constant. """
+        return "edge_types"
+
+
+    @constant
+    def NODE_TYPES(self):
+        """ NODE_TYPES is a Gremlin constant. """
+        return "node_types"
+
+
+    @constant
+    def INDEX(self):
+        """ INDEX is a Gremlin constant. """
+        return "index"
+
+
+    @constant
+    def KEY(self):
+        """ KEY is a Gremlin constant. """
+        return "key"
+
+
+    @constant
+    def VALUE(self):
+        """ VALUE is a Gremlin constant. """
+        return "value"
+
+
+    @constant
+    def PAGE_SIZE(self):
+        """ PAGE_SIZE is a Gremlin constant. """
+        return "page_size"
+
+
+    @constant
+    def BEFORE(self):
+        """ BEFORE is a Gremlin constant. """
+        return "before"
+
+
+    @constant
+    def NEIGHBOR_EDGES(self):
+        """ NEIGHBOR_EDGES is a Gremlin constant. """
+        return "neighbor_edges"
+
+
+    @constant
+    def STREAM_CHUNK_SIZE(self):
+        """ STREAM_CHUNK_SIZE is a Gremlin constant. """
+        return 65536
+
+
+    @constant
+    def SPAN(self):
+        """ SPAN is a Gremlin constant. """
+        return "gremlin.{0}"
+
+
+    @constant
+    def CALLS_EVENT(self):
+        """ CALLS_EVENT is a Gremlin constant. """
+        return "gremlin_calls"
+
+
+    @constant
+    def BYTES_SENT_EVENT(self):
+        """ BYTES_SENT_EVENT is a Gremlin constant. """
+        return "gremlin_bytes_sent"
+
+
+    @constant
+    def BYTES_RECEIVED_EVENT(self):
+        """ BYTES_RECEIVED_EVENT is a Gremlin constant. """
+        return "gremlin_bytes_received"
+
+
 GREMLIN = _Gremlin()
+
+
+class _Script(object):
+
+    """ _Script class to hold the names of registered Gremlin scripts. """
+
+
+    @constant
+    def CREATE_NODE(self):
+        """ CREATE_NODE is a Gremlin script name. """
+        return "create_node"
+
+
+    @constant
+    def CREATE_EDGE(self):
+        """ CREATE_EDGE is a Gremlin script name. """
+        return "create_edge"
+
+
+    @constant
+    def CREATE_NODE_AND_EDGES(self):
+        """ CREATE_NODE_AND_EDGES is a Gremlin script name. """
+        return "create_node_and_edges"
+
+
+    @constant
+    def READ_NODE_AND_EDGES(self):
+        """ READ_NODE_AND_EDGES is a Gremlin script name. """
+        return "read_node_and_edges"
+
+
+    @constant
+    def READ_NODES_BY_INDEX(self):
+        """ READ_NODES_BY_INDEX is a Gremlin script name. """
+        return "read_nodes_by_index"
+
+
+    @constant
+    def READ_NODES_FROM_IMMEDIATE_PATH(self):
+        """ READ_NODES_FROM_IMMEDIATE_PATH is a Gremlin script name. """
+        return "read_nodes_from_immediate_path"
+
+
+    @constant
+    def READ_NODES_FROM_IMMEDIATE_PATH_PAGE(self):
+        """ READ_NODES_FROM_IMMEDIATE_PATH_PAGE is a Gremlin script name. """
+        return "read_nodes_from_immediate_path_page"
+
+
+    @constant
+    def READ_NODES_FROM_IMMEDIATE_PATHS(self):
+        """ READ_NODES_FROM_IMMEDIATE_PATHS is a Gremlin script name. """
+        return "read_nodes_from_immediate_paths"
+
+
+SCRIPT = _Script()
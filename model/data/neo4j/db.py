@@ -8,22 +8,93 @@ All the functions raise DbConnectionError if they can't connect
 to the db or if the db returns an error, including a bad id error.
 
 """
-import urllib2
+import base64
+import httplib
 import json
+import time
 
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.ioloop import IOLoop
 
-#from util.dev import print_timing
+from util import instrumentation
 from model.constants import NODE_PROPERTY, EDGE_PROPERTY
 from model.data.db import SqDatabase
 from model.data.data_errors import DbConnectionError
+from model.data.connection_pool import ConnectionPool
 
-from constants import NEO4J, NEO4J_INDEX, GREMLIN
+from constants import NEO4J, NEO4J_INDEX, GREMLIN, SCRIPT
+import gremlin_query
+import query_log
 import response_parser
 
 
 class Neo4jDatabase(SqDatabase):
 
-    """ Implement a SqDatabase to connect with neo4j. """
+    """ Implement a SqDatabase to connect with neo4j.
+
+    Requests go through a ConnectionPool, which keeps HTTP/1.1
+    connections to the server alive between Gremlin calls.
+
+    Variables:
+    int             _max_connections    most pooled connections open at once
+    int             _idle_timeout       seconds an idle connection stays open
+    int             _timeout            seconds to wait on a blocking socket
+    dict            _headers            headers sent with every request
+    ConnectionPool  _pool               pool of keep-alive connections
+    AsyncHTTPClient _async_client       client for non-blocking requests
+
+    """
+
+
+    def __init__(
+            self,
+            host,
+            port,
+            max_connections=10,
+            idle_timeout=30,
+            timeout=30):
+        """ Construct a Neo4jDatabase.
+
+        Required:
+        str     host                host of the database
+        str     port                port of the database
+
+        Optional:
+        int     max_connections     most pooled connections open at once
+        int     idle_timeout        seconds an idle connection stays open
+        int     timeout             seconds to wait on a blocking socket
+
+        """
+        super(Neo4jDatabase, self).__init__(host, port)
+        self._max_connections = max_connections
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._headers = {
+                GREMLIN.REQUEST_HEADER_TYPE: GREMLIN.REQUEST_HEADER,
+                }
+        self._pool = None
+        self._async_client = None
+
+
+    def set_protocol(self, protocol):
+        """ Set the URL protocol and drop connections using the old one. """
+        super(Neo4jDatabase, self).set_protocol(protocol)
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+
+    def connection_pool(self):
+        """ Return this database's ConnectionPool, creating it if needed. """
+        if self._pool is None:
+            self._pool = ConnectionPool(
+                    self._host,
+                    self._port,
+                    self._protocol,
+                    self._max_connections,
+                    self._idle_timeout,
+                    self._timeout)
+        return self._pool
 
 
     def _query_create_node(self, type, properties):
@@ -43,10 +114,8 @@ class Neo4jDatabase(SqDatabase):
         # add type to properties dictionary before generating script
         properties[NODE_PROPERTY.TYPE] = type
 
-        # write a gremlin query and specify substitution fields
         # TODO: does grabbing the empty edges list take time here?
-        script = "g.addVertex({0}).transform{{[it, it.outE()]}}".format(
-                NODE_PROPERTY.PROPERTIES)
+        script = gremlin_query.get_script(SCRIPT.CREATE_NODE)
 
         # specify substitution values for the gremlin query
         parameters = {NODE_PROPERTY.PROPERTIES: properties}
@@ -81,12 +150,7 @@ class Neo4jDatabase(SqDatabase):
 
         """
 
-        # write a gremlin query and specify substitution fields
-        script = "g.addEdge(g.v({0}), g.v({1}), {2}, {3})".format(
-                EDGE_PROPERTY.FROM_NODE_ID,
-                EDGE_PROPERTY.TO_NODE_ID,
-                EDGE_PROPERTY.TYPE,
-                EDGE_PROPERTY.PROPERTIES)
+        script = gremlin_query.get_script(SCRIPT.CREATE_EDGE)
 
         # specify substitution values for the gremlin query
         params = {
@@ -107,7 +171,46 @@ class Neo4jDatabase(SqDatabase):
             return response_parser.format_edge(response)
 
 
-    def _query_read_node_and_edges(self, node_id):
+    def _query_create_node_and_edges(self, type, properties, edges):
+        """ Create, store, and return a Neo4j node and its edges at once.
+
+        Add the vertex and every edge in a single Gremlin script. The
+        Gremlin plugin runs each script in its own transaction, so a
+        failure part way through leaves nothing behind.
+
+        Required:
+        str     type        type of neo4j node to create
+        dict    properties  properties to set in new neo4j node
+        list    edges       edge dicts, where a None node id is the new node
+
+        Returns:
+        dict                properly formatted node with its new edges
+
+        """
+
+        # add type to properties dictionary before generating script
+        properties[NODE_PROPERTY.TYPE] = type
+
+        # [ { v }, [ { e }, ..., { e } ] ]
+        script = gremlin_query.get_script(SCRIPT.CREATE_NODE_AND_EDGES)
+
+        # specify substitution values for the gremlin query
+        params = {
+                NODE_PROPERTY.PROPERTIES: properties,
+                GREMLIN.EDGES: edges,
+                }
+
+        # send a request to the database
+        response = self._gremlin(script, params)
+
+        # format the response as a proper node
+        if response is None:
+            return None
+        else:
+            return response_parser.format_node(response)
+
+
+    def _query_read_node_and_edges(self, node_id, callback=None):
         """ Read and return a Neo4j node and its edges using Gremlin.
 
         Keys: node_id, type, properties, edges
@@ -115,27 +218,22 @@ class Neo4jDatabase(SqDatabase):
         Required:
         id      node_id     id of node to query
 
+        Optional:
+        func    callback    don't block; pass the node to this instead
+
         Return:
         dict                properly formatted node
 
         """
 
-        # write a gremlin query and specify substitution fields
         # [ [ { v }, [ { Pipe }, { Pipe }, { Pipe } ] ] ]
-        script = "g.v({0}).transform{{[it, it.outE()]}}".format(
-                NODE_PROPERTY.ID)
+        script = gremlin_query.get_script(SCRIPT.READ_NODE_AND_EDGES)
 
         # specify substitution values for the gremlin query
         params = {NODE_PROPERTY.ID: node_id}
 
-        # send a request to the database
-        response = self._gremlin(script, params)
-
-        # format response as a proper node
-        if response is None:
-            return None
-        else:
-            return response_parser.format_node(response[0])
+        # send a request to the database and format response as a proper node
+        return self._send(script, params, self._format_first_node, callback)
 
 
     def _query_read_nodes_by_index(
@@ -156,27 +254,18 @@ class Neo4jDatabase(SqDatabase):
 
         """
 
-        # write a gremlin query
-        filter = ""
-        if node_return_filter:
-            filter = ".filter{{it.{0}.matches({1})}}".format(
-                    NODE_PROPERTY.TYPE,
-                    "\"{0}\"".format("|".join(node_return_filter)))
-        # specify substitution fields
         # [ { v }, [ { Pipe }, { Pipe } ] ]
-        script = """
-        g.idx(\"{0}\").get({1}, {2})._(){3}.transform{{[it, it.outE()]}}
-        """.format(
-                NEO4J_INDEX.NODES,
-                key,
-                value,
-                filter)
+        script = gremlin_query.get_script(SCRIPT.READ_NODES_BY_INDEX)
 
-        # specify substitution values for the gremlin query
+        # specify substitution values for the gremlin query. the key and
+        # value are bound, not written into the script, so every lookup
+        # shares one compiled script.
         params = {
-                key: key,
-                value: value,
-                NODE_PROPERTY.TYPE: NODE_PROPERTY.TYPE,
+                GREMLIN.INDEX: NEO4J_INDEX.NODES,
+                GREMLIN.KEY: key,
+                GREMLIN.VALUE: value,
+                GREMLIN.NODE_TYPES: self._bind_return_filter(
+                        node_return_filter),
                 }
 
         # send a request to the database
@@ -193,7 +282,11 @@ class Neo4jDatabase(SqDatabase):
             self,
             start_node_id,
             edge_pruner,
-            node_return_filter):
+            node_return_filter,
+            page_size=None,
+            before=None,
+            neighbor_edges=True,
+            callback=None):
         """ Read and return a depth-1 set of Neo4j nodes using Gremlin.
 
         Use edge_pruner and node_return_filter to impose path constraints.
@@ -203,64 +296,292 @@ class Neo4jDatabase(SqDatabase):
         list    edge_pruner         edges to traverse (None=all)
         list    node_return_filter  nodes to return (None=all)
 
+        Optional:
+        int     page_size           most neighbors to return (None=all)
+        tuple   before              (created_ts, id) to page back from
+        bool    neighbor_edges      whether neighbors come with their edges
+        func    callback            don't block; pass the path to this instead
+
         Return:
         dict                        formatted nodes keyed on depth and id
         {depth: {node_id: node}}
 
         """
 
+        (script, params) = self._path_query(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size,
+                before,
+                neighbor_edges)
+
+        # send a request to the database and format response as a proper path
+        return self._send(
+                script,
+                params,
+                response_parser.format_path,
+                callback)
+
+
+    def _query_read_nodes_from_immediate_path_stream(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            page_size=None,
+            before=None,
+            neighbor_edges=True,
+            callback=None):
+        """ Read a depth-1 set of Neo4j nodes, visiting each as it arrives.
+
+        Parse the response incrementally with a PathStreamParser, so that
+        neither the response nor a path dict is ever held whole.
+
+        Required:
+        id      start_node_id       id of requested neo4j node
+        list    edge_pruner         edges to traverse (None=all)
+        list    node_return_filter  nodes to return (None=all)
+        func    visit               called with (depth, node) per node
+
+        Optional:
+        int     page_size           most neighbors to return (None=all)
+        tuple   before              (created_ts, id) to page back from
+        bool    neighbor_edges      whether neighbors come with their edges
+        func    callback            don't block; pass the result to this
+
+        Return:
+        bool                        whether the path was found
+
+        """
+        (script, params) = self._path_query(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size,
+                before,
+                neighbor_edges)
+
+        if callback is None:
+            return self._gremlin_stream(script, params, visit)
+
+        self._gremlin_stream_async(script, params, visit, callback)
+
+
+    def _query_read_nodes_from_immediate_path_stream_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            visit,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read and visit a depth-1 set of nodes without blocking. """
+        self._query_read_nodes_from_immediate_path_stream(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                visit,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges,
+                callback=callback)
+
+
+    def _path_query(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            page_size,
+            before,
+            neighbor_edges):
+        """ Return the (script, params) pair for a depth-1 path read. """
+
         # None is standard for specifying no filter (or, filter for all
         # types). an empty list would be the correct way to ask for no
         # return types, but we consider that to be an obvious error, which
         # is raised a layer above by the generic model.db, which has no
         # knowledge of or interest in how we format these filters here.
 
-        if edge_pruner is None:
-            edge_pruner = []
+        # all unique nodes depth 1 from start node with restrictions
+        script = gremlin_query.get_script(
+                SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH)
 
-        if node_return_filter is None:
-            node_return_filter = []
+        # specify substitution values for the gremlin query
+        params = {
+                NODE_PROPERTY.ID: start_node_id,
+                GREMLIN.EDGE_TYPES: self._bind_edge_pruner(edge_pruner),
+                GREMLIN.NODE_TYPES: self._bind_return_filter(
+                        node_return_filter),
+                GREMLIN.NEIGHBOR_EDGES: neighbor_edges,
+                }
 
-        # TODO: there's got to be a better way to do all of this string
-        # formatting
+        # or just the newest page of them
+        if page_size is not None:
+            script = gremlin_query.get_script(
+                    SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH_PAGE)
+            params[GREMLIN.PAGE_SIZE] = page_size
+            params[GREMLIN.BEFORE] = None if before is None else list(before)
 
-        # format the pruners and filter
-        edge_pruner = ",".join(["\"{0}\"".format(f) for f in edge_pruner])
+        return (script, params)
 
-        return_filter = ""
-        if node_return_filter:
-            return_filter = ".filter{{it.{0}.matches({1})}}".format(
-                    NODE_PROPERTY.TYPE,
-                    "\"{0}\"".format("|".join(node_return_filter)))
 
-        # all unique nodes depth 1 from start node with restrictions
-        start = "s=g.v({0}).transform{{[it, it.outE()]}}; ".format(
-                NODE_PROPERTY.ID)
-        path = """
-                n=g.v({0}).out({1}).dedup(){2}.transform{{[it, it.outE()]}};
-                """.format(
-                        NODE_PROPERTY.ID,
-                        edge_pruner,
-                        return_filter)
-        concat = "[s,n]"
-
-        # write a gremlin query and specify substitution fields
-        script = start + path + concat
+    def _query_read_nodes_from_immediate_paths(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            neighbor_edges=True,
+            callback=None):
+        """ Read and return depth-1 sets of Neo4j nodes for many start nodes.
+
+        Issue a single Gremlin script which walks the same depth-1 path as
+        _query_read_nodes_from_immediate_path() from every start node, so
+        a batch of N paths costs one round trip instead of N.
+
+        Required:
+        list    start_node_ids      ids of requested neo4j nodes
+        list    edge_pruner         edges to traverse (None=all)
+        list    node_return_filter  nodes to return (None=all)
+
+        Optional:
+        bool    neighbor_edges      whether neighbors come with their edges
+        func    callback            don't block; pass the paths to this instead
+
+        Return:
+        dict                        formatted paths keyed on start node id
+        {start_node_id: {depth: {node_id: node}}}
+
+        """
+
+        # one [start, neighbors] pair per existing start node
+        script = gremlin_query.get_script(
+                SCRIPT.READ_NODES_FROM_IMMEDIATE_PATHS)
 
         # specify substitution values for the gremlin query
-        params = {NODE_PROPERTY.ID: start_node_id}
+        params = {
+                GREMLIN.IDS: list(start_node_ids),
+                GREMLIN.EDGE_TYPES: self._bind_edge_pruner(edge_pruner),
+                GREMLIN.NODE_TYPES: self._bind_return_filter(
+                        node_return_filter),
+                GREMLIN.NEIGHBOR_EDGES: neighbor_edges,
+                }
 
-        # send a request to the database
-        response = self._gremlin(script, params)
+        # send a request to the database and format response as proper paths
+        return self._send(
+                script,
+                params,
+                response_parser.format_paths,
+                callback)
+
+
+    def _query_read_node_and_edges_async(self, node_id, callback):
+        """ Read a Neo4j node and its edges without blocking the IOLoop. """
+        self._query_read_node_and_edges(node_id, callback)
+
+
+    def _query_read_nodes_from_immediate_path_async(
+            self,
+            start_node_id,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            page_size=None,
+            before=None,
+            neighbor_edges=True):
+        """ Read a depth-1 set of Neo4j nodes without blocking the IOLoop. """
+        self._query_read_nodes_from_immediate_path(
+                start_node_id,
+                edge_pruner,
+                node_return_filter,
+                page_size=page_size,
+                before=before,
+                neighbor_edges=neighbor_edges,
+                callback=callback)
+
+
+    def _query_read_nodes_from_immediate_paths_async(
+            self,
+            start_node_ids,
+            edge_pruner,
+            node_return_filter,
+            callback,
+            neighbor_edges=True):
+        """ Read depth-1 sets of Neo4j nodes without blocking the IOLoop. """
+        self._query_read_nodes_from_immediate_paths(
+                start_node_ids,
+                edge_pruner,
+                node_return_filter,
+                neighbor_edges=neighbor_edges,
+                callback=callback)
+
+
+    def _send(self, script, params, format, callback=None):
+        """ Send a Gremlin request and format its response.
+
+        Block and return the formatted response, unless a callback is
+        given. In that case, return at once and pass the formatted
+        response to the callback when it arrives on the IOLoop.
 
-        # format response as a proper path
+        Required:
+        GremlinScript   script      registered gremlin script
+        dict            params      values bound to the script's parameters
+        func            format      response_parser function for the response
+
+        Optional:
+        func            callback    called with the formatted response
+
+        Return:
+        mixed           formatted response (None if a callback is given)
+
+        """
+        if callback is None:
+            return self._format_response(self._gremlin(script, params), format)
+
+        self._gremlin_async(
+                script,
+                params,
+                lambda response: callback(
+                        self._format_response(response, format)))
+
+
+    def _format_response(self, response, format):
+        """ Format a Gremlin response, which may be None. """
         if response is None:
             return None
         else:
-            return response_parser.format_path(response)
+            return format(response)
+
+
+    def _format_first_node(self, response):
+        """ Format the first node in a Gremlin response. """
+        return response_parser.format_node(response[0])
+
+
+    def _bind_edge_pruner(self, edge_pruner):
+        """ Return a list of edge types to bind as Gremlin out() arguments. """
+        # None is standard for specifying no pruner (or, traverse all types),
+        # and out() with no arguments traverses all types.
+        if edge_pruner is None:
+            return []
+
+        return list(edge_pruner)
+
+
+    def _bind_return_filter(self, node_return_filter):
+        """ Return a list of node types to bind for the Gremlin filter. """
+        # None is standard for specifying no filter (or, filter for all
+        # types), and a null filter lets every type through.
+        if not node_return_filter:
+            return None
+
+        return list(node_return_filter)
 
 
-    #@print_timing
     def _gremlin(self, script, params):
         """ POST a Gremlin JSON request to a URL and handle the response.
 
@@ -268,37 +589,278 @@ class Neo4jDatabase(SqDatabase):
         Gremlin path describes the database to send it to.
 
         Required:
-        str     script      gremlin script query
-        dict    params      paramters to substitute in script
+        GremlinScript   script      registered gremlin script
+        dict            params      values bound to the script's parameters
 
         Return:
-        json                unformatted HTTP response.
+        json                        unformatted HTTP response.
 
         Raises:
-        DbConnectionError   bad db connection
+        DbConnectionError           bad db connection
 
         """
-        request = urllib2.Request(
+        body = self._request_body(script, params)
+
+        with self._span(script):
+            start = time.time()
+            (status, serialized_response) = self._connect(body)
+            self._record_call(
+                    script,
+                    params,
+                    body,
+                    len(serialized_response),
+                    start)
+
+            return self._handle_gremlin_response(
+                    script,
+                    status,
+                    serialized_response)
+
+
+    def _gremlin_async(self, script, params, callback):
+        """ POST a Gremlin JSON request without blocking the IOLoop.
+
+        Behave like _gremlin(), but return at once and pass the
+        unformatted response to the callback when it arrives.
+
+        Required:
+        GremlinScript   script      registered gremlin script
+        dict            params      values bound to the script's parameters
+        func            callback    called with the unformatted response
+
+        Raises:
+        DbConnectionError           bad db connection (raised on the IOLoop)
+
+        """
+        body = self._request_body(script, params)
+        request = HTTPRequest(
                 self.base_url() + GREMLIN.PATH,
-                json.dumps({NEO4J.SCRIPT: script, NEO4J.PARAMS: params}))
-        request.add_header(GREMLIN.REQUEST_HEADER_TYPE, GREMLIN.REQUEST_HEADER)
+                method=GREMLIN.REQUEST_METHOD,
+                headers=self._headers,
+                body=body,
+                request_timeout=self._timeout)
+        span = self._span(script)
+        start = time.time()
+
+        def handle_response(response):
+            # no HTTP response code means we never heard from the database
+            if response.code == GREMLIN.NO_RESPONSE_CODE:
+                span.finish()
+                raise DbConnectionError(
+                        "ConnectionError: {0}".format(response.error))
+
+            self._record_call(
+                    script,
+                    params,
+                    body,
+                    len(response.body or ""),
+                    start)
+            with span:
+                deserialized = self._handle_gremlin_response(
+                        script,
+                        response.code,
+                        response.body)
+            callback(deserialized)
+
+        self.async_client().fetch(request, handle_response)
+
+
+    def _gremlin_stream(self, script, params, visit):
+        """ POST a Gremlin path request and parse the response as it's read.
+
+        Required:
+        GremlinScript   script      registered gremlin path script
+        dict            params      values bound to the script's parameters
+        func            visit       called with (depth, node) per node
+
+        Return:
+        bool                        whether the path was found
+
+        Raises:
+        DbConnectionError           bad db connection
+
+        """
+
+        body = self._request_body(script, params)
+        received = [0]
+
+        def stream(response):
+            parser = response_parser.PathStreamParser(visit)
+            chunk = response.read(GREMLIN.STREAM_CHUNK_SIZE)
+            while chunk:
+                received[0] += len(chunk)
+                parser.feed(chunk)
+                chunk = response.read(GREMLIN.STREAM_CHUNK_SIZE)
+            return parser
+
+        with self._span(script):
+            start = time.time()
+            (status, parser) = self.connection_pool().request(
+                    GREMLIN.REQUEST_METHOD,
+                    GREMLIN.PATH,
+                    body,
+                    self._headers,
+                    stream)
+            self._record_call(script, params, body, received[0], start)
+
+            return self._finish_stream(script, status, parser)
+
+
+    def _gremlin_stream_async(self, script, params, visit, callback):
+        """ POST a Gremlin path request and parse the response as it arrives.
+
+        Behave like _gremlin_stream(), but return at once, and call back
+        with whether the path was found once the response is complete.
+
+        Required:
+        GremlinScript   script      registered gremlin path script
+        dict            params      values bound to the script's parameters
+        func            visit       called with (depth, node) per node
+        func            callback    called with whether the path was found
+
+        Raises:
+        DbConnectionError           bad db connection (raised on the IOLoop)
+
+        """
+        parser = response_parser.PathStreamParser(visit)
+        body = self._request_body(script, params)
+        received = [0]
+
+        def feed(chunk):
+            received[0] += len(chunk)
+            parser.feed(chunk)
+
+        request = HTTPRequest(
+                self.base_url() + GREMLIN.PATH,
+                method=GREMLIN.REQUEST_METHOD,
+                headers=self._headers,
+                body=body,
+                request_timeout=self._timeout,
+                streaming_callback=feed)
+        span = self._span(script)
+        start = time.time()
+
+        def handle_response(response):
+            # no HTTP response code means we never heard from the database
+            if response.code == GREMLIN.NO_RESPONSE_CODE:
+                span.finish()
+                raise DbConnectionError(
+                        "ConnectionError: {0}".format(response.error))
+
+            self._record_call(script, params, body, received[0], start)
+            with span:
+                found = self._finish_stream(script, response.code, parser)
+            callback(found)
+
+        self.async_client().fetch(request, handle_response)
+
+
+    def _finish_stream(self, script, status, parser):
+        """ Check a streamed Gremlin path response and say if it was found.
+
+        Errors aren't paths, so the parser buffers them whole instead of
+        streaming them, and they are handled like any other response.
+
+        Required:
+        GremlinScript       script      registered gremlin path script
+        int                 status      HTTP status code
+        PathStreamParser    parser      parser the response was fed to
+
+        Return:
+        bool                            whether the path was found
+
+        Raises:
+        DbConnectionError               bad db connection
+
+        """
+        if status >= httplib.BAD_REQUEST or not parser.is_path():
+            response = self._handle_gremlin_response(
+                    script,
+                    status,
+                    parser.buffered_response())
+
+            if response is not None:
+                raise DbConnectionError(
+                        "UnexpectedResponse: {0}".format(response))
+
+            return False
 
-        serialized_response = None
         try:
-            serialized_response = self._connect(request)
-        except (urllib2.HTTPError) as err:
+            parser.close()
+        except ValueError as err:
+            raise DbConnectionError("ResponseError: {0}".format(err))
+
+        return True
+
+
+    def _span(self, script):
+        """ Start and return an instrumentation Span for a Gremlin call. """
+        return instrumentation.span(GREMLIN.SPAN.format(script.name()))
+
+
+    def _record_call(self, script, params, body, received, start):
+        """ Count a Gremlin call, the bytes it sent and received, and its
+        time since start, logging it if it was slow. """
+        instrumentation.count(GREMLIN.CALLS_EVENT)
+        instrumentation.count(GREMLIN.BYTES_SENT_EVENT, len(body))
+        instrumentation.count(GREMLIN.BYTES_RECEIVED_EVENT, received)
+
+        query_log.record(script, params, time.time() - start, received)
+
+
+    def _request_body(self, script, params):
+        """ Serialize a registered script and its bound parameters. """
+        return json.dumps({
+                NEO4J.SCRIPT: script.text(),
+                NEO4J.PARAMS: script.bind(params),
+                })
+
+
+    def async_client(self):
+        """ Return this database's AsyncHTTPClient, creating it if needed.
+
+        Tornado shares one AsyncHTTPClient per IOLoop by default, and only
+        the first max_clients it's constructed with counts. Each database
+        gets a client of its own instead, so max_connections limits its
+        non-blocking requests whatever else is fetching on the IOLoop.
+
+        """
+        io_loop = IOLoop.instance()
+
+        if (self._async_client is None
+                or self._async_client.io_loop is not io_loop):
+            self._async_client = AsyncHTTPClient(
+                    io_loop,
+                    max_clients=self._max_connections,
+                    force_instance=True)
+
+        return self._async_client
+
+
+    def _handle_gremlin_response(self, script, status, serialized_response):
+        """ Check a Gremlin HTTP response for errors and deserialize it.
+
+        Required:
+        GremlinScript   script              registered gremlin script
+        int             status              HTTP status code
+        str             serialized_response HTTP response body
+
+        Return:
+        json                                unformatted HTTP response.
+
+        Raises:
+        DbConnectionError                   bad db connection
+
+        """
+        if status >= httplib.BAD_REQUEST:
             # object not found
-            if self._isNeo4jNullPointerError(err):
-                print("Neo4j Null Pointer error caught. Returning None.")
-                print("CURRENTLY THE INDEX ISN'T WORKING...PROLLY.")
-                print script
+            if self._isNeo4jNullPointerError(serialized_response):
+                query_log.log_error(script, GREMLIN.NULL_ERROR)
                 return None
-            # some other type of HTTPError
+            # some other type of HTTP error
             else:
-                raise DbConnectionError("HTTPError: {0}".format(err.read()))
-        except (urllib2.URLError) as err:
-            # a URLError without an HTTP response code
-            raise DbConnectionError("URLError: {0}".format(err.reason))
+                raise DbConnectionError(
+                        "HTTPError: {0}".format(serialized_response))
 
         response = None
         # input failed
@@ -312,25 +874,34 @@ class Neo4jDatabase(SqDatabase):
         return response
 
 
-    def _connect(self, request):
-        """ Connect to the database by opening the request.
+    def _connect(self, body):
+        """ Connect to the database by POSTing the request body.
 
         Required:
-        urllib2.Request     request     The URL Request.
+        str     body        serialized JSON request
 
         Return:
-        str                 serialized_response     response data
+        tuple               (int, str) => (status, serialized_response)
 
-        """
-        serialized_response = urllib2.urlopen(request).read()
+        Raises:
+        DbConnectionError   the request could not be completed
 
-        return serialized_response
+        """
+        return self.connection_pool().request(
+                GREMLIN.REQUEST_METHOD,
+                GREMLIN.PATH,
+                body,
+                self._headers)
 
 
-    def _isNeo4jNullPointerError(self, error):
+    def _isNeo4jNullPointerError(self, serialized_error):
         """ Check if the error is a Neo4j Null Pointer Error. """
-        error_dict = json.loads(error.read())
-        error_msg = error_dict[GREMLIN.ERROR_MESSAGE]
+        try:
+            error_dict = json.loads(serialized_error)
+            error_msg = error_dict[GREMLIN.ERROR_MESSAGE]
+        except (ValueError, KeyError, TypeError):
+            return False
+
         if GREMLIN.BASE_ERROR + GREMLIN.NULL_ERROR in error_msg:
             return True
         else:
@@ -341,6 +912,9 @@ class SecureNeo4jDatabase(Neo4jDatabase):
 
     """ Implement a secure version of Neo4jDatabase.
 
+    The Authorization header is computed once and sent preemptively
+    with every pooled request, rather than waiting on a challenge.
+
     Variables:
     str _username   the username to connect to the url of the database.
     str _password   the password to connect to the url of the database.
@@ -348,43 +922,26 @@ class SecureNeo4jDatabase(Neo4jDatabase):
     """
 
 
-    def __init__(self, host, port, username, password):
+    def __init__(
+            self,
+            host,
+            port,
+            username,
+            password,
+            max_connections=10,
+            idle_timeout=30,
+            timeout=30):
         """ Construct a SecureNeo4jDatabase. """
-        super(SecureNeo4jDatabase, self).__init__(host, port)
+        super(SecureNeo4jDatabase, self).__init__(
+                host,
+                port,
+                max_connections,
+                idle_timeout,
+                timeout)
         self._username = username
         self._password = password
 
-
-    def _connect(self, request):
-        """ Connect to the secured database by opening the request.
-
-        Required:
-        urllib2.Request     request     The URL Request.
-
-        Return:
-        str                 serialized_response     response data
-
-        """
-        # create a password manager
-        password_mgr = urllib2.HTTPPasswordMgrWithDefaultRealm()
-
-        # Add the username and password.
-        # If we knew the realm, we could use it instead of None.
-        password_mgr.add_password(
-                None,
-                self.base_url(),
-                self._username,
-                self._password)
-
-        handler = urllib2.HTTPBasicAuthHandler(password_mgr)
-
-        # create "opener" (OpenerDirector instance)
-        opener = urllib2.build_opener(handler)
-
-        # Install the opener.
-        # Now all calls to urllib2.urlopen use our opener.
-        urllib2.install_opener(opener)
-
-        serialized_response = urllib2.urlopen(request).read()
-
-        return serialized_response
+        credentials = base64.b64encode(
+                "{0}:{1}".format(self._username, self._password))
+        self._headers[GREMLIN.AUTH_HEADER_TYPE] = GREMLIN.AUTH_HEADER.format(
+                credentials)
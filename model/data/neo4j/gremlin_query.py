@@ -3,7 +3,24 @@
 Generate reusable components of Gremlin queries and build full scripts
 for issuing calls to a Neo4j graph database.
 
+Every script we send is registered here once, by name, with all of its
+inputs as bound parameters. The script text never changes from call to
+call, so the Gremlin plugin compiles each script once and reuses it
+instead of compiling (and caching) a new script for every value.
+
+Provides:
+    class GremlinScript
+    def register_script
+    def get_script
+    def get_scripts
+
 """
+import hashlib
+
+from model.constants import NODE_PROPERTY, EDGE_PROPERTY
+from model.data.data_errors import DbInputError
+
+from constants import GREMLIN, SCRIPT
 
 
 def and_then():
@@ -166,3 +183,256 @@ def has_property(key, value):
 
 def collection(list):
     return "[{0}]".format(all(list))
+
+
+class GremlinScript(object):
+
+    """ A named Gremlin script whose inputs are all bound parameters.
+
+    The script's hash is computed once, when it's registered, so that
+    callers can identify a script without rehashing its text.
+
+    Variables:
+    str         _name           the name the script is registered under
+    str         _text           the Gremlin script itself
+    frozenset   _param_names    names of the script's bound parameters
+    str         _hash           hex digest of the script text
+
+    """
+
+
+    def __init__(self, name, text, param_names):
+        """ Construct a GremlinScript.
+
+        Required:
+        str     name            the name to register the script under
+        str     text            the Gremlin script itself
+        list    param_names     names of the script's bound parameters
+
+        """
+        self._name = name
+        self._text = text
+        self._param_names = frozenset(param_names)
+        self._hash = hashlib.sha1(text).hexdigest()
+
+
+    def name(self):
+        """ Return the name this script is registered under. """
+        return self._name
+
+
+    def text(self):
+        """ Return the Gremlin script text. """
+        return self._text
+
+
+    def hash(self):
+        """ Return the cached hex digest of the script text. """
+        return self._hash
+
+
+    def param_names(self):
+        """ Return the names of this script's bound parameters. """
+        return self._param_names
+
+
+    def bind(self, params):
+        """ Return params if they bind exactly this script's parameters.
+
+        Required:
+        dict    params      values keyed on bound parameter name
+
+        Return:
+        dict                the same params
+
+        Raises:
+        DbInputError        a parameter is missing or unexpected
+
+        """
+        names = set(params.keys())
+
+        for name in self._param_names - names:
+            raise DbInputError(name, None, "Missing Gremlin parameter.")
+
+        for name in names - self._param_names:
+            raise DbInputError(
+                    name,
+                    params[name],
+                    "Unexpected Gremlin parameter.")
+
+        return params
+
+
+# GremlinScripts keyed on name
+_scripts = {}
+
+
+def register_script(name, text, param_names):
+    """ Register and return a GremlinScript.
+
+    Required:
+    str     name            the name to register the script under
+    str     text            the Gremlin script itself
+    list    param_names     names of the script's bound parameters
+
+    Return:
+    GremlinScript           the registered script
+
+    Raises:
+    DbInputError            another script is registered under name
+
+    """
+    if name in _scripts:
+        raise DbInputError("name", name, "Gremlin script already exists.")
+
+    script = GremlinScript(name, text, param_names)
+    _scripts[name] = script
+
+    return script
+
+
+def get_script(name):
+    """ Return the GremlinScript registered under a name. """
+    return _scripts[name]
+
+
+def get_scripts():
+    """ Return every registered GremlinScript. """
+    return _scripts.values()
+
+
+# the vertex or vertices in a pipe, each with its outgoing edges
+# [ { v }, [ { e }, ..., { e } ] ]
+_WITH_OUT_EDGES = "transform{[it, it.outE()]}"
+
+# keep only vertices of the bound node types (null keeps all types)
+_NODE_TYPE_FILTER = "filter{{{0} == null || {0}.contains(it.{1})}}".format(
+        GREMLIN.NODE_TYPES,
+        NODE_PROPERTY.TYPE)
+
+# a neighbor with its outgoing edges, or with none unless they're asked for
+_NEIGHBOR_AND_OUT_EDGES = "[it, {0} ? it.outE().toList() : []]".format(
+        GREMLIN.NEIGHBOR_EDGES)
+
+# a start vertex with its outgoing edges, or with only the traversed ones
+# when the neighbors come without theirs
+_START_AND_OUT_EDGES = "[it, {0} ? it.outE().toList() : {1}]".format(
+        GREMLIN.NEIGHBOR_EDGES,
+        "it.outE(*{0}).toList()".format(GREMLIN.EDGE_TYPES))
+
+# unique neighbors of the bound edge types (no types means all types)
+_NEIGHBORS = "out(*{0}).dedup().{1}.transform{{{2}}}".format(
+        GREMLIN.EDGE_TYPES,
+        _NODE_TYPE_FILTER,
+        _NEIGHBOR_AND_OUT_EDGES)
+
+# a missing node id on either end of an edge means the new vertex
+_ENDPOINT = "(it.{0} == null ? v : g.v(it.{0}))"
+
+
+register_script(
+        SCRIPT.CREATE_NODE,
+        "g.addVertex({0}).{1}".format(
+                NODE_PROPERTY.PROPERTIES,
+                _WITH_OUT_EDGES),
+        [NODE_PROPERTY.PROPERTIES])
+
+register_script(
+        SCRIPT.CREATE_EDGE,
+        "g.addEdge(g.v({0}), g.v({1}), {2}, {3})".format(
+                EDGE_PROPERTY.FROM_NODE_ID,
+                EDGE_PROPERTY.TO_NODE_ID,
+                EDGE_PROPERTY.TYPE,
+                EDGE_PROPERTY.PROPERTIES),
+        [
+                EDGE_PROPERTY.FROM_NODE_ID,
+                EDGE_PROPERTY.TO_NODE_ID,
+                EDGE_PROPERTY.TYPE,
+                EDGE_PROPERTY.PROPERTIES,
+                ])
+
+register_script(
+        SCRIPT.CREATE_NODE_AND_EDGES,
+        "v = g.addVertex({0}); e = {1}; [v, e]".format(
+                NODE_PROPERTY.PROPERTIES,
+                "{0}.collect{{g.addEdge({1}, {2}, it.{3}, it.{4})}}".format(
+                        GREMLIN.EDGES,
+                        _ENDPOINT.format(EDGE_PROPERTY.FROM_NODE_ID),
+                        _ENDPOINT.format(EDGE_PROPERTY.TO_NODE_ID),
+                        EDGE_PROPERTY.TYPE,
+                        EDGE_PROPERTY.PROPERTIES)),
+        [NODE_PROPERTY.PROPERTIES, GREMLIN.EDGES])
+
+register_script(
+        SCRIPT.READ_NODE_AND_EDGES,
+        "g.v({0}).{1}".format(NODE_PROPERTY.ID, _WITH_OUT_EDGES),
+        [NODE_PROPERTY.ID])
+
+register_script(
+        SCRIPT.READ_NODES_BY_INDEX,
+        "g.idx({0}).get({1}, {2})._().{3}.{4}".format(
+                GREMLIN.INDEX,
+                GREMLIN.KEY,
+                GREMLIN.VALUE,
+                _NODE_TYPE_FILTER,
+                _WITH_OUT_EDGES),
+        [GREMLIN.INDEX, GREMLIN.KEY, GREMLIN.VALUE, GREMLIN.NODE_TYPES])
+
+register_script(
+        SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH,
+        "s = g.v({0}).transform{{{1}}}; n = g.v({0}).{2}; [s, n]".format(
+                NODE_PROPERTY.ID,
+                _START_AND_OUT_EDGES,
+                _NEIGHBORS),
+        [
+                NODE_PROPERTY.ID,
+                GREMLIN.EDGE_TYPES,
+                GREMLIN.NODE_TYPES,
+                GREMLIN.NEIGHBOR_EDGES,
+                ])
+
+# the newest page of neighbors strictly before the bound (created_ts, id)
+# cursor. the start vertex only comes with its edges to the page, so the
+# response doesn't grow with the total number of neighbors.
+register_script(
+        SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH_PAGE,
+        "s = g.v({0}); n = {1}; [{2}, {3}]".format(
+                NODE_PROPERTY.ID,
+                "s.out(*{0}).dedup().{1}.filter{{{2}}}.toList(){3}{4}".format(
+                        GREMLIN.EDGE_TYPES,
+                        _NODE_TYPE_FILTER,
+                        "{0} == null || it.{1} < {0}[0] || "
+                        "(it.{1} == {0}[0] && it.id < {0}[1])".format(
+                                GREMLIN.BEFORE,
+                                NODE_PROPERTY.CREATED_TS),
+                        ".sort{{a, b -> b.{0} <=> a.{0} ?: b.id <=> a.id}}"
+                        .format(NODE_PROPERTY.CREATED_TS),
+                        ".take({0})".format(GREMLIN.PAGE_SIZE)),
+                "[[s, s.outE(*{0}).filter{{{1}}}.toList()]]".format(
+                        GREMLIN.EDGE_TYPES,
+                        "n.contains(it.inV().next())"),
+                "n.collect{{{0}}}".format(_NEIGHBOR_AND_OUT_EDGES)),
+        [
+                NODE_PROPERTY.ID,
+                GREMLIN.EDGE_TYPES,
+                GREMLIN.NODE_TYPES,
+                GREMLIN.PAGE_SIZE,
+                GREMLIN.BEFORE,
+                GREMLIN.NEIGHBOR_EDGES,
+                ])
+
+# one [start, neighbors] pair per existing start node. the pipes are
+# explicitly iterated since they are nested inside a collection.
+register_script(
+        SCRIPT.READ_NODES_FROM_IMMEDIATE_PATHS,
+        "{0}.findAll{{g.v(it) != null}}.collect{{s -> [{1}, {2}]}}".format(
+                GREMLIN.IDS,
+                "g.v(s).transform{{{0}}}.toList()".format(
+                        _START_AND_OUT_EDGES),
+                "g.v(s).{0}.toList()".format(_NEIGHBORS)),
+        [
+                GREMLIN.IDS,
+                GREMLIN.EDGE_TYPES,
+                GREMLIN.NODE_TYPES,
+                GREMLIN.NEIGHBOR_EDGES,
+                ])
@@ -0,0 +1,589 @@
+""" Module: local_server
+
+Serve the Gremlin endpoint that Neo4jDatabase talks to from a graph held
+in memory, so the whole stack can be run and benchmarked without Neo4j.
+
+Only the scripts registered in gremlin_query are understood. A request
+is matched to its script by the script text. The script is then run
+natively against a MemoryGraph, and the response has the same JSON
+shapes as Neo4j's REST API: a vertex is {self, data} and an edge is
+{self, data, start, end, type}. A missing vertex gets the same
+NullPointerException error Neo4j sends.
+
+Every request is counted by script name, so that callers can see how
+many round trips an operation costs.
+
+Run `python -m model.data.neo4j.local_server [port]` to serve an empty
+graph on the local database's port.
+
+Provides:
+    class MemoryGraph
+    class GremlinServer
+
+"""
+import BaseHTTPServer
+import SocketServer
+import collections
+import json
+import sys
+import threading
+
+from model.constants import NODE_PROPERTY, EDGE_PROPERTY
+
+from constants import NEO4J, NEO4J_INDEX, GREMLIN, SCRIPT
+import gremlin_query
+
+
+# port of the local database in model.data.settings
+DEFAULT_PORT = 7474
+
+# Neo4j's REST paths to a vertex and an edge, below the base url
+VERTEX_PATH = "/db/data/node/{0}"
+EDGE_PATH = "/db/data/relationship/{0}"
+
+# an error which isn't a missing vertex, so the client raises it
+SCRIPT_ERROR = "unsupported Gremlin script"
+
+
+class NullPointerError(Exception):
+
+    """ A script asked for a vertex which doesn't exist. """
+
+
+class MemoryGraph(object):
+
+    """ MemoryGraph runs the registered Gremlin scripts on python dicts.
+
+    Each script runs under a lock, so it sees and leaves the graph whole,
+    like a script running in its own Neo4j transaction.
+
+    Variables:
+    str     _base_url       url of the server the graph is served from
+    dict    _vertices       properties keyed on vertex id
+    dict    _out_edges      edge ids in creation order keyed on vertex id
+    dict    _edges          (from id, to id, type, properties) keyed on id
+    dict    _index          sets of vertex ids keyed on (key, value)
+    int     _next_vertex_id id of the next vertex added
+    int     _next_edge_id   id of the next edge added
+    dict    _scripts        methods running scripts keyed on script name
+    Lock    _lock           guard for the whole graph
+
+    """
+
+
+    def __init__(self, base_url):
+        """ Construct an empty MemoryGraph.
+
+        Required:
+        str     base_url    url of the server the graph is served from
+
+        """
+        self._base_url = base_url
+        self._vertices = {}
+        self._out_edges = {}
+        self._edges = {}
+        self._index = {}
+        self._next_vertex_id = 1
+        self._next_edge_id = 1
+        self._lock = threading.Lock()
+
+        self._scripts = {
+                SCRIPT.CREATE_NODE: self._create_node,
+                SCRIPT.CREATE_EDGE: self._create_edge,
+                SCRIPT.CREATE_NODE_AND_EDGES: self._create_node_and_edges,
+                SCRIPT.READ_NODE_AND_EDGES: self._read_node_and_edges,
+                SCRIPT.READ_NODES_BY_INDEX: self._read_nodes_by_index,
+                SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH: self._read_path,
+                SCRIPT.READ_NODES_FROM_IMMEDIATE_PATH_PAGE:
+                        self._read_path_page,
+                SCRIPT.READ_NODES_FROM_IMMEDIATE_PATHS: self._read_paths,
+                }
+
+
+    def vertex_count(self):
+        """ Return the number of vertices in the graph. """
+        return len(self._vertices)
+
+
+    def edge_count(self):
+        """ Return the number of edges in the graph. """
+        return len(self._edges)
+
+
+    def execute(self, name, params):
+        """ Run a registered script and return its unserialized response.
+
+        Required:
+        str     name        name of the registered script
+        dict    params      values bound to the script's parameters
+
+        Return:
+        mixed               the response, shaped like Neo4j's
+
+        Raises:
+        NullPointerError    the script asked for a missing vertex
+        KeyError            the script isn't supported
+
+        """
+        script = self._scripts[name]
+
+        with self._lock:
+            return script(params)
+
+
+    def _create_node(self, params):
+        """ g.addVertex(properties) with its (no) out edges. """
+        vertex_id = self._add_vertex(params[NODE_PROPERTY.PROPERTIES])
+        return [self._pair(vertex_id)]
+
+
+    def _create_edge(self, params):
+        """ g.addEdge(g.v(from), g.v(to), type, properties) """
+        from_id = self._vertex_id(params[EDGE_PROPERTY.FROM_NODE_ID])
+        to_id = self._vertex_id(params[EDGE_PROPERTY.TO_NODE_ID])
+
+        edge_id = self._add_edge(
+                from_id,
+                to_id,
+                params[EDGE_PROPERTY.TYPE],
+                params[EDGE_PROPERTY.PROPERTIES])
+
+        return self._edge(edge_id)
+
+
+    def _create_node_and_edges(self, params):
+        """ A new vertex and its edges, where a null end is the vertex. """
+        edges = params[GREMLIN.EDGES]
+
+        # check every end first so that a bad edge leaves nothing behind
+        ends = []
+        for edge in edges:
+            ends.append([None if edge.get(key) is None
+                    else self._vertex_id(edge[key])
+                    for key in (
+                            EDGE_PROPERTY.FROM_NODE_ID,
+                            EDGE_PROPERTY.TO_NODE_ID)])
+
+        vertex_id = self._add_vertex(params[NODE_PROPERTY.PROPERTIES])
+
+        edge_ids = []
+        for (edge, (from_id, to_id)) in zip(edges, ends):
+            edge_ids.append(self._add_edge(
+                    vertex_id if from_id is None else from_id,
+                    vertex_id if to_id is None else to_id,
+                    edge[EDGE_PROPERTY.TYPE],
+                    edge.get(EDGE_PROPERTY.PROPERTIES, {})))
+
+        return [self._vertex(vertex_id), [self._edge(e) for e in edge_ids]]
+
+
+    def _read_node_and_edges(self, params):
+        """ g.v(id) with its out edges. """
+        vertex_id = self._vertex_id(params[NODE_PROPERTY.ID])
+        return [self._pair(vertex_id)]
+
+
+    def _read_nodes_by_index(self, params):
+        """ Vertices with an indexed property value, of the bound types. """
+        if params[GREMLIN.INDEX] != NEO4J_INDEX.NODES:
+            return []
+
+        try:
+            vertex_ids = self._index.get(
+                    (params[GREMLIN.KEY], params[GREMLIN.VALUE]),
+                    ())
+        except TypeError:
+            # unhashable values, like lists, are never indexed
+            return []
+
+        node_types = params[GREMLIN.NODE_TYPES]
+
+        return [self._pair(v) for v in sorted(vertex_ids)
+                if self._is_type(v, node_types)]
+
+
+    def _read_path(self, params):
+        """ [[start], [unique neighbors]] with their out edges. """
+        vertex_id = self._vertex_id(params[NODE_PROPERTY.ID])
+
+        neighbor_ids = self._neighbor_ids(
+                vertex_id,
+                params[GREMLIN.EDGE_TYPES],
+                params[GREMLIN.NODE_TYPES])
+
+        return [
+                [self._start(vertex_id, params)],
+                self._neighbors(neighbor_ids, params),
+                ]
+
+
+    def _read_path_page(self, params):
+        """ The newest page of neighbors before a (created_ts, id) cursor.
+
+        The start vertex only comes with its edges to the page.
+
+        """
+        vertex_id = self._vertex_id(params[NODE_PROPERTY.ID])
+        edge_types = params[GREMLIN.EDGE_TYPES]
+        before = params[GREMLIN.BEFORE]
+
+        neighbor_ids = self._neighbor_ids(
+                vertex_id,
+                edge_types,
+                params[GREMLIN.NODE_TYPES])
+
+        if before is not None:
+            before = tuple(before)
+            neighbor_ids = [n for n in neighbor_ids
+                    if self._page_key(n) < before]
+
+        neighbor_ids.sort(key=self._page_key, reverse=True)
+        page_ids = neighbor_ids[:params[GREMLIN.PAGE_SIZE]]
+
+        page = set(page_ids)
+        start_edges = [self._edge(e) for e in self._out_edges[vertex_id]
+                if self._edges[e][1] in page
+                and self._is_traversed(e, edge_types)]
+
+        return [
+                [[self._vertex(vertex_id), start_edges]],
+                self._neighbors(page_ids, params),
+                ]
+
+
+    def _read_paths(self, params):
+        """ One [[start], [unique neighbors]] pair per existing start. """
+        edge_types = params[GREMLIN.EDGE_TYPES]
+        node_types = params[GREMLIN.NODE_TYPES]
+
+        paths = []
+        for vertex_id in params[GREMLIN.IDS]:
+            try:
+                vertex_id = self._vertex_id(vertex_id)
+            except NullPointerError:
+                continue
+
+            neighbor_ids = self._neighbor_ids(
+                    vertex_id,
+                    edge_types,
+                    node_types)
+
+            paths.append([
+                    [self._start(vertex_id, params)],
+                    self._neighbors(neighbor_ids, params),
+                    ])
+
+        return paths
+
+
+    def _add_vertex(self, properties):
+        """ Store and index a vertex and return its id. """
+        vertex_id = self._next_vertex_id
+        self._next_vertex_id += 1
+
+        self._vertices[vertex_id] = dict(properties)
+        self._out_edges[vertex_id] = []
+
+        # like Neo4j's automatic vertices index, index every property
+        for item in properties.items():
+            try:
+                self._index.setdefault(item, set()).add(vertex_id)
+            except TypeError:
+                pass
+
+        return vertex_id
+
+
+    def _add_edge(self, from_id, to_id, type, properties):
+        """ Store an edge and return its id. """
+        edge_id = self._next_edge_id
+        self._next_edge_id += 1
+
+        self._edges[edge_id] = (from_id, to_id, type, dict(properties))
+        self._out_edges[from_id].append(edge_id)
+
+        return edge_id
+
+
+    def _vertex_id(self, vertex_id):
+        """ Return a vertex id, or raise NullPointerError if it's missing.
+
+        Like g.v(), accept an id given as a numeric string.
+
+        """
+        try:
+            vertex_id = int(vertex_id)
+        except (TypeError, ValueError):
+            raise NullPointerError(vertex_id)
+
+        if vertex_id not in self._vertices:
+            raise NullPointerError(vertex_id)
+        return vertex_id
+
+
+    def _is_type(self, vertex_id, node_types):
+        """ Return whether a vertex passes a node type filter. """
+        return (node_types is None or
+                self._vertices[vertex_id].get(NODE_PROPERTY.TYPE)
+                in node_types)
+
+
+    def _is_traversed(self, edge_id, edge_types):
+        """ Return whether out(*edge_types) follows an edge. """
+        return not edge_types or self._edges[edge_id][2] in edge_types
+
+
+    def _neighbor_ids(self, vertex_id, edge_types, node_types):
+        """ Return out(*edge_types).dedup() passing the type filter. """
+        neighbor_ids = []
+        seen = set()
+
+        for edge_id in self._out_edges[vertex_id]:
+            if not self._is_traversed(edge_id, edge_types):
+                continue
+
+            to_id = self._edges[edge_id][1]
+            if to_id not in seen:
+                seen.add(to_id)
+                if self._is_type(to_id, node_types):
+                    neighbor_ids.append(to_id)
+
+        return neighbor_ids
+
+
+    def _page_key(self, vertex_id):
+        """ Return the (created_ts, id) a vertex is paged by. """
+        return (
+                self._vertices[vertex_id].get(NODE_PROPERTY.CREATED_TS),
+                vertex_id)
+
+
+    def _pair(self, vertex_id):
+        """ Return [vertex, [out edges]] as Neo4j serializes them. """
+        return [
+                self._vertex(vertex_id),
+                [self._edge(e) for e in self._out_edges[vertex_id]],
+                ]
+
+
+    def _start(self, vertex_id, params):
+        """ Return a start vertex as Neo4j serializes it, with only its
+        traversed out edges if its neighbors come without theirs. """
+        if params[GREMLIN.NEIGHBOR_EDGES]:
+            return self._pair(vertex_id)
+        return [
+                self._vertex(vertex_id),
+                [self._edge(e) for e in self._out_edges[vertex_id]
+                        if self._is_traversed(e, params[GREMLIN.EDGE_TYPES])],
+                ]
+
+
+    def _neighbors(self, vertex_ids, params):
+        """ Return neighbors as Neo4j serializes them, with out edges only
+        if the script was asked for them. """
+        if params[GREMLIN.NEIGHBOR_EDGES]:
+            return [self._pair(v) for v in vertex_ids]
+        return [[self._vertex(v), []] for v in vertex_ids]
+
+
+    def _vertex(self, vertex_id):
+        """ Return a vertex as Neo4j serializes it. """
+        return {
+                NEO4J.SELF: self._vertex_url(vertex_id),
+                NEO4J.DATA: self._vertices[vertex_id],
+                }
+
+
+    def _edge(self, edge_id):
+        """ Return an edge as Neo4j serializes it. """
+        (from_id, to_id, type, properties) = self._edges[edge_id]
+        return {
+                NEO4J.SELF: self._base_url + EDGE_PATH.format(edge_id),
+                NEO4J.DATA: properties,
+                NEO4J.START: self._vertex_url(from_id),
+                NEO4J.END: self._vertex_url(to_id),
+                NEO4J.TYPE: type,
+                }
+
+
+    def _vertex_url(self, vertex_id):
+        """ Return the REST url of a vertex. """
+        return self._base_url + VERTEX_PATH.format(vertex_id)
+
+
+class GremlinServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    """ GremlinServer serves a MemoryGraph at the Gremlin plugin's path.
+
+    Requests are served on their own threads and connections are kept
+    alive, like Neo4j's, so pooled and async clients behave as usual.
+
+    Variables:
+    MemoryGraph _graph          the graph scripts are run against
+    dict        _script_names   script names keyed on script text
+    Counter     _round_trips    requests served keyed on script name
+    Lock        _stats_lock     guard for the round trip counts
+    Thread      _thread         thread serving requests, once started
+
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+    def __init__(self, host="localhost", port=DEFAULT_PORT):
+        """ Construct a GremlinServer with an empty graph.
+
+        Optional:
+        str     host    host to listen on
+        int     port    port to listen on, or 0 for any free port
+
+        """
+        BaseHTTPServer.HTTPServer.__init__(
+                self,
+                (host, port),
+                _GremlinRequestHandler)
+
+        self._graph = MemoryGraph(self.base_url())
+        self._script_names = dict(
+                (s.text(), s.name()) for s in gremlin_query.get_scripts())
+        self._round_trips = collections.Counter()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+
+    def host(self):
+        """ Return the host this server listens on. """
+        return self.server_address[0]
+
+
+    def port(self):
+        """ Return the port this server listens on. """
+        return self.server_address[1]
+
+
+    def base_url(self):
+        """ Return the base url of this server. """
+        return "http://{0}:{1}".format(self.host(), self.port())
+
+
+    def graph(self):
+        """ Return the MemoryGraph this server serves. """
+        return self._graph
+
+
+    def start(self):
+        """ Serve requests on a background thread and return this server. """
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        """ Stop serving requests and close the listening socket. """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+
+    def round_trips(self):
+        """ Return the requests served since the last reset, by script. """
+        with self._stats_lock:
+            return dict(self._round_trips)
+
+
+    def reset_round_trips(self):
+        """ Forget the requests served so far. """
+        with self._stats_lock:
+            self._round_trips.clear()
+
+
+    def execute(self, body):
+        """ Run the script in a Gremlin request body.
+
+        Required:
+        str     body    serialized {script, params} request
+
+        Return:
+        tuple           (int, str) => (status, serialized_response)
+
+        """
+        try:
+            request = json.loads(body)
+            name = self._script_names.get(request[NEO4J.SCRIPT])
+            params = request.get(NEO4J.PARAMS) or {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._error(GREMLIN.INPUT_ERROR)
+
+        with self._stats_lock:
+            self._round_trips[name] += 1
+
+        if name is None:
+            return self._error(SCRIPT_ERROR)
+
+        try:
+            response = self._graph.execute(name, params)
+        except NullPointerError:
+            return self._error(GREMLIN.NULL_ERROR)
+        except (KeyError, TypeError, ValueError) as err:
+            return self._error("{0}: {1}".format(SCRIPT_ERROR, err))
+
+        return (200, json.dumps(response))
+
+
+    def _error(self, reason):
+        """ Return a (status, response) pair for a Gremlin error. """
+        return (400, json.dumps({
+                GREMLIN.ERROR_MESSAGE: GREMLIN.BASE_ERROR + reason,
+                "exception": "BadInputException",
+                "stacktrace": [],
+                }))
+
+
+class _GremlinRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    """ Answer Gremlin requests for a GremlinServer. """
+
+    protocol_version = "HTTP/1.1"
+
+    # responses are written as headers then body, which Nagle's algorithm
+    # would hold up waiting on the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+
+    def do_POST(self):
+        """ Run a Gremlin script and write its response. """
+        length = int(self.headers.getheader("Content-Length") or 0)
+        body = self.rfile.read(length)
+
+        if self.path != GREMLIN.PATH:
+            self._respond(404, "")
+            return
+
+        (status, response) = self.server.execute(body)
+        self._respond(status, response)
+
+
+    def _respond(self, status, response):
+        """ Write a JSON response. """
+        self.send_response(status)
+        self.send_header(GREMLIN.REQUEST_HEADER_TYPE, GREMLIN.REQUEST_HEADER)
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+
+    def log_message(self, format, *args):
+        """ Don't log every request. """
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = GremlinServer(port=port)
+    print "Serving an in-memory Gremlin graph at {0}.".format(
+            server.base_url())
+    server.serve_forever()
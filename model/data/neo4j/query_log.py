@@ -0,0 +1,289 @@
+""" Module: query_log
+
+Time and count every Gremlin call by fingerprint, and log slow ones.
+
+A call's fingerprint identifies its script template with the parameters
+stripped. Every input to a registered GremlinScript is a bound parameter,
+so the fingerprint is a prefix of the script's hash, and every call of a
+script shares one, whatever values it's called with.
+
+Calls taking at least settings.slow_query's THRESHOLD seconds are written
+to the slow query log, one JSON object per line, with their parameters
+and response size. Gremlin errors the database recovers from are written
+there too.
+
+Run `python -m model.data.neo4j.query_log slow_query.log` to rank the
+fingerprints in a slow query log by total time. With a THRESHOLD of 0,
+that's every call.
+
+Provides:
+    class QueryStats
+    def fingerprint
+    def record
+    def log_error
+    def stats
+    def reset
+    def format_report
+    def read_log
+
+"""
+import json
+import logging
+import sys
+import threading
+import time
+
+from model.data import settings
+from model.data.constants import SETTING
+
+
+# hex digits of a script's hash kept in its fingerprint
+FINGERPRINT_LENGTH = 12
+
+# the logger slow calls are written to
+LOGGER_NAME = "boilerplate.slow_query"
+
+# keys of each JSON object in the slow query log
+TIME = "time"
+SCRIPT = "script"
+FINGERPRINT = "fingerprint"
+MS = "ms"
+RESPONSE_BYTES = "response_bytes"
+PARAMS = "params"
+ERROR = "error"
+
+_logger = logging.getLogger(LOGGER_NAME)
+
+# guards _stats and _log_file
+_lock = threading.Lock()
+
+# QueryStats keyed on fingerprint
+_stats = {}
+
+# the LOG_FILE _logger is writing to, once it has a handler for it
+_log_file = None
+
+
+class QueryStats(object):
+
+    """ QueryStats sums up the calls of one fingerprinted Gremlin script.
+
+    Variables:
+    str     name            name the script is registered under
+    str     fingerprint     the script's fingerprint
+    int     calls           number of calls
+    float   seconds         total seconds taken by all calls
+    float   max_seconds     seconds taken by the slowest call
+    int     response_bytes  total size of all responses
+    int     slow_calls      number of calls over the threshold
+
+    """
+
+
+    def __init__(self, name, fingerprint):
+        """ Construct QueryStats for a script with no calls yet. """
+        self.name = name
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.response_bytes = 0
+        self.slow_calls = 0
+
+
+    def add(self, seconds, response_bytes, is_slow):
+        """ Add one call to these stats. """
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.response_bytes += response_bytes
+        if is_slow:
+            self.slow_calls += 1
+
+
+    def copy(self):
+        """ Return a copy of these stats that won't change under a caller.
+        """
+        copy = QueryStats(self.name, self.fingerprint)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+
+def fingerprint(script):
+    """ Return the fingerprint of a GremlinScript's template. """
+    return script.hash()[:FINGERPRINT_LENGTH]
+
+
+def record(script, params, seconds, response_bytes):
+    """ Count a Gremlin call, logging it if it was slow.
+
+    Required:
+    GremlinScript   script          registered gremlin script
+    dict            params          values bound to the script's parameters
+    float           seconds         time taken by the call
+    int             response_bytes  size of the response
+
+    """
+    threshold = settings.slow_query[SETTING.THRESHOLD]
+    is_slow = threshold is not None and seconds >= threshold
+    script_fingerprint = fingerprint(script)
+
+    with _lock:
+        query_stats = _stats.get(script_fingerprint)
+        if query_stats is None:
+            query_stats = _stats[script_fingerprint] = QueryStats(
+                    script.name(),
+                    script_fingerprint)
+        query_stats.add(seconds, response_bytes, is_slow)
+
+    if is_slow:
+        _log({
+                SCRIPT: script.name(),
+                FINGERPRINT: script_fingerprint,
+                MS: round(1000 * seconds, 3),
+                RESPONSE_BYTES: response_bytes,
+                PARAMS: params,
+                })
+
+
+def log_error(script, error):
+    """ Log a Gremlin error that was recovered from. """
+    _log({
+            SCRIPT: script.name(),
+            FINGERPRINT: fingerprint(script),
+            ERROR: error,
+            })
+
+
+def stats():
+    """ Return QueryStats for every fingerprint, slowest total first. """
+    with _lock:
+        all_stats = [s.copy() for s in _stats.values()]
+
+    return sorted(all_stats, key=lambda s: s.seconds, reverse=True)
+
+
+def reset():
+    """ Forget every call counted so far. """
+    with _lock:
+        _stats.clear()
+
+
+def format_report(all_stats):
+    """ Return lines ranking QueryStats by total time.
+
+    Required:
+    list    all_stats   QueryStats to rank
+
+    Return:
+    list                lines of the report, headings first
+
+    """
+    lines = ["{0:<12} {1:>7} {2:>10} {3:>8} {4:>8} {5:>6} {6:>10}  {7}"
+            .format(
+                    "fingerprint",
+                    "calls",
+                    "total ms",
+                    "mean ms",
+                    "max ms",
+                    "slow",
+                    "resp KB",
+                    "script")]
+
+    for s in sorted(all_stats, key=lambda s: s.seconds, reverse=True):
+        lines.append(
+                "{0:<12} {1:>7} {2:>10.1f} {3:>8.2f} {4:>8.2f} {5:>6} "
+                "{6:>10.1f}  {7}".format(
+                        s.fingerprint,
+                        s.calls,
+                        1000 * s.seconds,
+                        1000 * s.seconds / s.calls,
+                        1000 * s.max_seconds,
+                        s.slow_calls,
+                        s.response_bytes / 1024.0,
+                        s.name))
+
+    return lines
+
+
+def read_log(lines):
+    """ Return QueryStats summing up the calls in a slow query log.
+
+    Anything before the JSON object on a line, like a syslog prefix, is
+    skipped, as are lines that aren't logged calls.
+
+    Required:
+    iterable    lines       lines of a slow query log
+
+    Return:
+    list                    QueryStats, one per fingerprint logged
+
+    """
+    all_stats = {}
+
+    for line in lines:
+        start = line.find("{")
+        if start < 0:
+            continue
+
+        try:
+            entry = json.loads(line[start:])
+        except ValueError:
+            continue
+
+        if not isinstance(entry, dict) or MS not in entry:
+            continue
+
+        query_stats = all_stats.get(entry[FINGERPRINT])
+        if query_stats is None:
+            query_stats = all_stats[entry[FINGERPRINT]] = QueryStats(
+                    entry[SCRIPT],
+                    entry[FINGERPRINT])
+        query_stats.add(entry[MS] / 1000.0, entry[RESPONSE_BYTES], True)
+
+    return all_stats.values()
+
+
+def _log(entry):
+    """ Write an entry to the slow query log as a line of JSON. """
+    _configure_logger()
+
+    entry[TIME] = round(time.time(), 3)
+    _logger.warning(json.dumps(entry, sort_keys=True))
+
+
+def _configure_logger():
+    """ Point the slow query logger at LOG_FILE, if it's set. """
+    global _log_file
+
+    log_file = settings.slow_query[SETTING.LOG_FILE]
+    if log_file is None or log_file == _log_file:
+        return
+
+    with _lock:
+        if log_file == _log_file:
+            return
+
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+            handler.close()
+
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+        _logger.propagate = False
+        _log_file = log_file
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print "Usage: python -m model.data.neo4j.query_log LOG [LOG ...]"
+        sys.exit(1)
+
+    lines = []
+    for path in sys.argv[1:]:
+        with open(path) as log:
+            lines.extend(log)
+
+    for line in format_report(read_log(lines)):
+        print line
@@ -2,13 +2,40 @@
 
 Parse data lists/dicts from neo4j and return nodes/edges.
 
+PathStreamParser parses a depth-1 path response as it arrives instead,
+handing over one formatted node at a time.
+
 """
+import json
+import re
 
 from model.constants import NODE_PROPERTY, EDGE_PROPERTY
 
 from constants import NEO4J
 
 
+def format_paths(raw_paths):
+    """ Convert a list of gremlin depth 1 paths into formatted path dicts.
+
+    {start_node_id:{depth:{node_id:node}}}
+
+    Required:
+    list    raw_paths   unformatted neo4j paths, each a pair of lists
+
+    Return:
+    dict                formatted paths keyed on start node id
+
+    """
+    paths = {}
+
+    for raw_path in raw_paths:
+        path = format_path(raw_path)
+        for start_node_id in path[0]:
+            paths[start_node_id] = path
+
+    return paths
+
+
 def format_path(raw_path):
     """ Convert gremlin depth 1 path into a formatted path dict.
 
@@ -123,3 +150,245 @@ def format_edge(raw_edge):
 def url_to_id(url):
     """ Extract the id from a neo4j url. """
     return int(url.rpartition("/")[2])
+
+
+class PathStreamParser(object):
+
+    """ Incrementally parse a Gremlin depth-1 path response.
+
+    A path response is a list of node lists, one per depth:
+
+    [ [ [ { v }, [ { e }, ... ] ], ... ], [ [ { v }, [ { e }, ... ] ], ... ] ]
+
+    Feed the response body in chunks as it arrives. Each [vertex, edges]
+    pair is scanned for its closing bracket as it arrives, picking up
+    where the last chunk left off. Once it's closed, the pair is decoded,
+    formatted with format_node(), and passed to the visitor along with
+    its depth. Only the pair being scanned is held in memory, never the
+    whole response, and each byte is scanned and decoded once.
+
+    A response which isn't a list (like a Neo4j error) isn't parsed at
+    all. It's buffered whole for the caller to handle instead. A path
+    which turns out to be malformed stops the parser, and the error is
+    raised once it's closed.
+
+    Variables:
+    func        _visit      called with (depth, node) for every node
+    str         _buffer     received text which hasn't been consumed yet
+    int         _depth      index of the node list being parsed
+    str         _state      what the parser expects next
+    bool        _is_path    whether the response looks like a path
+    ValueError  _error      why parsing stopped, if it did
+    JSONDecoder _decoder    decodes each pair once it's closed
+    int         _scan       buffer position to resume scanning a pair at,
+                            or None if no pair is being scanned
+    int         _nesting    brackets open in the pair being scanned
+    bool        _in_string  whether the scan is inside a JSON string
+
+    """
+
+    # what the parser expects next
+    _START = "start"
+    _DEPTH = "depth"
+    _FIRST_NODE = "first_node"
+    _NODE = "node"
+    _NEXT_NODE = "next_node"
+    _NEXT_DEPTH = "next_depth"
+    _DONE = "done"
+
+    _WHITESPACE = " \t\n\r"
+
+    # what the scan of a pair stops at, outside and inside strings
+    _STRUCTURE = re.compile(r'[\[\]"]')
+    _STRING_END = re.compile(r'["\\]')
+
+
+    def __init__(self, visit):
+        """ Construct a PathStreamParser.
+
+        Required:
+        func    visit   called with (depth, node) for every node parsed
+
+        """
+        self._visit = visit
+        self._buffer = ""
+        self._depth = -1
+        self._state = self._START
+        self._is_path = True
+        self._error = None
+        self._decoder = json.JSONDecoder()
+        self._scan = None
+        self._nesting = 0
+        self._in_string = False
+
+
+    def feed(self, chunk):
+        """ Parse as much of the response as has arrived, given a chunk. """
+        if self._error is not None:
+            return
+
+        self._buffer += chunk
+
+        if self._is_path:
+            try:
+                self._parse()
+            except ValueError as err:
+                self._error = err
+                self._buffer = ""
+
+
+    def close(self):
+        """ Finish parsing.
+
+        Raises:
+        ValueError      a path response was malformed or incomplete
+
+        """
+        if self._error is not None:
+            raise self._error
+
+        if self._is_path and self._state != self._DONE:
+            raise ValueError("Gremlin path response ended early.")
+
+
+    def is_path(self):
+        """ Return whether the response is a path, rather than an error. """
+        return self._is_path
+
+
+    def buffered_response(self):
+        """ Return the whole body of a response which wasn't a path. """
+        return self._buffer
+
+
+    def _parse(self):
+        """ Consume every complete token and node in the buffer. """
+        position = 0
+
+        while True:
+            position = self._skip_whitespace(position)
+            if position == len(self._buffer) or self._state == self._DONE:
+                break
+
+            char = self._buffer[position]
+
+            if self._state == self._START:
+                if char != "[":
+                    self._is_path = False
+                    return
+                self._state = self._DEPTH
+                position += 1
+
+            elif self._state == self._DEPTH:
+                self._expect(char, "[")
+                self._depth += 1
+                self._state = self._FIRST_NODE
+                position += 1
+
+            elif self._state == self._NEXT_DEPTH:
+                if char == "]":
+                    self._state = self._DONE
+                else:
+                    self._expect(char, ",")
+                    self._state = self._DEPTH
+                position += 1
+
+            elif self._state == self._NEXT_NODE:
+                if char == "]":
+                    self._state = self._NEXT_DEPTH
+                else:
+                    self._expect(char, ",")
+                    self._state = self._NODE
+                position += 1
+
+            elif self._state == self._FIRST_NODE and char == "]":
+                self._state = self._NEXT_DEPTH
+                position += 1
+
+            else:
+                if self._scan is None:
+                    self._expect(char, "[")
+                    self._scan = position
+
+                # wait for the rest of the node if it hasn't arrived yet
+                end = self._scan_node()
+                if end is None:
+                    break
+
+                (raw_node, position) = self._decoder.raw_decode(
+                        self._buffer,
+                        position)
+                if position != end:
+                    raise ValueError("Malformed node in Gremlin path.")
+
+                self._scan = None
+                self._state = self._NEXT_NODE
+                self._visit(self._depth, format_node(raw_node))
+
+        # drop what's been consumed
+        self._buffer = self._buffer[position:]
+        if self._scan is not None:
+            self._scan -= position
+
+
+    def _scan_node(self):
+        """ Scan the node being parsed for the bracket closing it.
+
+        Scanning picks up where it left off, so each byte is only looked
+        at once however many chunks a node arrives in.
+
+        Return:
+        int         position just past the node, or None if it hasn't
+                    all arrived yet
+
+        """
+        buffer = self._buffer
+        position = self._scan
+
+        while True:
+            if self._in_string:
+                match = self._STRING_END.search(buffer, position)
+            else:
+                match = self._STRUCTURE.search(buffer, position)
+
+            if match is None:
+                self._scan = len(buffer)
+                return None
+
+            char = match.group()
+            position = match.end()
+
+            if char == "\\":
+                if position == len(buffer):
+                    # rescan the escape once what it escapes arrives
+                    self._scan = position - 1
+                    return None
+                position += 1
+
+            elif char == '"':
+                self._in_string = not self._in_string
+
+            elif char == "[":
+                self._nesting += 1
+
+            else:
+                self._nesting -= 1
+                if self._nesting == 0:
+                    self._scan = position
+                    return position
+
+
+    def _skip_whitespace(self, position):
+        """ Return the position of the next non-whitespace character. """
+        while (position < len(self._buffer)
+                and self._buffer[position] in self._WHITESPACE):
+            position += 1
+        return position
+
+
+    def _expect(self, char, expected):
+        """ Raise ValueError unless char is the expected one. """
+        if char != expected:
+            raise ValueError("Expected {0} in Gremlin path, not {1}.".format(
+                    expected,
+                    char))
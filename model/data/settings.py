@@ -5,11 +5,19 @@ Provide settings that allow for switching out and configuring databases.
 """
 import os
 
-from constants import SETTING, TYPE, PROTOCOL, NEO4J
+from constants import SETTING, TYPE, CACHE_TYPE, PROTOCOL, NEO4J
 
 
 databases = {}
 
+# keep-alive connection pool settings, used by every database unless it
+# overrides them in its own settings.
+connection_pool = {
+        SETTING.MAX_CONNECTIONS: 10,
+        SETTING.IDLE_TIMEOUT: 30,
+        SETTING.TIMEOUT: 30,
+        }
+
 db0 = {
         SETTING.HOST: "localhost",
         SETTING.PORT: "7474",
@@ -21,7 +29,7 @@ databases[db0[SETTING.NAME]] = db0
 
 db1 = {
         SETTING.HOST: os.environ.get(NEO4J.HOST),
-        SETTING.PORT: int(os.environ.get(NEO4J.PORT)),
+        SETTING.PORT: int(os.environ.get(NEO4J.PORT, 0)),
         SETTING.PROTOCOL: PROTOCOL.HTTP,
         SETTING.TYPE: TYPE.SECURE_NEO4J,
         SETTING.NAME: "heroku",
@@ -30,4 +38,35 @@ db1 = {
         }
 databases[db1[SETTING.NAME]] = db1
 
-active_db = "heroku"
+# the whole graph in this process's memory, empty at startup. serves small
+# deployments, tests, and benchmarks without a network hop.
+db2 = {
+        SETTING.TYPE: TYPE.MEMORY,
+        SETTING.NAME: "memory",
+        }
+databases[db2[SETTING.NAME]] = db2
+
+# the database to use, by name. set ACTIVE_DB in the environment to switch.
+active_db = os.environ.get(SETTING.ACTIVE_DB, db1[SETTING.NAME])
+
+# read-through cache between the graph reader and the active database.
+# entries live for at most TTL seconds, so other processes' writes show up
+# eventually; this process's own writes invalidate entries immediately.
+cache = {
+        SETTING.TYPE: CACHE_TYPE.LRU,
+        SETTING.MAX_SIZE: 10000,
+        SETTING.TTL: 30,
+        }
+
+# Gremlin calls taking at least THRESHOLD seconds go to the slow query log,
+# with their parameters and response size. the log is written to LOG_FILE,
+# or to the app's log if that's None. a THRESHOLD of 0 logs every call,
+# and None logs none.
+slow_query = {
+        SETTING.THRESHOLD: 0.25,
+        SETTING.LOG_FILE: None,
+        }
+
+# parse path responses as they arrive, building GraphNodes one at a time,
+# rather than decoding each response whole. streamed reads skip the cache.
+stream_paths = False
@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+""" Script: Benchmark League Reads and Writes
+
+Generate Leagues in an in-memory graph served by a local GremlinServer,
+or held by a MemoryDatabase, then time the whole stack against it:
+    def LeagueModel.load(...)
+    def Game.create_game(...)
+    a full LeagueHandler request, from cookie to rendered page
+    a full CreateGameHandler request, with ids sent as strings like forms do
+
+For each League size, report latency percentiles and the Gremlin round
+trips each call makes, then rank the Gremlin scripts called by total
+time. Runs are seeded, so they are repeatable.
+
+Usage:
+python model/edit_graph/benchmark.py --opponents=12 --games=20,200,1000
+
+"""
+
+# IMPORTS
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+import tornado.httpclient
+import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
+import tornado.web
+from tornado.escape import json_encode, url_escape
+from tornado.options import define, options
+
+# the app's packages live at the root of the repo, two directories up
+sys.path.insert(0, os.path.abspath(os.path.join(
+        os.path.dirname(__file__),
+        os.pardir,
+        os.pardir)))
+
+import gen_environment
+
+define("opponents", default=12, type=int,
+        help="Players in each benchmarked League (at least 8)")
+define("games", default=[20, 200], type=int, multiple=True,
+        help="Games in each benchmarked League, one League per size")
+define("iterations", default=50, type=int,
+        help="timed calls of each operation per League")
+define("cache", default=False, type=bool,
+        help="read through the data layer's cache")
+define("memory", default=False, type=bool,
+        help="use a MemoryDatabase instead of a local Gremlin server")
+define("seed", default=0, type=int,
+        help="seed for generating Leagues")
+tornado.options.parse_command_line()
+
+# point the local database at an in-memory graph before anything connects
+from model.data.constants import SETTING, CACHE_TYPE
+from model.data import settings as data_settings
+from model.data.neo4j.local_server import GremlinServer
+
+gremlin_server = None
+if options.memory:
+    data_settings.active_db = data_settings.db2[SETTING.NAME]
+else:
+    gremlin_server = GremlinServer(port=0).start()
+    data_settings.db0[SETTING.HOST] = gremlin_server.host()
+    data_settings.db0[SETTING.PORT] = gremlin_server.port()
+    data_settings.active_db = data_settings.db0[SETTING.NAME]
+if not options.cache:
+    data_settings.cache[SETTING.TYPE] = CACHE_TYPE.NONE
+
+from model.data import database_manager
+from model.data.neo4j import query_log
+from model.api import memo
+from model.api.sports import SPORT
+from model.api.game import Game
+from model.api.metric import MetricFactory
+from model.app.league import LeagueModel
+from handlers.constants import COOKIE_TYPE, COOKIE, ARGUMENT, PARAMETER
+from handlers.session import Session
+from handlers.league import LeagueHandler
+from handlers.create import CreateGameHandler
+
+from settings import settings
+
+import league_gen
+import schedule_gen
+
+
+# percentiles of each operation's latencies to report
+PERCENTILES = [50, 90, 99]
+
+# smallest League a competitive Game can be generated for
+MIN_OPPONENTS = 8
+
+# any token will do, so long as the cookie and the argument match
+XSRF_TOKEN = "benchmark"
+
+# Games POSTed to check that standings record them. fewer than a page, or
+# the standings can't tell they didn't miss any.
+CHECKED_GAMES = 3
+
+
+def percentile(sorted_values, percent):
+    """ Return the nearest-rank percentile of sorted values. """
+    rank = max(1, int(round(percent / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+@contextlib.contextmanager
+def quiet():
+    """ Silence debug prints inside a block. """
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+class Benchmark(object):
+
+    """ Time an operation and count its Gremlin round trips per call.
+
+    Variables:
+    str     name            name of the operation reported
+    list    _latencies      seconds taken by each call
+    list    _round_trips    round trips made by each call
+    dict    _by_script      total round trips keyed on script name
+
+    """
+
+
+    def __init__(self, name):
+        """ Construct a Benchmark for a named operation. """
+        self.name = name
+        self._latencies = []
+        self._round_trips = []
+        self._by_script = {}
+
+
+    def measure(self, operation, *args):
+        """ Call an operation once, timing it and counting round trips. """
+        if gremlin_server is not None:
+            gremlin_server.reset_round_trips()
+
+        start = time.time()
+        with quiet():
+            result = operation(*args)
+        self._latencies.append(time.time() - start)
+
+        round_trips = {}
+        if gremlin_server is not None:
+            round_trips = gremlin_server.round_trips()
+        self._round_trips.append(sum(round_trips.values()))
+        for script, count in round_trips.items():
+            self._by_script[script] = self._by_script.get(script, 0) + count
+
+        memo.clear()
+        return result
+
+
+    def report(self):
+        """ Print a line of latency percentiles and round trips. """
+        latencies = sorted(self._latencies)
+        calls = len(latencies)
+
+        columns = ["{0:<22}".format(self.name), "{0:>5}".format(calls)]
+        for percent in PERCENTILES:
+            columns.append("{0:>8.2f}".format(
+                    1000 * percentile(latencies, percent)))
+        columns.append("{0:>8.2f}".format(1000 * latencies[-1]))
+        columns.append("{0:>7.1f}".format(
+                sum(self._round_trips) / float(calls)))
+        columns.append("{0:>5}".format(max(self._round_trips)))
+        print " ".join(columns)
+
+        for script, count in sorted(self._by_script.items()):
+            print "{0:>30} {1:>6.1f}  {2}".format(
+                    "", count / float(calls), script)
+
+
+def report_header():
+    """ Print the column headings for Benchmark.report(). """
+    columns = ["{0:<22}".format("operation"), "{0:>5}".format("calls")]
+    for percent in PERCENTILES:
+        columns.append("{0:>8}".format("p{0} ms".format(percent)))
+    columns.append("{0:>8}".format("max ms"))
+    columns.append("{0:>7}".format("trips"))
+    columns.append("{0:>5}".format("max"))
+    print " ".join(columns)
+
+
+def generate_league(number_of_opponents, number_of_games):
+    """ Return a League, its creating (user, player), and opponent ids. """
+    templates = [{"first_name": "Player", "last_name": str(n)}
+            for n in range(number_of_opponents)]
+
+    with quiet():
+        (users, players) = league_gen.generate_players(templates)
+        league = league_gen.generate_league("Benchmark", players)
+
+        opponent_ids = [o.id for o in league.get_opponents()]
+        for n in range(number_of_games):
+            if n % 2:
+                schedule_gen.generate_friendly_game(league.id, opponent_ids)
+            else:
+                schedule_gen.generate_competitive_game(
+                        league.id,
+                        opponent_ids)
+
+    return (league, users[0], players[0], opponent_ids)
+
+
+def load_league(session, league_id):
+    """ Load a League's page of Games the way LeagueHandler.get_model does.
+    """
+    model = LeagueModel(session)
+    model.set_league_id(league_id)
+    model.set_games_page(LeagueModel.GAMES_PAGE_SIZE)
+    model.load()
+    return model
+
+
+def check_recorded(requester, user_id, person_id, league_id, opponent_ids):
+    """ Raise unless POSTed Games are recorded into a League's standings.
+
+    Standings reseeded from the graph would count the new Games too, so
+    check that they're the very same Standings, with each competitive
+    Game's two wins and two losses added.
+
+    """
+    session = Session(user_id, person_id)
+
+    with quiet():
+        seeded = load_league(session, league_id).standings_aggregation
+        counts = [s.win_count + s.loss_count for s in seeded]
+
+        for n in range(CHECKED_GAMES):
+            requester.create_game(user_id, person_id, league_id, opponent_ids)
+
+        standings = load_league(session, league_id).standings_aggregation
+
+    if set(map(id, standings)) != set(map(id, seeded)):
+        raise Exception("Standings were reseeded, not recorded.")
+
+    counted = sum(s.win_count + s.loss_count for s in standings)
+    if counted - sum(counts) != 4 * CHECKED_GAMES:
+        raise Exception("Standings missed some new Games.")
+
+
+def random_results(opponent_ids):
+    """ Return metrics dicts for a competitive Game, keyed on Opponent id.
+
+    Two random Opponents beat two others.
+
+    """
+    random.shuffle(opponent_ids)
+    (winner_ids, loser_ids) = (opponent_ids[:2], opponent_ids[2:4])
+
+    metrics_by_opponent = {}
+    for id in winner_ids:
+        metrics_by_opponent[id] = {"result": "won"}
+    for id in loser_ids:
+        metrics_by_opponent[id] = {"result": "lost"}
+
+    return metrics_by_opponent
+
+
+def create_game(league_id, opponent_ids):
+    """ Create a competitive Game between random Opponents. """
+    metrics_by_opponent = {}
+    for (id, metrics) in random_results(opponent_ids).items():
+        metrics_by_opponent[id] = MetricFactory.produce_metrics(metrics)
+
+    return Game.create_game(
+            league_id,
+            opponent_ids[0],
+            "Benchmarked",
+            metrics_by_opponent,
+            random.choice(SPORT.ALL.keys()))
+
+
+class LeagueRequester(object):
+
+    """ Serve the app on a local port and make League requests of it.
+
+    Variables:
+    IOLoop              _io_loop    loop the app and the client run on
+    HTTPServer          _server     server for the app
+    AsyncHTTPClient     _client     client requesting pages
+    int                 _port       port the app is served on
+
+    """
+
+
+    def __init__(self):
+        """ Construct a LeagueRequester and start serving the app. """
+        # no autoreload, recompiled templates, or access logs
+        app_settings = dict(
+                settings,
+                debug=False,
+                log_function=lambda handler: None)
+        app = tornado.web.Application(
+                [
+                        (r"/league/([0-9]+)", LeagueHandler),
+                        (r"/create/game", CreateGameHandler),
+                        ],
+                **app_settings)
+
+        self._io_loop = tornado.ioloop.IOLoop.instance()
+        self._server = tornado.httpserver.HTTPServer(
+                app,
+                io_loop=self._io_loop)
+
+        sockets = tornado.netutil.bind_sockets(0, "localhost")
+        self._port = sockets[0].getsockname()[1]
+        self._server.add_sockets(sockets)
+
+        self._client = tornado.httpclient.AsyncHTTPClient(self._io_loop)
+        self._cookie_secret = app_settings["cookie_secret"]
+
+
+    def request(self, user_id, person_id, league_id):
+        """ GET a League page as a signed in Person and return the response.
+        """
+        return self._fetch(
+                "/league/{0}".format(league_id),
+                user_id,
+                person_id)
+
+
+    def create_game(self, user_id, person_id, league_id, opponent_ids):
+        """ POST a new Game between random Opponents and return the response.
+
+        Every id is sent as a string, just as the create game dialog's form
+        and JSON keys send them.
+
+        Raises:
+        Exception           the handler didn't create the Game
+
+        """
+        metrics_by_opponent = {}
+        for (id, metrics) in random_results(opponent_ids).items():
+            metrics_by_opponent[str(id)] = metrics
+
+        parameters = json_encode({
+                PARAMETER.LEAGUE_ID: str(league_id),
+                PARAMETER.MESSAGE: "Benchmarked",
+                PARAMETER.METRICS_BY_OPPONENT: metrics_by_opponent,
+                PARAMETER.SPORT_ID: random.choice(SPORT.ALL.keys()),
+                })
+        body = "&".join("{0}={1}".format(key, url_escape(value)) for (
+                key, value) in [
+                        ("_xsrf", XSRF_TOKEN),
+                        (ARGUMENT.ASYNCHRONOUS, "true"),
+                        (ARGUMENT.PARAMETERS, parameters),
+                        ])
+
+        response = self._fetch(
+                "/create/game",
+                user_id,
+                person_id,
+                method="POST",
+                body=body)
+
+        if not json.loads(response.body).get("is_success"):
+            raise Exception("Game wasn't created: {0}".format(response.body))
+
+        return response
+
+
+    def stop(self):
+        """ Stop serving the app. """
+        self._server.stop()
+
+
+    def _fetch(self, path, user_id, person_id, **kwargs):
+        """ Request a path as a signed in Person and return the response.
+
+        Raises:
+        Exception           the response wasn't a 200
+
+        """
+        session = tornado.web.create_signed_value(
+                self._cookie_secret,
+                COOKIE_TYPE.SESSION,
+                json_encode({
+                        COOKIE.USER_ID: user_id,
+                        COOKIE.PERSON_ID: person_id,
+                        }))
+
+        cookies = ["{0}={1}".format(COOKIE_TYPE.SESSION, session)]
+        if kwargs.get("method") == "POST":
+            cookies.append("_xsrf={0}".format(XSRF_TOKEN))
+
+        responses = []
+
+        def handle_response(response):
+            responses.append(response)
+            self._io_loop.stop()
+
+        self._client.fetch(
+                "http://localhost:{0}{1}".format(self._port, path),
+                handle_response,
+                headers={"Cookie": "; ".join(cookies)},
+                follow_redirects=False,
+                **kwargs)
+        self._io_loop.start()
+
+        response = responses[0]
+        if response.code != 200:
+            raise Exception("Request for {0} failed: {1}".format(
+                    path,
+                    response))
+
+        return response
+
+
+def benchmark_league(number_of_games, requester):
+    """ Generate a League with a number of Games and benchmark it. """
+    (league, user, player, opponent_ids) = generate_league(
+            options.opponents,
+            number_of_games)
+
+    if gremlin_server is None:
+        database = database_manager.database()
+        (nodes, edges) = (database.node_count(), database.edge_count())
+    else:
+        graph = gremlin_server.graph()
+        (nodes, edges) = (graph.vertex_count(), graph.edge_count())
+
+    print
+    print "League of {0} opponents and {1} games ({2} nodes, {3} edges)" \
+            .format(len(opponent_ids), number_of_games, nodes, edges)
+    report_header()
+
+    session = Session(user.id, player.id)
+    query_log.reset()
+
+    loads = Benchmark("LeagueModel.load")
+    for n in range(options.iterations):
+        loads.measure(load_league, session, league.id)
+    loads.report()
+
+    requests = Benchmark("LeagueHandler GET")
+    for n in range(options.iterations):
+        requests.measure(requester.request, user.id, player.id, league.id)
+    requests.report()
+
+    # creating Games grows the League, so it's measured last
+    creates = Benchmark("Game.create_game")
+    for n in range(options.iterations):
+        creates.measure(create_game, league.id, opponent_ids)
+    creates.report()
+
+    posts = Benchmark("CreateGameHandler POST")
+    for n in range(options.iterations):
+        posts.measure(
+                requester.create_game,
+                user.id,
+                player.id,
+                league.id,
+                opponent_ids)
+    posts.report()
+
+    check_recorded(requester, user.id, player.id, league.id, opponent_ids)
+
+    if gremlin_server is not None:
+        print
+        for line in query_log.format_report(query_log.stats()):
+            print line
+
+
+def run():
+    """ Benchmark a League of every configured size. """
+    if options.opponents < MIN_OPPONENTS:
+        print "A League needs at least {0} opponents.".format(MIN_OPPONENTS)
+        return
+
+    random.seed(options.seed)
+    requester = LeagueRequester()
+
+    if gremlin_server is None:
+        print "MemoryDatabase, no round trips."
+    else:
+        print "Gremlin server at {0}, cache {1}.".format(
+                gremlin_server.base_url(),
+                "on" if options.cache else "off")
+
+    try:
+        for number_of_games in options.games:
+            benchmark_league(number_of_games, requester)
+    finally:
+        requester.stop()
+        if gremlin_server is not None:
+            database_manager.database().connection_pool().close()
+            gremlin_server.stop()
+
+
+if __name__ == "__main__":
+    run()
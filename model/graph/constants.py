@@ -32,3 +32,29 @@ class _GraphProperty(object):
 
 
 GRAPH_PROPERTY = _GraphProperty()
+
+
+class _ReadKind(object):
+
+    """ _ReadKind class to name the kinds of reads that can be coalesced. """
+
+
+    @constant
+    def NODE(self):
+        """ NODE is a kind of read of a single GraphNode. """
+        return "node"
+
+
+    @constant
+    def PATH(self):
+        """ PATH is a kind of read of a depth-1 GraphPath. """
+        return "path"
+
+
+    @constant
+    def PATHS(self):
+        """ PATHS is a kind of read of many depth-1 GraphPaths. """
+        return "paths"
+
+
+READ_KIND = _ReadKind()
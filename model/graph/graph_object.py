@@ -41,8 +41,20 @@ class GraphObject(object):
     ts      _deleted_ts     when, if ever, was this GraphObject deleted
     dict    _properties     GraphObject properties
 
+    GraphObjects are loaded by the thousand, so they are slotted rather
+    than each carrying an instance __dict__.
+
     """
 
+    __slots__ = (
+            "_id",
+            "_type",
+            "_created_ts",
+            "_updated_ts",
+            "_deleted_ts",
+            "_properties",
+            )
+
 
     def __init__(self, id, type, properties):
         """ Construct an abstract GraphObject.
@@ -56,6 +68,9 @@ class GraphObject(object):
         self._id = id
         self._type = type
 
+        # work on a copy, since the data layer may cache and reuse its dicts
+        properties = dict(properties)
+
         # pop timestamps from properties into members
         self._created_ts = properties.pop(GRAPH_PROPERTY.CREATED_TS, False)
         self._updated_ts = properties.pop(GRAPH_PROPERTY.UPDATED_TS, False)
@@ -111,6 +126,8 @@ class GraphNode(GraphObject):
 
     """
 
+    __slots__ = ("_edges",)
+
 
     def __init__(self, id, type, properties, edges):
         """ Construct a GraphNode extending GraphObject.
@@ -163,6 +180,8 @@ class GraphEdge(GraphObject):
 
     """
 
+    __slots__ = ("_from_node_id", "_to_node_id")
+
 
     def __init__(self, id, type, properties, from_node_id, to_node_id):
         """ Construct a GraphEdge extending GraphObject.
@@ -251,6 +270,30 @@ class GraphPath(object):
                         node_dict[NODE_PROPERTY.EDGES])
 
 
+    def add_node(self, depth, node_dict):
+        """ Load a node dict into a GraphNode at a depth in this GraphPath.
+
+        This lets a GraphPath be built up one node at a time as a path is
+        read, instead of all at once from a whole path dict.
+
+        Required:
+        int     depth       degrees separating this node from the start
+        dict    node_dict   node with its edges, as read from the database
+
+        """
+        if depth > self._depth:
+            for new_depth in range(self._depth + 1, depth + 1):
+                self._path[new_depth] = {}
+            self._depth = depth
+
+        node_id = node_dict[NODE_PROPERTY.ID]
+        self._path[depth][node_id] = GraphNode(
+                node_id,
+                node_dict[NODE_PROPERTY.TYPE],
+                node_dict[NODE_PROPERTY.PROPERTIES],
+                node_dict[NODE_PROPERTY.EDGES])
+
+
     def start_node_id(self):
         """ Return the id of a GraphPath's start GraphNode. """
         return self._start_node_id
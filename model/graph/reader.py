@@ -11,19 +11,39 @@ Provides:
     def multiget_edge
     def get_path_to_neighbor_nodes
     def multiget_path_to_neighbor_nodes
+    def get_node_async
+    def get_path_to_neighbor_nodes_async
+    def multiget_path_to_neighbor_nodes_async
+
+The asynchronous reads are coalesced. While a read is in flight, an
+identical read joins it instead of going to the database, and every
+caller gets the same parsed GraphNode or GraphPath. Reads are identical
+if they're the same kind, from the same start nodes, with the same
+pruner, filter, page, and choice of neighbor edges, and no write has
+invalidated reads since the one in flight started.
 
 """
+import functools
+
+from tornado import gen
+from tornado import stack_context
+from tornado.ioloop import IOLoop
+
 from model.constants import NODE_PROPERTY, EDGE_PROPERTY
 from model.data import database_manager
 from model.data.data_errors import DbInputError, DbReadError
 
-from constants import GRAPH_PROPERTY
+from constants import GRAPH_PROPERTY, READ_KIND
 from model.graph import GraphEdge, GraphNode, GraphPath, GraphOutputError
 
 
+# callbacks waiting on each read in flight, keyed on the read
+_flights = {}
+
+
 def database():
-    """ Get a database from the data layer's database_manager. """
-    return database_manager.database()
+    """ Get a read-through cached database from the database_manager. """
+    return database_manager.cached_database()
 
 
 def get_node(node_id):
@@ -301,7 +321,10 @@ def multiget_edge(edge_ids):
 def get_path_to_neighbor_nodes(
         start_node_id,
         edge_type_pruner=None,
-        node_type_return_filter=None):
+        node_type_return_filter=None,
+        page_size=None,
+        before=None,
+        neighbor_edges=True):
     """ Traverse a depth-1 path from a start node to its neighbors.
 
     Wrap a call to a graph database that returns a dict structured
@@ -312,12 +335,23 @@ def get_path_to_neighbor_nodes(
         depth1 : {node_id0 : {node_dict0}, ..., node_idN : {node_dictN}}
     }
 
+    Given a page size, the path only holds the newest page of neighbors,
+    by (created_ts, id), older than the before cursor. If the data
+    settings stream paths, GraphNodes are built as the path is read.
+
+    Neighbors are read with all of their edges unless neighbor_edges is
+    False, when their GraphNodes have none and the start GraphNode only
+    has its edges of the pruned types.
+
     Required:
     id   start_node_id           start node id in a depth-1 path
 
     Optional:
     list edge_type_pruner        list of edge types to traverse
     list node_type_return_filter list of node types to return
+    int  page_size               most neighbors to return
+    tuple before                 (created_ts, id) to page back from
+    bool neighbor_edges          whether to read neighbors' edges too
 
     Returns:
     GraphPath                    single GraphPath instance
@@ -327,16 +361,34 @@ def get_path_to_neighbor_nodes(
     path = None
 
     try:
-        # issue a db query to generate a path to neighbors
-        path_dict = database().read_nodes_from_immediate_path(
-                start_node_id,
-                edge_type_pruner,
-                node_type_return_filter)
-
-        # FIXME: do similar checking to get_node() for path_dict[0]
-
-        # instantiate all nodes and edges in one fell swoop
-        path = GraphPath(start_node_id, path_dict)
+        if database_manager.stream_paths():
+            # instantiate nodes and edges one at a time as they're read
+            streamed_path = _empty_path(start_node_id)
+            is_found = database().read_nodes_from_immediate_path_stream(
+                    start_node_id,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    streamed_path.add_node,
+                    page_size,
+                    before,
+                    neighbor_edges)
+            if is_found:
+                path = streamed_path
+
+        else:
+            # issue a db query to generate a path to neighbors
+            path_dict = database().read_nodes_from_immediate_path(
+                    start_node_id,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    page_size,
+                    before,
+                    neighbor_edges)
+
+            # FIXME: do similar checking to get_node() for path_dict[0]
+
+            # instantiate all nodes and edges in one fell swoop
+            path = GraphPath(start_node_id, path_dict)
 
     except DbReadError as e:
         print(e.reason)
@@ -352,19 +404,21 @@ def get_path_to_neighbor_nodes(
 def multiget_path_to_neighbor_nodes(
         start_node_ids,
         edge_type_pruner=None,
-        node_type_return_filter=None):
+        node_type_return_filter=None,
+        neighbor_edges=True):
     """ Traverse depth-1 paths from start nodes to their neighbors.
 
-    Wrap a set of calls to a graph database that each return a dict
+    Wrap a single call to a graph database that returns a dict of dicts
     structured like the one referenced in get_path_to_neighbor_nodes(),
-    and parse them into GraphPaths.
+    keyed on start node id, and parse them into GraphPaths.
 
     Required:
-    list    start_node_id           start node id in a depth-1 path
+    list    start_node_ids          start node ids of depth-1 paths
 
     Optional:
     list    edge_type_pruner        list of edge types to traverse
     list    node_type_return_filter list of node types to return
+    bool    neighbor_edges          whether to read neighbors' edges too
 
     Returns:
     dict                            GraphPaths keyed on start node id
@@ -373,10 +427,333 @@ def multiget_path_to_neighbor_nodes(
 
     paths = {}
 
-    for start_node_id in start_node_ids:
-        paths[start_node_id] = get_path_to_neighbor_nodes(
-                start_node_id,
+    try:
+        # issue a single db query to generate all paths to neighbors
+        path_dicts = database().read_nodes_from_immediate_paths(
+                start_node_ids,
                 edge_type_pruner,
-                node_type_return_filter)
+                node_type_return_filter,
+                neighbor_edges)
+
+        paths = _process_paths(start_node_ids, path_dicts)
+
+    except DbReadError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    except DbInputError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    return paths
+
+
+def get_node_async(node_id, callback):
+    """ Fetch a GraphNode without blocking and pass it to the callback.
+
+    Behave like get_node(), but don't block the IOLoop on the database,
+    and share the GraphNode with identical reads in flight.
+
+    Required:
+    id      node_id     id of node to fetch
+    func    callback    called with a GraphNode (or None)
+
+    Raises:
+    GraphOutputError    bad input
+
+    """
+    _coalesce(
+            (READ_KIND.NODE, node_id),
+            functools.partial(_read_node_async, node_id),
+            callback)
+
+
+@gen.engine
+def _read_node_async(node_id, callback):
+    """ Read a GraphNode from the database for get_node_async(). """
+
+    graph_node = None
+
+    try:
+        node_dict = yield gen.Task(
+                database().read_node_and_edges_async,
+                node_id)
+
+        if node_dict:
+            graph_node = _process_node(node_dict)
+
+    except DbReadError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    except DbInputError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    callback(graph_node)
+
+
+def get_path_to_neighbor_nodes_async(
+        start_node_id,
+        edge_type_pruner=None,
+        node_type_return_filter=None,
+        page_size=None,
+        before=None,
+        neighbor_edges=True,
+        callback=None):
+    """ Traverse a depth-1 path without blocking and pass it to the callback.
+
+    Behave like get_path_to_neighbor_nodes(), but don't block the IOLoop
+    on the database, and share the GraphPath with identical reads in
+    flight.
+
+    Required:
+    id   start_node_id           start node id in a depth-1 path
+    func callback                called with a GraphPath (or None)
+
+    Optional:
+    list edge_type_pruner        list of edge types to traverse
+    list node_type_return_filter list of node types to return
+    int  page_size               most neighbors to return
+    tuple before                 (created_ts, id) to page back from
+    bool neighbor_edges          whether to read neighbors' edges too
+
+    """
+    key = (
+            READ_KIND.PATH,
+            start_node_id,
+            _freeze(edge_type_pruner),
+            _freeze(node_type_return_filter),
+            page_size,
+            None if before is None else tuple(before),
+            bool(neighbor_edges))
+
+    _coalesce(
+            key,
+            functools.partial(
+                    _read_path_async,
+                    start_node_id,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    page_size,
+                    before,
+                    neighbor_edges),
+            callback)
+
+
+@gen.engine
+def _read_path_async(
+        start_node_id,
+        edge_type_pruner,
+        node_type_return_filter,
+        page_size,
+        before,
+        neighbor_edges,
+        callback):
+    """ Read a GraphPath from the database for
+    get_path_to_neighbor_nodes_async(). """
+
+    path = None
+
+    try:
+        if database_manager.stream_paths():
+            # instantiate nodes and edges one at a time as they arrive
+            streamed_path = _empty_path(start_node_id)
+            is_found = yield gen.Task(
+                    database().read_nodes_from_immediate_path_stream_async,
+                    start_node_id,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    streamed_path.add_node,
+                    page_size=page_size,
+                    before=before,
+                    neighbor_edges=neighbor_edges)
+            if is_found:
+                path = streamed_path
+
+        else:
+            # issue a db query to generate a path to neighbors
+            path_dict = yield gen.Task(
+                    database().read_nodes_from_immediate_path_async,
+                    start_node_id,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    page_size=page_size,
+                    before=before,
+                    neighbor_edges=neighbor_edges)
+
+            # instantiate all nodes and edges in one fell swoop
+            path = GraphPath(start_node_id, path_dict)
+
+    except DbReadError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    except DbInputError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    callback(path)
+
+
+def multiget_path_to_neighbor_nodes_async(
+        start_node_ids,
+        edge_type_pruner=None,
+        node_type_return_filter=None,
+        neighbor_edges=True,
+        callback=None):
+    """ Traverse depth-1 paths without blocking and pass them to the callback.
+
+    Behave like multiget_path_to_neighbor_nodes(), but don't block the
+    IOLoop on the database, and share the GraphPaths with identical reads
+    in flight.
+
+    Required:
+    list    start_node_ids          start node ids of depth-1 paths
+    func    callback                called with GraphPaths keyed on id
+
+    Optional:
+    list    edge_type_pruner        list of edge types to traverse
+    list    node_type_return_filter list of node types to return
+    bool    neighbor_edges          whether to read neighbors' edges too
+
+    """
+    key = (
+            READ_KIND.PATHS,
+            tuple(sorted(set(start_node_ids))),
+            _freeze(edge_type_pruner),
+            _freeze(node_type_return_filter),
+            bool(neighbor_edges))
+
+    _coalesce(
+            key,
+            functools.partial(
+                    _read_paths_async,
+                    start_node_ids,
+                    edge_type_pruner,
+                    node_type_return_filter,
+                    neighbor_edges),
+            callback)
+
+
+@gen.engine
+def _read_paths_async(
+        start_node_ids,
+        edge_type_pruner,
+        node_type_return_filter,
+        neighbor_edges,
+        callback):
+    """ Read GraphPaths from the database for
+    multiget_path_to_neighbor_nodes_async(). """
+
+    paths = {}
+
+    try:
+        # issue a single db query to generate all paths to neighbors
+        path_dicts = yield gen.Task(
+                database().read_nodes_from_immediate_paths_async,
+                start_node_ids,
+                edge_type_pruner,
+                node_type_return_filter,
+                neighbor_edges=neighbor_edges)
+
+        paths = _process_paths(start_node_ids, path_dicts)
+
+    except DbReadError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    except DbInputError as e:
+        print(e.reason)
+        #logger.debug(e.reason)
+
+    callback(paths)
+
+
+def _coalesce(key, read, callback):
+    """ Call back with the result of a read, sharing it with identical
+    reads in flight.
+
+    The first caller starts the read. Callers with the same key join it
+    until it lands, when each is called back in its own stack context.
+    If the read raises instead, the exception is raised in each caller's
+    stack context, so every request it was shared with fails the same.
+
+    Required:
+    tuple   key         identifies the read, without any write count
+    func    read        starts the read, taking a callback for its result
+    func    callback    called with the result of the read
+
+    """
+    key += (database_manager.writes(),)
+
+    waiters = _flights.get(key)
+    is_new = waiters is None
+    if is_new:
+        waiters = _flights[key] = []
+
+    waiters.append((
+            stack_context.wrap(callback),
+            stack_context.wrap(_raise)))
+
+    if not is_new:
+        return
+
+    def land(result):
+        if _flights.get(key) is waiters:
+            del _flights[key]
+
+        for (waiter, fail) in waiters:
+            IOLoop.instance().add_callback(functools.partial(waiter, result))
+
+    def crash(type, value, traceback):
+        if _flights.get(key) is not waiters:
+            return False
+        del _flights[key]
+
+        # the first caller's own stack context is handling it already
+        for (waiter, fail) in waiters[1:]:
+            IOLoop.instance().add_callback(
+                    functools.partial(fail, type, value, traceback))
+        return False
+
+    with stack_context.ExceptionStackContext(crash):
+        read(callback=land)
+
+
+def _raise(type, value, traceback):
+    """ Raise an exception caught elsewhere, in this stack context. """
+    raise type, value, traceback
+
+
+def _freeze(types):
+    """ Return a hashable, order-independent version of a type list.
+
+    None, meaning every type, stays distinct from an empty list, which the
+    database rejects, so the two never share a flight.
+
+    """
+    if types is None:
+        return None
+    return tuple(sorted(types))
+
+
+def _empty_path(start_node_id):
+    """ Return a depth-1 GraphPath to be filled in one node at a time. """
+    return GraphPath(start_node_id, {0: {}, 1: {}})
+
+
+def _process_paths(start_node_ids, path_dicts):
+    """ Convert path dicts keyed on start node id into GraphPaths. """
+    if path_dicts is None:
+        path_dicts = {}
+
+    # missing start nodes get no path, just like get_path_to_neighbor_nodes
+    paths = {}
+    for start_node_id in start_node_ids:
+        path_dict = path_dicts.get(start_node_id)
+        paths[start_node_id] = None
+        if path_dict is not None:
+            paths[start_node_id] = GraphPath(start_node_id, path_dict)
 
     return paths
@@ -5,6 +5,7 @@ update, and delete actions on nodes and edges.
 
 Provides:
     def create_node
+    def create_node_and_edges
     def update_node
     def delete_node
     def create_edge
@@ -45,35 +46,84 @@ def create_node(prototype_node):
     graph_node = None
 
     try:
-        # isolate the GraphProtoNode members we need
-        properties = prototype_node.properties()
+        properties = _prepare_node_properties(
+                prototype_node,
+                "create_node()")
 
-        # TODO: move this error checking into GraphPrototype subclasses
+        # issue a call to the data layer
+        node = database().create_node(prototype_node.type(), properties)
 
-        # make sure callers don't usurp power over data input
-        bad_properties = [
-                NODE_PROPERTY.ID,
-                NODE_PROPERTY.TYPE,
-                GRAPH_PROPERTY.CREATED_TS,
-                GRAPH_PROPERTY.UPDATED_TS,
-                GRAPH_PROPERTY.DELETED_TS
-                ]
+        # a new node may turn up in any cached index lookup
+        database_manager.invalidate_indexes()
 
-        input_errors = set(bad_properties).intersection(set(properties))
+        graph_node = GraphNode(
+                node[NODE_PROPERTY.ID],
+                node[NODE_PROPERTY.TYPE],
+                node[NODE_PROPERTY.PROPERTIES],
+                node[NODE_PROPERTY.EDGES])
 
-        if input_errors:
-            raise GraphInputError(
-                    input_errors,
-                    "Invalid input supplied to create_node().")
+    except DbInputError as e:
+        #logger.debug(e.reason)
+        print e.reason
+        graph_node = None
 
-        # initialize some required properties
-        current_ts = int(time())
-        properties[GRAPH_PROPERTY.CREATED_TS] = current_ts
-        properties[GRAPH_PROPERTY.UPDATED_TS] = current_ts
-        properties[GRAPH_PROPERTY.DELETED_TS] = False
+    except DbWriteError as e:
+        #logger.debug(e.reason)
+        print e.reason
+        graph_node = None
 
-        # issue a call to the data layer
-        node = database().create_node(prototype_node.type(), properties)
+    return graph_node
+
+
+def create_node_and_edges(prototype_node, prototype_edges):
+    """ Create a node and all of its edges in a graph database at once.
+
+    Issue a single call to the data layer, no matter how many edges there
+    are. A GraphProtoEdge with a missing from or to node id points from or
+    to the new node.
+
+    Required:
+    GraphProtoNode  prototype_node  unwritten version of GraphNode
+    list            prototype_edges unwritten GraphEdges as GraphProtoEdges
+
+    Returns:
+    GraphNode                       new GraphNode with its new GraphEdges
+
+    Raises:
+    GraphInputError                 bad input
+
+    """
+    graph_node = None
+
+    try:
+        properties = _prepare_node_properties(
+                prototype_node,
+                "create_node_and_edges()")
+
+        edges = []
+        for prototype_edge in prototype_edges:
+            edges.append({
+                    EDGE_PROPERTY.FROM_NODE_ID: prototype_edge.from_node_id(),
+                    EDGE_PROPERTY.TO_NODE_ID: prototype_edge.to_node_id(),
+                    EDGE_PROPERTY.TYPE: prototype_edge.type(),
+                    EDGE_PROPERTY.PROPERTIES: _prepare_edge_properties(
+                            prototype_edge,
+                            "create_node_and_edges()"),
+                    })
+
+        # issue a single call to the data layer
+        node = database().create_node_and_edges(
+                prototype_node.type(),
+                properties,
+                edges)
+
+        # the new edges change the nodes at both of their ends
+        node_ids = [node[NODE_PROPERTY.ID]]
+        for edge in edges:
+            node_ids.append(edge[EDGE_PROPERTY.FROM_NODE_ID])
+            node_ids.append(edge[EDGE_PROPERTY.TO_NODE_ID])
+        database_manager.invalidate_nodes(node_ids)
+        database_manager.invalidate_indexes()
 
         graph_node = GraphNode(
                 node[NODE_PROPERTY.ID],
@@ -134,6 +184,9 @@ def update_node(node_id, new_properties):
         # issue a call to the data layer
         node = database().update_node(node_id, new_properties)
 
+        database_manager.invalidate_nodes([node_id])
+        database_manager.invalidate_indexes()
+
         graph_node = GraphNode(
                 node[NODE_PROPERTY.ID],
                 node[NODE_PROPERTY.TYPE],
@@ -169,6 +222,9 @@ def delete_node(node_id):
         # issue a call to the data layer with the required changes
         node = database().delete_node(node_id, {"deleted_ts": int(time())})
 
+        database_manager.invalidate_nodes([node_id])
+        database_manager.invalidate_indexes()
+
         graph_node = GraphNode(
                 node[NODE_PROPERTY.ID],
                 node[NODE_PROPERTY.TYPE],
@@ -204,37 +260,9 @@ def create_edge(prototype_edge):
     graph_edge = None
 
     try:
-        properties = prototype_edge.properties()
-
-        # make sure callers don't usurp power over data input
-        bad_properties = [
-                EDGE_PROPERTY.ID,
-                EDGE_PROPERTY.FROM_NODE_ID,
-                EDGE_PROPERTY.TO_NODE_ID,
-                EDGE_PROPERTY.TYPE,
-                #GRAPH_PROPERTY.IS_ONE_WAY,
-                #GRAPH_PROPERTY.IS_UNIQUE,
-                GRAPH_PROPERTY.CREATED_TS,
-                GRAPH_PROPERTY.UPDATED_TS,
-                GRAPH_PROPERTY.DELETED_TS
-                ]
-
-        input_errors = set(bad_properties).intersection(set(properties))
-
-        if input_errors:
-            raise GraphInputError(
-                    input_errors,
-                    "Invalid input supplied to create_edge().")
-
-        # initialize some required properties
-
-        #properties["is_one_way"] = is_one_way
-        #properties["is_unique"] = is_unique
-
-        current_ts = int(time())
-        properties[GRAPH_PROPERTY.CREATED_TS] = current_ts
-        properties[GRAPH_PROPERTY.UPDATED_TS] = current_ts
-        properties[GRAPH_PROPERTY.DELETED_TS] = False
+        properties = _prepare_edge_properties(
+                prototype_edge,
+                "create_edge()")
 
         # issue a call to the data layer
         edge = database().create_edge(
@@ -243,6 +271,12 @@ def create_edge(prototype_edge):
                 prototype_edge.type(),
                 properties)
 
+        # the new edge changes the nodes at both of its ends
+        database_manager.invalidate_nodes([
+                prototype_edge.from_node_id(),
+                prototype_edge.to_node_id(),
+                ])
+
         graph_edge = GraphEdge(
                 edge[EDGE_PROPERTY.ID],
                 edge[EDGE_PROPERTY.TYPE],
@@ -307,6 +341,11 @@ def update_edge(edge_id, new_properties):
         # issue a call to the data layer
         edge = database().update_edge(edge_id, new_properties)
 
+        database_manager.invalidate_nodes([
+                edge[EDGE_PROPERTY.FROM_NODE_ID],
+                edge[EDGE_PROPERTY.TO_NODE_ID],
+                ])
+
         graph_edge = GraphEdge(
                 edge[EDGE_PROPERTY.ID],
                 edge[EDGE_PROPERTY.TYPE],
@@ -345,6 +384,11 @@ def delete_edge(edge_id):
                 edge_id,
                 {GRAPH_PROPERTY.DELETED_TS: int(time())})
 
+        database_manager.invalidate_nodes([
+                edge[EDGE_PROPERTY.FROM_NODE_ID],
+                edge[EDGE_PROPERTY.TO_NODE_ID],
+                ])
+
         graph_edge = GraphEdge(
                 edge[EDGE_PROPERTY.ID],
                 edge[EDGE_PROPERTY.TYPE],
@@ -363,3 +407,96 @@ def delete_edge(edge_id):
         graph_edge = None
 
     return graph_edge
+
+
+def _prepare_node_properties(prototype_node, caller):
+    """ Validate a GraphProtoNode's properties and add graph properties.
+
+    Required:
+    GraphProtoNode  prototype_node  unwritten version of GraphNode
+    str             caller          name of the caller, for error reporting
+
+    Returns:
+    dict                            properties ready for the data layer
+
+    Raises:
+    GraphInputError                 bad input
+
+    """
+    # isolate the GraphProtoNode members we need
+    properties = prototype_node.properties()
+
+    # TODO: move this error checking into GraphPrototype subclasses
+
+    # make sure callers don't usurp power over data input
+    bad_properties = [
+            NODE_PROPERTY.ID,
+            NODE_PROPERTY.TYPE,
+            GRAPH_PROPERTY.CREATED_TS,
+            GRAPH_PROPERTY.UPDATED_TS,
+            GRAPH_PROPERTY.DELETED_TS
+            ]
+
+    input_errors = set(bad_properties).intersection(set(properties))
+
+    if input_errors:
+        raise GraphInputError(
+                input_errors,
+                "Invalid input supplied to {0}.".format(caller))
+
+    # initialize some required properties
+    current_ts = int(time())
+    properties[GRAPH_PROPERTY.CREATED_TS] = current_ts
+    properties[GRAPH_PROPERTY.UPDATED_TS] = current_ts
+    properties[GRAPH_PROPERTY.DELETED_TS] = False
+
+    return properties
+
+
+def _prepare_edge_properties(prototype_edge, caller):
+    """ Validate a GraphProtoEdge's properties and add graph properties.
+
+    Required:
+    GraphProtoEdge  prototype_edge  unwritten version of GraphEdge
+    str             caller          name of the caller, for error reporting
+
+    Returns:
+    dict                            properties ready for the data layer
+
+    Raises:
+    GraphInputError                 bad input
+
+    """
+    properties = prototype_edge.properties()
+
+    # make sure callers don't usurp power over data input
+    bad_properties = [
+            EDGE_PROPERTY.ID,
+            EDGE_PROPERTY.FROM_NODE_ID,
+            EDGE_PROPERTY.TO_NODE_ID,
+            EDGE_PROPERTY.TYPE,
+            #GRAPH_PROPERTY.IS_ONE_WAY,
+            #GRAPH_PROPERTY.IS_UNIQUE,
+            GRAPH_PROPERTY.CREATED_TS,
+            GRAPH_PROPERTY.UPDATED_TS,
+            GRAPH_PROPERTY.DELETED_TS
+            ]
+
+    input_errors = set(bad_properties).intersection(set(properties))
+
+    if input_errors:
+        raise GraphInputError(
+                input_errors,
+                "Invalid input supplied to {0}.".format(caller))
+
+    # initialize some required properties
+
+    #properties["is_one_way"] = is_one_way
+    #properties["is_unique"] = is_unique
+
+    current_ts = int(time())
+    properties[GRAPH_PROPERTY.CREATED_TS] = current_ts
+    properties[GRAPH_PROPERTY.UPDATED_TS] = current_ts
+    properties[GRAPH_PROPERTY.DELETED_TS] = False
+
+    return properties
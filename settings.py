@@ -11,6 +11,7 @@ from view.modules.components import UISessionModel, UIContextModel
 from view.modules.components import UIPageModel, UITabModel, UILeagueModel
 from view.modules.page import UILeaguePage, UICreateGameDialog, UILandingPage
 from view.modules.dictionary import UILeagueContent
+from handlers.static import AssetHandler
 
 # Application constants
 
@@ -55,6 +56,9 @@ else:
 settings = {}
 settings['debug'] = DEPLOYMENT != DeploymentType.PRODUCTION or options.debug
 settings['static_path'] = MEDIA_ROOT
+# serve fingerprinted assets from memory with far-future cache headers.
+# run `python -m util.assets` at build time to write media/manifest.json.
+settings['static_handler_class'] = AssetHandler
 
 settings['cookie_secret'] = (
         "\xee\x0ec\x9bl\x02\xeb/.\xd4\xeb\xc2(\xb0\xb1\x8a\x0b\xb5[^Tq\xecy")
@@ -64,6 +68,10 @@ settings['facebook_api_key'] = FACEBOOK_APP_ID
 settings['facebook_secret'] = FACEBOOK_SECRET
 
 settings['template_loader'] = tornado.template.Loader(TEMPLATE_ROOT)
+
+# stream synchronous pages, flushing each piece as soon as it's rendered
+# instead of rendering the whole page before writing anything.
+settings['stream_pages'] = False
 settings['ui_modules'] = {
         'UIContextModel': UIContextModel,
         'UICreateGameDialog': UICreateGameDialog,
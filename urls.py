@@ -3,6 +3,7 @@ from handlers.login import LoginHandler
 from handlers.league import LeagueHandler
 from handlers.create import CreateGameHandler
 from handlers.comment import CommentHandler
+from handlers.metrics import MetricsHandler
 
 url_patterns = [
     (r"/", HomeHandler),
@@ -11,4 +12,5 @@ url_patterns = [
     (r"/league/([0-9]+)", LeagueHandler),
     (r"/create/game", CreateGameHandler),
     (r"/comment", CommentHandler),
+    (r"/metrics", MetricsHandler),
 ]
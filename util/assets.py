@@ -0,0 +1,350 @@
+""" Module: assets
+
+Fingerprint static assets so that browsers can cache them forever.
+
+At build time, run `python -m util.assets` to hash every file under
+media/ and write media/manifest.json. The manifest maps each asset's
+path to the same path with a hash of its content in the filename, e.g.
+images/logo.png => images/logo.0123456789ab.png. A fingerprinted URL
+changes whenever its file does, so it can be served with far-future
+cache headers and never revalidated. Without a manifest, one is built
+in memory the first time it's needed.
+
+Stylesheets are fingerprinted after the url()s in them are rewritten to
+point at fingerprinted assets, so a new sprite also busts its CSS.
+
+Provides:
+    def static_url
+    def build_manifest
+    def write_manifest
+    def load_manifest
+    class Asset
+    class AssetStore
+
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from cStringIO import StringIO
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MEDIA_ROOT = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "media")
+
+MANIFEST_FILENAME = "manifest.json"
+
+STATIC_URL_PREFIX = "/static/"
+
+# hex digits of the content hash put in fingerprinted filenames
+HASH_LENGTH = 12
+
+# types worth compressing. images and woff fonts are compressed already.
+COMPRESSIBLE_EXTENSIONS = frozenset([
+        ".css",
+        ".eot",
+        ".html",
+        ".ico",
+        ".js",
+        ".less",
+        ".svg",
+        ".ttf",
+        ])
+
+# url(...) references in stylesheets, split into quote, path, and any
+# query or fragment, as in url('fonts/font.eot?#iefix')
+_CSS_URL_PATTERN = re.compile(
+        r"""url\((['"]?)([^'"()?#]+)([^'"()]*)\1\)""")
+
+# manifests keyed on media root, loaded when first needed
+_manifests = {}
+
+# guard for the manifests
+_lock = threading.Lock()
+
+
+def static_url(path, root=MEDIA_ROOT):
+    """ Return the URL of a static asset, fingerprinted if possible.
+
+    Required:
+    str     path    asset path relative to the media root
+
+    Optional:
+    str     root    the media root
+
+    Return:
+    str             URL of the asset under STATIC_URL_PREFIX
+
+    """
+    return STATIC_URL_PREFIX + load_manifest(root).get(path, path)
+
+
+def build_manifest(root=MEDIA_ROOT):
+    """ Return a dict of fingerprinted paths keyed on asset path.
+
+    Required:
+    str     root    the media root to fingerprint
+
+    """
+    manifest = {}
+    stylesheets = []
+
+    for path in _asset_paths(root):
+        if _is_stylesheet(path):
+            stylesheets.append(path)
+        else:
+            with open(os.path.join(root, path), "rb") as f:
+                manifest[path] = _fingerprint(path, f.read())
+
+    # stylesheets refer to other assets, which are all fingerprinted now.
+    for path in stylesheets:
+        manifest[path] = _fingerprint(path, read_asset(root, path, manifest))
+
+    return manifest
+
+
+def write_manifest(root=MEDIA_ROOT):
+    """ Build the manifest for a media root and write it there. """
+    manifest = build_manifest(root)
+
+    with open(os.path.join(root, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+    return manifest
+
+
+def load_manifest(root=MEDIA_ROOT):
+    """ Return the manifest for a media root, building it if it's missing.
+
+    The manifest is read once per process.
+
+    """
+    manifest = _manifests.get(root)
+    if manifest is not None:
+        return manifest
+
+    with _lock:
+        manifest = _manifests.get(root)
+        if manifest is None:
+            try:
+                with open(os.path.join(root, MANIFEST_FILENAME)) as f:
+                    manifest = json.load(f)
+            except IOError:
+                manifest = build_manifest(root)
+            _manifests[root] = manifest
+
+    return manifest
+
+
+def read_asset(root, path, manifest):
+    """ Return an asset's content as it's served.
+
+    Stylesheets have their url()s pointed at fingerprinted assets.
+
+    Required:
+    str     root        the media root
+    str     path        asset path relative to the media root
+    dict    manifest    fingerprinted paths keyed on asset path
+
+    """
+    with open(os.path.join(root, path), "rb") as f:
+        content = f.read()
+
+    if _is_stylesheet(path):
+        content = _rewrite_css_urls(path, content, manifest)
+
+    return content
+
+
+class Asset(object):
+
+    """ Asset is a static file held in memory, with compressed variants.
+
+    Variables:
+    str     path            fingerprinted path the Asset is served at
+    str     content_type    MIME type of the content
+    str     content         the content, uncompressed
+    str     gzip_content    the content gzipped, or None
+    str     brotli_content  the content brotli compressed, or None
+
+    """
+
+    __slots__ = (
+            "path",
+            "content_type",
+            "content",
+            "gzip_content",
+            "brotli_content",
+            )
+
+
+    def __init__(self, path, content):
+        """ Construct an Asset and compress it if it's worth it.
+
+        Required:
+        str     path        fingerprinted path the Asset is served at
+        str     content     the content, uncompressed
+
+        """
+        self.path = path
+        self.content = content
+        self.gzip_content = None
+        self.brotli_content = None
+
+        (content_type, encoding) = mimetypes.guess_type(path)
+        self.content_type = content_type or "application/octet-stream"
+
+        if os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            self.gzip_content = _smaller(content, _gzip(content))
+            if brotli is not None:
+                self.brotli_content = _smaller(
+                        content,
+                        brotli.compress(content))
+
+
+class AssetStore(object):
+
+    """ AssetStore serves fingerprinted Assets from memory.
+
+    Each Asset is read and compressed the first time it's asked for and
+    kept for the life of the process, which is safe since a fingerprinted
+    path always has the same content.
+
+    Variables:
+    str     _root       the media root
+    dict    _manifest   fingerprinted paths keyed on asset path
+    dict    _paths      asset paths keyed on fingerprinted path
+    dict    _assets     loaded Assets keyed on fingerprinted path
+    Lock    _lock       guard for the loaded Assets
+
+    """
+
+
+    def __init__(self, root=MEDIA_ROOT):
+        """ Construct an AssetStore for a media root.
+
+        Optional:
+        str     root    the media root
+
+        """
+        self._root = root
+        self._manifest = load_manifest(root)
+        self._paths = {v: k for k, v in self._manifest.items()}
+        self._assets = {}
+        self._lock = threading.Lock()
+
+
+    def get(self, fingerprinted_path):
+        """ Return the Asset at a fingerprinted path, or None. """
+        asset = self._assets.get(fingerprinted_path)
+        if asset is not None:
+            return asset
+
+        path = self._paths.get(fingerprinted_path)
+        if path is None:
+            return None
+
+        try:
+            content = read_asset(self._root, path, self._manifest)
+        except IOError as e:
+            print "AssetStore could not read {0}: {1}".format(path, e)
+            return None
+
+        asset = Asset(fingerprinted_path, content)
+
+        with self._lock:
+            self._assets[fingerprinted_path] = asset
+
+        return asset
+
+
+def _asset_paths(root):
+    """ Return the path of every asset under a media root, sorted. """
+    paths = []
+
+    for (directory, subdirectories, filenames) in os.walk(root):
+        subdirectories[:] = [d for d in subdirectories if d[0] != "."]
+
+        for filename in filenames:
+            if filename[0] == "." or filename == MANIFEST_FILENAME:
+                continue
+
+            path = os.path.relpath(os.path.join(directory, filename), root)
+            paths.append(path.replace(os.sep, "/"))
+
+    paths.sort()
+    return paths
+
+
+def _fingerprint(path, content):
+    """ Return a path with a hash of its content before the extension. """
+    (base, extension) = posixpath.splitext(path)
+    digest = hashlib.md5(content).hexdigest()[:HASH_LENGTH]
+    return "{0}.{1}{2}".format(base, digest, extension)
+
+
+def _is_stylesheet(path):
+    """ Return whether an asset is a stylesheet. """
+    return path.lower().endswith(".css")
+
+
+def _rewrite_css_urls(path, content, manifest):
+    """ Point the url()s in a stylesheet at fingerprinted assets. """
+    directory = posixpath.dirname(path)
+
+    def rewrite(match):
+        (quote, url, suffix) = match.groups()
+
+        if url.startswith(STATIC_URL_PREFIX):
+            target = url[len(STATIC_URL_PREFIX):]
+            fingerprinted = manifest.get(target)
+            if fingerprinted is None:
+                return match.group(0)
+            url = STATIC_URL_PREFIX + fingerprinted
+
+        elif "/" == url[:1] or ":" in url:
+            # absolute paths outside /static/, other hosts, and data URIs
+            return match.group(0)
+
+        else:
+            target = posixpath.normpath(posixpath.join(directory, url))
+            fingerprinted = manifest.get(target)
+            if fingerprinted is None:
+                return match.group(0)
+            url = posixpath.relpath(fingerprinted, directory or ".")
+
+        return "url({0}{1}{2}{0})".format(quote, url, suffix)
+
+    return _CSS_URL_PATTERN.sub(rewrite, content)
+
+
+def _gzip(content):
+    """ Return content gzipped at the highest compression level. """
+    buffer = StringIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9) as f:
+        f.write(content)
+    return buffer.getvalue()
+
+
+def _smaller(content, compressed_content):
+    """ Return compressed content if it's smaller, otherwise None. """
+    if len(compressed_content) < len(content):
+        return compressed_content
+    return None
+
+
+if __name__ == "__main__":
+    manifest = write_manifest()
+    print "Fingerprinted {0} assets in {1}.".format(
+            len(manifest),
+            os.path.join(MEDIA_ROOT, MANIFEST_FILENAME))
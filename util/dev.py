@@ -4,20 +4,6 @@ Use these tools in a dev environment only.
 
 """
 from pprint import pprint
-import os
-
-
-def print_timing(func):
-    """ Debug decorator to see how long functions take. """
-
-
-    def wrapper(*arg):
-        t1 = os.times()[4]
-        return_value = func(*arg)
-        t2 = os.times()[4]
-        print "{0} took {1}ms".format(func.func_name, (t2 - t1) * 1000.0)
-        return return_value
-    return wrapper
 
 
 def obj_to_dict(obj, classkey=None):
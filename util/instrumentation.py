@@ -0,0 +1,403 @@
+""" Module: instrumentation
+
+Measure where requests spend their time, per request and in aggregate.
+
+Each request gets a RequestMetrics, which is made current for as long as
+the request runs, including in IOLoop callbacks on its behalf. Code times
+itself with nested spans, either with the timed() decorator or in a
+`with span(name):` block, and counts what it does with count(). Both
+work outside of requests too, where they are only aggregated.
+
+Every span and count is also aggregated for the life of the process, and
+render_prometheus() writes the aggregates in Prometheus' text format. A
+request's own spans and counts are summed up for its Server-Timing
+header by server_timing().
+
+Provides:
+    class Histogram
+    class Counter
+    class Span
+    class RequestMetrics
+    def activate
+    def current
+    def span
+    def timed
+    def count
+    def server_timing
+    def render_prometheus
+
+"""
+import contextlib
+import functools
+import re
+import threading
+import time
+
+
+# upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        )
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# characters which can't be in a Server-Timing metric name
+_NOT_TOKEN = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+# guard for every aggregate
+_lock = threading.Lock()
+
+# the RequestMetrics of the request being run, per thread
+_local = threading.local()
+
+
+class Histogram(object):
+
+    """ Histogram aggregates observed values into cumulative buckets.
+
+    Variables:
+    str     name        metric name
+    str     help        what the metric measures
+    tuple   label_names names of the labels observations are kept by
+    dict    _series     [bucket counts, sum, count] keyed on label values
+
+    """
+
+
+    def __init__(self, name, help, label_names):
+        """ Construct a Histogram.
+
+        Required:
+        str     name        metric name
+        str     help        what the metric measures
+        tuple   label_names names of the labels observations are kept by
+
+        """
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._series = {}
+
+
+    def observe(self, label_values, value):
+        """ Count a value observed for a tuple of label values. """
+        with _lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                        [0] * len(BUCKETS), 0.0, 0]
+
+            buckets = series[0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    buckets[i] += 1
+            series[1] += value
+            series[2] += 1
+
+
+    def samples(self):
+        """ Return (name, labels, value) for each Prometheus sample. """
+        with _lock:
+            series = sorted(
+                    (k, (list(v[0]), v[1], v[2]))
+                    for (k, v) in self._series.items())
+
+        samples = []
+        for (label_values, (buckets, total, count)) in series:
+            labels = zip(self.label_names, label_values)
+            for (bound, bucket) in zip(BUCKETS, buckets):
+                samples.append((
+                        self.name + "_bucket",
+                        labels + [("le", repr(bound))],
+                        bucket))
+            samples.append((
+                    self.name + "_bucket",
+                    labels + [("le", "+Inf")],
+                    count))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, count))
+
+        return samples
+
+
+class Counter(object):
+
+    """ Counter sums amounts counted for each tuple of label values.
+
+    Variables:
+    str     name        metric name
+    str     help        what the metric counts
+    tuple   label_names names of the labels counts are kept by
+    dict    _totals     totals keyed on label values
+
+    """
+
+
+    def __init__(self, name, help, label_names):
+        """ Construct a Counter.
+
+        Required:
+        str     name        metric name
+        str     help        what the metric counts
+        tuple   label_names names of the labels counts are kept by
+
+        """
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._totals = {}
+
+
+    def add(self, label_values, amount=1):
+        """ Add an amount to the total for a tuple of label values. """
+        with _lock:
+            self._totals[label_values] = (
+                    self._totals.get(label_values, 0) + amount)
+
+
+    def samples(self):
+        """ Return (name, labels, value) for each Prometheus sample. """
+        with _lock:
+            totals = sorted(self._totals.items())
+
+        return [(self.name, zip(self.label_names, k), v) for (k, v) in totals]
+
+
+# every request handled, by handler, method, and status code
+REQUEST_SECONDS = Histogram(
+        "sq_request_seconds",
+        "Time taken to handle a request.",
+        ("handler", "method", "status"))
+
+# every span, whether or not it was in a request
+SPAN_SECONDS = Histogram(
+        "sq_span_seconds",
+        "Time spent in a timed span of code.",
+        ("span",))
+
+# everything counted, like Gremlin calls and the bytes they transfer
+EVENTS = Counter(
+        "sq_events_total",
+        "Number of times something happened, or how much of it.",
+        ("event",))
+
+_METRICS = (REQUEST_SECONDS, SPAN_SECONDS, EVENTS)
+
+
+class Span(object):
+
+    """ Span times a named stretch of code, nested in any open span.
+
+    Finish a Span with finish(), or use it as a context manager.
+
+    Variables:
+    str             name        what's being timed
+    int             depth       number of spans this one is nested in
+    float           start       time the span started
+    float           duration    seconds taken, once finished
+    RequestMetrics  _metrics    request the span is part of, or None
+
+    """
+
+    __slots__ = ("name", "depth", "start", "duration", "_metrics")
+
+
+    def __init__(self, name, depth, metrics):
+        """ Construct and start a Span. """
+        self.name = name
+        self.depth = depth
+        self.start = time.time()
+        self.duration = None
+        self._metrics = metrics
+
+
+    def finish(self):
+        """ Stop timing and record this span, if it isn't already. """
+        if self.duration is not None:
+            return
+
+        self.duration = time.time() - self.start
+        SPAN_SECONDS.observe((self.name,), self.duration)
+
+        if self._metrics is not None:
+            self._metrics.close_span(self)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, type, value, traceback):
+        self.finish()
+
+
+class RequestMetrics(object):
+
+    """ RequestMetrics collects the spans and counts of one request.
+
+    Variables:
+    float   start       time the request started
+    list    spans       every span started, in order
+    dict    counts      amounts counted keyed on event
+    list    _open       spans started but not finished, innermost last
+
+    """
+
+
+    def __init__(self):
+        """ Construct RequestMetrics for a request starting now. """
+        self.start = time.time()
+        self.spans = []
+        self.counts = {}
+        self._open = []
+
+
+    def open_span(self, name):
+        """ Start and return a Span nested in whatever span is open. """
+        span = Span(name, len(self._open), self)
+        self.spans.append(span)
+        self._open.append(span)
+        return span
+
+
+    def close_span(self, span):
+        """ Stop nesting spans in a finished span. """
+        # concurrent callbacks may finish spans out of order
+        if span in self._open:
+            self._open.remove(span)
+
+
+    def count(self, event, amount):
+        """ Add an amount to an event's count for this request. """
+        self.counts[event] = self.counts.get(event, 0) + amount
+
+
+    def elapsed(self):
+        """ Return seconds since the request started. """
+        return time.time() - self.start
+
+
+@contextlib.contextmanager
+def activate(metrics):
+    """ Make RequestMetrics current inside a block.
+
+    Run a request inside a tornado StackContext built from this, so that
+    its metrics stay current in its IOLoop callbacks as well.
+
+    """
+    previous = getattr(_local, "metrics", None)
+    _local.metrics = metrics
+    try:
+        yield
+    finally:
+        _local.metrics = previous
+
+
+def current():
+    """ Return the current RequestMetrics, or None outside a request. """
+    return getattr(_local, "metrics", None)
+
+
+def span(name):
+    """ Start and return a Span, nested in the current request's spans. """
+    metrics = current()
+    if metrics is None:
+        return Span(name, 0, None)
+    return metrics.open_span(name)
+
+
+def timed(name):
+    """ Decorate a function so each call is timed in a span.
+
+    Required:
+    str     name    name of the span, like "LeagueModel.load"
+
+    """
+
+    def decorate(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(event, amount=1):
+    """ Count an event, for the current request and in aggregate. """
+    EVENTS.add((event,), amount)
+
+    metrics = current()
+    if metrics is not None:
+        metrics.count(event, amount)
+
+
+def server_timing(metrics):
+    """ Return a Server-Timing header value summing up a request.
+
+    Spans are summed by name, in the order they first started, after the
+    total so far. Counts are given as descriptions.
+
+    """
+    durations = {}
+    names = []
+    for span in metrics.spans:
+        if span.duration is None:
+            continue
+        if span.name not in durations:
+            durations[span.name] = 0.0
+            names.append(span.name)
+        durations[span.name] += span.duration
+
+    entries = ["total;dur={0:.1f}".format(1000 * metrics.elapsed())]
+    for name in names:
+        entries.append("{0};dur={1:.1f}".format(
+                _NOT_TOKEN.sub("_", name),
+                1000 * durations[name]))
+    for (event, amount) in sorted(metrics.counts.items()):
+        entries.append("{0};desc={1}".format(
+                _NOT_TOKEN.sub("_", event),
+                amount))
+
+    return ", ".join(entries)
+
+
+def render_prometheus():
+    """ Return every aggregate in Prometheus' text exposition format. """
+    lines = []
+
+    for metric in _METRICS:
+        kind = "histogram" if isinstance(metric, Histogram) else "counter"
+        lines.append("# HELP {0} {1}".format(metric.name, metric.help))
+        lines.append("# TYPE {0} {1}".format(metric.name, kind))
+
+        for (name, labels, value) in metric.samples():
+            if labels:
+                name = "{0}{{{1}}}".format(name, ",".join(
+                        '{0}="{1}"'.format(k, _escape_label(v))
+                        for (k, v) in labels))
+            lines.append("{0} {1}".format(name, repr(value)))
+
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    """ Escape a label value for the Prometheus text format. """
+    return (unicode(value).replace("\\", "\\\\")
+            .replace("\"", "\\\"")
+            .replace("\n", "\\n"))
@@ -116,24 +116,27 @@ class RelativeDateComponent(Div):
     RELATIVE_DATE_COMPONENT_CLASS = "relative-date-component"
 
 
-    def __init__(self, ts, is_expanded=True):
+    def __init__(self, ts, is_expanded=True, relative_dates=None):
         """Construct a RelativeDateComponent.
 
         Required:
         ts      ts      the time to display
 
         Optional:
-        bool    is_expanded Expand the Relative Date Component
+        bool            is_expanded     Expand the Relative Date Component
+        RelativeDates   relative_dates  formats relative to the request's now
 
         """
         super(RelativeDateComponent, self).__init__()
         self.append_class(self.RELATIVE_DATE_COMPONENT_CLASS)
 
+        if relative_dates is None:
+            relative_dates = date.RelativeDates()
+
         relative_date = Span()
         if is_expanded:
-            relative_date.set_text(
-                    date.format_to_long_relative_datetime(ts))
+            relative_date.set_text(relative_dates.format_long(ts))
         else:
-            relative_date.set_text(date.format_to_short_relative_datetime(ts))
+            relative_date.set_text(relative_dates.format_short(ts))
 
         self.append_child(relative_date)
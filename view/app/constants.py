@@ -4,26 +4,27 @@ App constants there are used in various areas of the application.
 
 """
 from util.decorators import constant
+from util.assets import static_url
 
 
 class _Image(object):
 
-    """_Image contains the location of a number of static images. """
+    """_Image contains the fingerprinted URLs of a number of static images. """
 
     @constant
     def DEFAULT_THUMBNAIL(self):
-        return "/static/images/thumbnail.jpg"
+        return static_url("images/thumbnail.jpg")
 
     @constant
     def DEFAULT_OPPONENT_THUMBNAIL(self):
-        return "/static/images/thumbnail.jpg"
+        return static_url("images/thumbnail.jpg")
 
     @constant
     def DEFAULT_SPORT_THUMBNAIL(self):
-        return "/static/images/thumbnail.jpg"
+        return static_url("images/thumbnail.jpg")
 
     @constant
     def TIME_ICON(self):
-        return "/static/images/timeIcon.png"
+        return static_url("images/timeIcon.png")
 
 IMAGE = _Image()
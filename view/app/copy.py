@@ -25,6 +25,10 @@ class _Copy(object):
     def feed_title(self):
         return "Feed"
 
+    @property
+    def older_games(self):
+        return "Older games"
+
     @property
     def defeated(self):
         return "defeated"
@@ -10,7 +10,7 @@ from view.elements.base import Form, TextInput, HiddenInput, SubmitButton
 from view.elements.components import HeadedList, HeadedListItem, NumberedList
 from view.elements.components import MultiColumnLI
 from view.app.copy import Copy
-from view.app.components import AppThumbnail, RelativeDateComponent
+from view.app.components import AppThumbnail
 
 
 class SportComponent(Span):
@@ -52,19 +52,19 @@ class CommentsSection(Section):
     COMMENTS_SECTION_CLASS = "comments-section"
 
 
-    def __init__(self, current_person, object_with_comments):
+    def __init__(self, parts, object_with_comments):
         """ Construct a CommentsBox.
 
         Required:
-        Person  current_person  the current User's associated Person
+        StoryParts  parts       builds the viewer and time dependent parts
         sqobject object_with_comments  the object that was commented on
 
         """
         super(CommentsSection, self).__init__()
         self.append_class(self.COMMENTS_SECTION_CLASS)
 
-        self.append_child(CommentsList(object_with_comments))
-        self.append_child(CommentForm(current_person, object_with_comments.id))
+        self.append_child(CommentsList(parts, object_with_comments))
+        self.append_child(parts.comment_form(object_with_comments.id))
 
 
 class CommentsList(UL):
@@ -72,25 +72,27 @@ class CommentsList(UL):
     """ Comments List is a list of comments for a story. """
 
 
-    def __init__(self, object_with_comments):
+    def __init__(self, parts, object_with_comments):
         """ Construct a CommentsList.
 
         Required:
+        StoryParts  parts       builds the viewer and time dependent parts
         SqObject object_with_comments  the object that was commented on
 
         """
+        self._parts = parts
         super(CommentsList, self).__init__(
                 self._construct_items(object_with_comments))
 
 
     def set_list_item(self, item, index):
         """ Construct and add a list item as a child of this list. """
-        self.append_child(CommentLI(item, index))
+        self.append_child(CommentLI(item, index, self._parts))
 
 
     # remove this function when the items can be more properly constructed
     def _construct_items(self, object_with_comments):
-        """ Return a list of comment_items.
+        """ Return a list of (comment, commenter) items.
 
         Required:
         SqObject object_with_comments  the object that was commented on
@@ -99,44 +101,53 @@ class CommentsList(UL):
         items = []
         comments = object_with_comments.comments
         for comment in comments:
+            # FIXME: this breaks the contract that view shouldn't be calling
+            # methods on model objects, and the view shouldn't have to merge
+            # two items into one item. clearly the comment should have more
+            # information in it.
             person = object_with_comments.get_commenter(comment.commenter_id)
-            # FIXME: this is the worst code in our application
-            # because it breaks the contract that view shouldn't be calling
-            # methods on model object (see line above this comment) and also
-            # the view shouldn't have to merge two items into one item. clearly
-            # the comment should have more information in it.
-            comment.commenter_name = person.name
-            comment.commenter_picture_url = person.picture_url
-            items.append(comment)
+            items.append((comment, person))
 
         return items
 
 
-
 class CommentLI(MultiColumnLI):
 
     """ CommentLI is a single comment in the CommentsList. """
 
 
+    def __init__(self, item, index, parts):
+        """ Construct a CommentLI.
+
+        Required:
+        tuple       item        (comment, commenter)
+        int         index       position of the comment in the list
+        StoryParts  parts       builds the viewer and time dependent parts
+
+        """
+        self._parts = parts
+        super(CommentLI, self).__init__(item, index)
+
+
     def set_content(self, item):
         """ Set content for CommentLI. """
-        comment = item  # item must be a comment
+        (comment, commenter) = item  # item must be a (comment, commenter)
 
         thumbnail = AppThumbnail(
-                comment.commenter_picture_url,
-                comment.commenter_name)
+                commenter.picture_url,
+                commenter.name)
         self.set_column(thumbnail)
 
         div = Div()
 
-        name = A({"href": "#"}, comment.commenter_name)
+        name = A({"href": "#"}, commenter.name)
         div.append_child(name)
 
         msg = Span()
         msg.set_text(comment.message)
         div.append_child(msg)
 
-        created_ts = RelativeDateComponent(comment.created_ts)
+        created_ts = self._parts.relative_date(comment.created_ts)
         div.append_child(created_ts)
 
         self.set_column(div)
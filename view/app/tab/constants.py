@@ -42,3 +42,21 @@ class _TabID(object):
         return "content-container"
 
 TAB_ID = _TabID()
+
+
+class _StoryCache(object):
+
+    """ _StoryCache holds the limits of the rendered Story cache. """
+
+    @constant
+    def MAX_SIZE(self):
+        """ Most rendered Stories held before the oldest are evicted. """
+        return 1000
+
+    @constant
+    def TTL(self):
+        """ Seconds a rendered Story is reused, since names and pictures
+        of the people in it may change without the Story changing. """
+        return 300
+
+STORY_CACHE = _StoryCache()
@@ -4,15 +4,18 @@ Element components that are for the tab framework.
 
 """
 
+import urllib
+
 from view.constants import SQ_DATA
-from view.elements.base import Section, Div
+from view.elements.base import Section, Div, Slot
 from view.elements.components import CreateButton, MenuButton, MainHeader
+from view.elements.components import NonRoutingAnchor
 from view.app.components import Headline
 from view.app.copy import Copy
 from view.app.framework import ContentWrapper
 
 from constants import TAB_ID
-from story import StoryFactory
+from story import StoryFactory, StoryParts
 
 
 class TabHeader(MainHeader):
@@ -69,8 +72,25 @@ class TabContentSection(Section):
     """
 
 
-    def __init__(self, context, aggregations, objects, current_person):
-        """ Construct a tab's content section element tree. """
+    def __init__(
+            self,
+            context,
+            aggregations,
+            objects,
+            current_person,
+            next_cursor=None):
+        """ Construct a tab's content section element tree.
+
+        Required:
+        Context     context         the tab's context
+        dict        aggregations    the tab's summary aggregations
+        list        objects         feed objects, or None to leave a Slot
+        Person      current_person  the current User's Person
+
+        Optional:
+        str         next_cursor     cursor for the feed's next page
+
+        """
         super(TabContentSection, self).__init__()
         self._current_person = current_person
 
@@ -80,7 +100,7 @@ class TabContentSection(Section):
 
         self.append_child(self.construct_properties_content(context))
         self.append_child(self.construct_summary_content(aggregations))
-        self.append_child(self.construct_feed_content(objects))
+        self.append_child(self.construct_feed_content(objects, next_cursor))
 
 
     def construct_properties_content(self, context):
@@ -93,9 +113,9 @@ class TabContentSection(Section):
         return SummaryDiv(aggregations)
 
 
-    def construct_feed_content(self, objects):
+    def construct_feed_content(self, objects, next_cursor=None):
         """ Construct and add feed content to this content section. """
-        return FeedDiv(self._current_person, objects)
+        return FeedDiv(self._current_person, objects, next_cursor)
 
 
 class PropertiesDiv(Div):
@@ -145,20 +165,57 @@ class FeedDiv(Div):
 
     """ FeedDiv encapsulates a tab's feed attribute <div>. """
 
+    # key of the Slot left for stories which are rendered separately
+    STORIES_SLOT_KEY = ("stories",)
+
+
+    def __init__(self, current_person, objects, next_cursor=None):
+        """ Construct a tab's feed content element tree.
 
-    def __init__(self, current_person, objects):
-        """ Construct a tab's feed content element tree. """
+        If objects is None, leave a Slot where the stories go so they can
+        be rendered and streamed separately. If there's a next_cursor, end
+        the feed with a link to its next page.
+
+        """
         super(FeedDiv, self).__init__()
         self.set_id(TAB_ID.FEED)
 
         self.append_child(Headline(Copy.feed_title))
 
-        if len(objects) > 0:
+        if objects is None:
+            self.append_child(Slot(self.STORIES_SLOT_KEY))
+        elif len(objects) > 0:
             self.set_content(current_person, objects)
 
+        if next_cursor is not None:
+            self.append_child(FeedMoreAnchor(next_cursor))
+
 
     def set_content(self, current_person, objects):
         """ Construct and add content as a direct child. """
+        parts = StoryParts(current_person)
         for object in objects:
-            self.append_child(
-                    StoryFactory.construct_story(current_person, object))
+            self.append_child(StoryFactory.construct_story(parts, object))
+
+
+class FeedMoreAnchor(NonRoutingAnchor):
+
+    """ FeedMoreAnchor links to the page of a feed after a cursor.
+
+    Without javascript it loads the older page in full. The tab's
+    ContentView reads the cursor from data-before and appends the page's
+    stories to the feed instead.
+
+    """
+
+    FEED_MORE_CLASS = "feed-more"
+
+
+    def __init__(self, next_cursor):
+        """ Construct an anchor to the feed's page after next_cursor. """
+        url = {"href": "?{0}={1}".format(
+                SQ_DATA.BEFORE,
+                urllib.quote(next_cursor, ""))}
+        super(FeedMoreAnchor, self).__init__(url, Copy.older_games)
+        self.append_class(self.FEED_MORE_CLASS)
+        self.set_data(SQ_DATA.BEFORE, next_cursor)
@@ -28,9 +28,9 @@ class LeagueContentSection(TabContentSection):
         return LeagueSummaryDiv(aggregations)
 
 
-    def construct_feed_content(self, objects):
+    def construct_feed_content(self, objects, next_cursor=None):
         """ Construct and add feed content to this content section. """
-        return LeagueFeedDiv(self._current_person, objects)
+        return LeagueFeedDiv(self._current_person, objects, next_cursor)
 
 
 
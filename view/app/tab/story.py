@@ -3,20 +3,35 @@
 All the story components. The Stories are currently only used in the
 FeedSection of a Tab.
 
+A rendered GameStory is cached until its Game or the Game's comments
+change. Parts of a Story which depend on the viewer or on the current
+time are left as Slots in the cached markup and rendered per request.
+
 """
 
-from view.elements.base import Div
+# absolute, since the model package is shadowed by view.app.tab.model
+from __future__ import absolute_import
+
+from model.data.cache.lru import LruCache
+
+from view.elements.base import Element, Div, Fragment, Slot
+from view.view_util.date import RelativeDates
+from view.elements.fragment import FragmentTemplate
 from view.app.components import RelativeDateComponent, Headline, AppThumbnail
 
-from components import HeadlineSection
-from components import CommentsSection
-from media import BoxscoreMedia
+from view.app.tab.constants import STORY_CACHE
+from view.app.tab.components import HeadlineSection
+from view.app.tab.components import CommentsSection, CommentForm
+from view.app.tab.media import BoxscoreMedia
 
 
 # TODO: get this from handlers in production
 APP_URL = "http://onscoreboard.com/"
 STORY_SLUG = "story/"
 
+# rendered GameStories keyed on Game id, last update and comment count
+_game_stories = LruCache(STORY_CACHE.MAX_SIZE, STORY_CACHE.TTL)
+
 
 class StoryFactory(object):
 
@@ -36,14 +51,21 @@ class StoryFactory(object):
 
 
     @staticmethod
-    def construct_story(current_person, story_object):
-        """ Construct a Story from a Node or Edge Object. """
+    def construct_story(parts, story_object):
+        """ Construct a Story from a Node or Edge Object.
+
+        Required:
+        StoryParts  parts           builds the viewer and time dependent
+                                    parts, shared by a request's Stories
+        SqNode      story_object    Object to build story around
+
+        """
 
         story = None
 
         # TODO: find a way to ship node/edge types to the view.
         if story_object.type == "game":
-            story = GameStory.construct_story(current_person, story_object)
+            story = GameStory.construct_story(parts, story_object)
         else:
             raise StoryError(story_object.type, "Story constructor not found.")
 
@@ -53,6 +75,76 @@ class StoryFactory(object):
         return story
 
 
+class StoryParts(object):
+
+    """ StoryParts constructs the parts of a Story which depend on the
+    viewer or on the current time.
+
+    Construct one StoryParts per request so that every date in it is
+    relative to the same now.
+
+    Variables:
+    Person          _current_person     the current User's associated Person
+    RelativeDates   _relative_dates     formats dates relative to now
+
+    """
+
+
+    def __init__(self, current_person):
+        """ Construct StoryParts for the current User's Person. """
+        self._current_person = current_person
+        self._relative_dates = RelativeDates()
+
+
+    def relative_date(self, ts, is_expanded=True):
+        """ Construct a date relative to now. """
+        return RelativeDateComponent(ts, is_expanded, self._relative_dates)
+
+
+    def format_relative_dates(self, slot_keys):
+        """ Format the dates for a template's relative_date Slots in one
+        pass, so rendering those Slots only looks them up. """
+        for is_expanded in (True, False):
+            self._relative_dates.format_all(
+                    [key[1] for key in slot_keys
+                            if key[0] == "relative_date"
+                            and key[2] == is_expanded],
+                    is_expanded)
+
+
+    def comment_form(self, story_id):
+        """ Construct a form for the current Person to comment with. """
+        return CommentForm(self._current_person, story_id)
+
+
+    def render_slot(self, key):
+        """ Render the part a StorySlots Slot was left for. """
+        construct_part = getattr(self, key[0])
+        return Element.to_string(construct_part(*key[1:]))
+
+
+class StorySlots(StoryParts):
+
+    """ StorySlots leaves a Slot for each part of a Story which depends
+    on the viewer or on the current time, so that the rest of the Story
+    can be rendered once and cached. """
+
+
+    def __init__(self):
+        """ Construct StorySlots, which don't need a viewer. """
+        super(StorySlots, self).__init__(None)
+
+
+    def relative_date(self, ts, is_expanded=True):
+        """ Leave a Slot for a date relative to now. """
+        return Slot(("relative_date", ts, is_expanded))
+
+
+    def comment_form(self, story_id):
+        """ Leave a Slot for the current Person's comment form. """
+        return Slot(("comment_form", story_id))
+
+
 class StoryError(Exception):
 
     """ StoryError extending Exception.
@@ -76,11 +168,11 @@ class Story(Div):
     STORY_CLASS = "story"
 
 
-    def __init__(self, current_person, story_object):
+    def __init__(self, parts, story_object):
         """ Construct a Story.
 
         Required:
-        Person  current_person  the current User's associated Person
+        StoryParts  parts   builds the viewer and time dependent parts
         SqNode  story_object  Object to build story around
 
         """
@@ -99,7 +191,7 @@ class Story(Div):
         headline_section = HeadlineSection(
                 creator_thumbnail,
                 story_headline,
-                RelativeDateComponent(story_object.created_ts, False))
+                parts.relative_date(story_object.created_ts, False))
 
         # add headline and media section to story
         self.append_child(headline_section)
@@ -112,7 +204,7 @@ class Story(Div):
         # self._main_section.append_child(feedbackButton)
 
         # add feedback section to story
-        self.append_child(CommentsSection(current_person, story_object))
+        self.append_child(CommentsSection(parts, story_object))
 
 
     def _construct_story_headline(self, story_object):
@@ -142,15 +234,15 @@ class GameStory(Story):
     GAME_STORY_CLASS = "game-story"
 
 
-    def __init__(self, current_person, game):
+    def __init__(self, parts, game):
         """ Construct a GameStory.
 
         Required:
-        Person  current_person  the current User's associated Person
+        StoryParts  parts   builds the viewer and time dependent parts
         object  game    the Game that the story pulls data from
 
         """
-        super(GameStory, self).__init__(current_person, game)
+        super(GameStory, self).__init__(parts, game)
         self.append_class(self.GAME_STORY_CLASS)
 
 
@@ -178,6 +270,18 @@ class GameStory(Story):
 
 
     @staticmethod
-    def construct_story(current_person, game):
-        """ Provide StoryFactory with GameStory subclass constructors. """
-        return GameStory(current_person, game)
+    def construct_story(parts, game):
+        """ Provide StoryFactory with GameStory subclass constructors.
+
+        The GameStory is rendered from cache unless its Game changed.
+
+        """
+        key = (game.id, game.last_updated_ts, len(game.comments))
+
+        template = _game_stories.get(key)
+        if template is None:
+            template = FragmentTemplate(GameStory(StorySlots(), game))
+            _game_stories.set(key, template)
+
+        parts.format_relative_dates(template.slot_keys())
+        return Fragment(template.render(parts.render_slot))
@@ -84,6 +84,10 @@ class _SqData(object):
     def PAGE_NAME(self):
         return "page-name"
 
+    @constant
+    def BEFORE(self):
+        return "before"
+
 SQ_DATA = _SqData()
 
 
@@ -183,3 +187,40 @@ class _ModelID(object):
         return "model-page-state"
 
 MODEL_ID = _ModelID()
+
+
+class _ResponseKey(object):
+
+    """ _ResponseKey class to hold all keys of an asynchronous response. """
+
+    @constant
+    def CONTENT(self):
+        return "content"
+
+    @constant
+    def HEADER(self):
+        return "header"
+
+    @constant
+    def CONTEXT_MODEL(self):
+        return "context_model"
+
+    @constant
+    def SESSION_MODEL(self):
+        return "session_model"
+
+    @constant
+    def PAGE_STATE_MODEL(self):
+        return "page_state_model"
+
+    @constant
+    def NEXT_CURSOR(self):
+        """ Cursor to request the feed's next page with, or None. """
+        return "next_cursor"
+
+    @constant
+    def TIMINGS(self):
+        """ Milliseconds spent rendering each fragment, keyed as above. """
+        return "timings"
+
+RESPONSE_KEY = _ResponseKey()
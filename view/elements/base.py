@@ -14,6 +14,14 @@ applicable to building anything on any platform, it likely belongs here.
 The base class Element also provides static cElementTree wrappers:
     def to_string(element)
 
+Elements are built on xml.etree.cElementTree or on chunks.Node, which
+serializes faster, depending on settings.element_backend. Both produce
+byte-identical markup.
+
+Markup which isn't built as an Element tree can stand in a tree as:
+    Fragment    markup rendered ahead of time
+    Slot        markup to be rendered later, see fragment.FragmentTemplate
+
 
 The following tags are implemented as Element subclasses:
     div
@@ -83,11 +91,29 @@ they change the functionality of their element.
 
 """
 
+import itertools
+import re
 import xml.etree.cElementTree as ET
 
 import xsrf
+import settings
+import chunks
 from constants import HTML_TAG, HTML_ATTRIBUTE, HTML_TYPE, HTML_CONSTANT
-from constants import HTML_CLASS
+from constants import HTML_CLASS, ELEMENT_BACKEND
+
+
+if settings.element_backend == ELEMENT_BACKEND.CHUNKS:
+    _new_node = chunks.Node
+    _new_comment = chunks.Comment
+    _tostring = chunks.tostring
+else:
+    _new_node = ET.Element
+    _new_comment = ET.Comment
+    _tostring = lambda node: ET.tostring(node, "utf-8", "html")
+
+# HTML_CONSTANT rebuilds these on every access, so look them up just once.
+_ATTRIBUTES = HTML_CONSTANT.ATTRIBUTES
+_TYPES = HTML_CONSTANT.TYPES
 
 
 class Element(object):
@@ -160,7 +186,7 @@ class Element(object):
         """ Construct an abstract Element. """
         # enforce that the attributes and extra parameters are unused and that
         # attributes are explicitly set. it's not even clear what extra is.
-        self._element = ET.Element(tag)
+        self._element = _new_node(tag)
 
 
     @classmethod
@@ -242,7 +268,7 @@ class Element(object):
         else:
             value = str(value)
 
-        if attribute in HTML_CONSTANT.ATTRIBUTES[self.tag()]:
+        if attribute in _ATTRIBUTES[self.tag()]:
             self.element().set(attribute, value)
         # special condition for data-* attribute
         elif attribute.find(HTML_ATTRIBUTE.DATA) != -1:
@@ -355,7 +381,7 @@ class Element(object):
         Check the type against the list of allowed type values.
 
         """
-        if type in HTML_CONSTANT.TYPES:
+        if type in _TYPES:
             self._set_attribute(HTML_ATTRIBUTE.TYPE, type)
         else:
             description = "Type cannot be of value {0}.".format(type)
@@ -524,10 +550,15 @@ class Element(object):
 
     @staticmethod
     def to_string(element=None):
-        """ Convenience wrapper to standardize on utf-8 and html. """
+        """ Convenience wrapper to standardize on utf-8 and html.
+
+        Any Fragments in the tree are replaced by their markup.
+
+        """
         if element is not None:
             element.assert_valid_root()
-            return ET.tostring(element.element(), "utf-8", "html")
+            markup = _tostring(element.element())
+            return Fragment.splice(element, markup)
         else:
             return ""
 
@@ -1089,7 +1120,7 @@ class Button(Element):
         """
         super(Button, self).__init__(HTML_TAG.BUTTON)
 
-        if type in HTML_CONSTANT.TYPES:
+        if type in _TYPES:
             self.set_type(type)
         else:
             raise InvalidAttributeError(
@@ -1133,6 +1164,105 @@ class Img(Element):
         self.set_alt(alt_text)
 
 
+class Placeholder(Element):
+
+    """ Abstract Placeholder for markup which isn't an Element tree.
+
+    A Placeholder is an html comment naming it uniquely, which carries
+    its value in an attribute that is never serialized. Subclasses
+    decide what that value is and what the comment is replaced with.
+
+    """
+
+    PLACEHOLDER_KEY = None
+
+    _ids = itertools.count()
+
+
+    def __init__(self, value):
+        """ Construct a Placeholder holding a value. """
+        name = "{0}:{1}".format(self.PLACEHOLDER_KEY, next(Placeholder._ids))
+        self._element = _new_comment(name)
+        self._element.set(self.PLACEHOLDER_KEY, value)
+
+
+    @classmethod
+    def pattern(class_):
+        """ Return a regex matching serialized Placeholders by name. """
+        return re.compile("<!--({0}:[0-9]+)-->".format(class_.PLACEHOLDER_KEY))
+
+
+    @classmethod
+    def find_values(class_, element):
+        """ Return the values of an Element's Placeholders keyed on name. """
+        values = {}
+        for elem in element.element().iter():
+            value = elem.get(class_.PLACEHOLDER_KEY)
+            if value is not None:
+                values[elem.text] = value
+        return values
+
+
+class Fragment(Placeholder):
+
+    """ Fragment is markup rendered ahead of time.
+
+    A Fragment is appended to an Element tree like any other Element,
+    and to_string splices its markup into the tree's markup. This lets
+    parts of a page which rarely change be cached as strings instead of
+    being rebuilt as trees on every request.
+
+    """
+
+    PLACEHOLDER_KEY = "sq-fragment"
+
+
+    def __init__(self, markup):
+        """ Construct a Fragment.
+
+        Required:
+        str     markup      utf-8 html, as returned by Element.to_string
+
+        """
+        super(Fragment, self).__init__(markup)
+
+
+    @staticmethod
+    def splice(element, markup):
+        """ Return an Element's markup with its Fragments spliced in. """
+        if "<!--{0}:".format(Fragment.PLACEHOLDER_KEY) not in markup:
+            return markup
+
+        fragments = Fragment.find_values(element)
+        return _FRAGMENT_PATTERN.sub(
+                lambda match: fragments[match.group(1)],
+                markup)
+
+
+class Slot(Placeholder):
+
+    """ Slot marks markup to be rendered later and then filled in.
+
+    See fragment.FragmentTemplate.
+
+    """
+
+    PLACEHOLDER_KEY = "sq-slot"
+
+
+    def __init__(self, key):
+        """ Construct a Slot.
+
+        Required:
+        tuple   key     what to render into this Slot
+
+        """
+        super(Slot, self).__init__(key)
+
+
+_FRAGMENT_PATTERN = Fragment.pattern()
+
+
 class ElementError(Exception):
 
     """ ElementError is a subclass of Exception.
@@ -0,0 +1,148 @@
+""" Module: chunks
+
+Provide a pure python stand-in for the parts of cElementTree that
+base.Element uses, which serializes straight to a list of string chunks.
+
+cElementTree is fast to build but serializes through ElementTree's
+generic writer, which first walks the whole tree to resolve namespaces
+we never use. Nodes here are plain slotted objects, and tostring()
+writes each one in a single pass, escaping exactly like ElementTree's
+html method so that the output is byte-identical.
+
+Provides:
+    class Node
+    def Comment
+    def tostring
+
+"""
+
+from xml.etree.ElementTree import HTML_EMPTY
+from xml.etree.ElementTree import _escape_cdata, _escape_attrib_html, _encode
+
+
+# tag of comment Nodes, which can't collide with a real tag name
+COMMENT = object()
+
+ENCODING = "utf-8"
+
+
+class Node(object):
+
+    """ Node implements the subset of the cElementTree Element API that
+    base.Element needs.
+
+    Variables:
+    str     tag         element type
+    str     text        data found between the element's tags
+    str     tail        data found after the element's end tag
+    dict    attrib      the element's attributes
+    list    _children   child Nodes, in order
+
+    """
+
+    __slots__ = ("tag", "text", "tail", "attrib", "_children")
+
+
+    def __init__(self, tag):
+        """ Construct a Node for a tag. """
+        self.tag = tag
+        self.text = None
+        self.tail = None
+        self.attrib = {}
+        self._children = []
+
+
+    def get(self, key, default=None):
+        """ Return an attribute's value, or default. """
+        return self.attrib.get(key, default)
+
+
+    def set(self, key, value):
+        """ Set an attribute's value. """
+        self.attrib[key] = value
+
+
+    def items(self):
+        """ Return this Node's attributes as (key, value) pairs. """
+        return self.attrib.items()
+
+
+    def keys(self):
+        """ Return this Node's attribute names. """
+        return self.attrib.keys()
+
+
+    def append(self, node):
+        """ Add a child Node at the end. """
+        self._children.append(node)
+
+
+    def insert(self, index, node):
+        """ Add a child Node at an index. """
+        self._children.insert(index, node)
+
+
+    def iter(self):
+        """ Yield this Node and all its descendants, depth first. """
+        yield self
+        for child in self._children:
+            for node in child.iter():
+                yield node
+
+
+    def __iter__(self):
+        """ Iterate over this Node's children. """
+        return iter(self._children)
+
+
+    def __len__(self):
+        """ Return the number of children. """
+        return len(self._children)
+
+
+def Comment(text):
+    """ Return a Node serialized as an html comment. """
+    comment = Node(COMMENT)
+    comment.text = text
+    return comment
+
+
+def tostring(node):
+    """ Return a Node tree as utf-8 html, as ET.tostring would. """
+    chunks = []
+    _write(chunks.append, node)
+    return "".join(chunks)
+
+
+def _write(write, node):
+    """ Write a Node and its descendants as html chunks. """
+    tag = node.tag
+    text = node.text
+
+    if tag is COMMENT:
+        write("<!--%s-->" % _escape_cdata(text, ENCODING))
+
+    else:
+        write("<" + tag)
+        if node.attrib:
+            for key, value in sorted(node.attrib.items()):
+                write(" %s=\"%s\"" % (
+                        key,
+                        _escape_attrib_html(value, ENCODING)))
+        write(">")
+
+        if text:
+            lower_tag = tag.lower()
+            if lower_tag == "script" or lower_tag == "style":
+                write(_encode(text, ENCODING))
+            else:
+                write(_escape_cdata(text, ENCODING))
+
+        for child in node._children:
+            _write(write, child)
+
+        if tag.lower() not in HTML_EMPTY:
+            write("</" + tag + ">")
+
+    if node.tail:
+        write(_escape_cdata(node.tail, ENCODING))
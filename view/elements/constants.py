@@ -429,3 +429,22 @@ class _HTMLConstant(object):
 
 
 HTML_CONSTANT = _HTMLConstant()
+
+
+class _ElementBackend(object):
+
+    """ _ElementBackend class to hold the trees Elements can be built on. """
+
+
+    @constant
+    def CELEMENTTREE(self):
+        """ CELEMENTTREE builds on xml.etree.cElementTree. """
+        return "cElementTree"
+
+
+    @constant
+    def CHUNKS(self):
+        """ CHUNKS builds on chunks.Node and serializes to string chunks. """
+        return "chunks"
+
+ELEMENT_BACKEND = _ElementBackend()
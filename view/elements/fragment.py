@@ -0,0 +1,87 @@
+""" Module: fragment
+
+Cache rendered markup so that components which rarely change don't have
+to be rebuilt as Element trees and serialized on every request.
+
+Parts of a component which do change from request to request, like
+anything that depends on the viewer or on the current time, are built
+as Slots. Serializing the component then leaves a FragmentTemplate: its
+markup cut up around those Slots, which are filled in each time it's
+rendered.
+
+FragmentTemplates are kept in a model.data.cache.lru.LruCache by the
+components which render them.
+
+Provides:
+    class FragmentTemplate
+
+"""
+
+from base import Element, Slot
+
+
+class FragmentTemplate(object):
+
+    """ FragmentTemplate is serialized markup with Slots to fill in.
+
+    Variables:
+    list    _chunks     markup before, between and after the Slots
+    list    _slot_keys  key of each Slot, in order
+
+    """
+
+
+    def __init__(self, element):
+        """ Serialize an Element tree into a FragmentTemplate.
+
+        Required:
+        Element     element     tree with Slots for the per-request parts
+
+        """
+        slot_keys = Slot.find_values(element)
+
+        # re.split leaves markup at even indexes and Slot names at odd ones
+        pieces = _SLOT_PATTERN.split(Element.to_string(element))
+
+        self._chunks = pieces[0::2]
+        self._slot_keys = [slot_keys[name] for name in pieces[1::2]]
+
+
+    def slot_keys(self):
+        """ Return the key of each Slot, in order. """
+        return self._slot_keys
+
+
+    def render(self, render_slot):
+        """ Return this template's markup with its Slots filled in.
+
+        Required:
+        func    render_slot     return markup for a Slot given its key
+
+        Return:
+        str                     utf-8 html
+
+        """
+        output = [self._chunks[0]]
+        for (key, chunk) in zip(self._slot_keys, self._chunks[1:]):
+            output.append(render_slot(key))
+            output.append(chunk)
+
+        return "".join(output)
+
+
+    def stream(self, stream_slot):
+        """ Yield this template's markup a piece at a time.
+
+        Required:
+        func    stream_slot     yield markup for a Slot given its key
+
+        """
+        yield self._chunks[0]
+        for (key, chunk) in zip(self._slot_keys, self._chunks[1:]):
+            for markup in stream_slot(key):
+                yield markup
+            yield chunk
+
+
+_SLOT_PATTERN = Slot.pattern()
@@ -0,0 +1,12 @@
+""" Module: Element Settings
+
+Provide settings for building and serializing Elements.
+
+"""
+
+from constants import ELEMENT_BACKEND
+
+
+# the tree every Element is built on. both backends render byte-identical
+# markup; chunks serializes much faster.
+element_backend = ELEMENT_BACKEND.CHUNKS
@@ -7,24 +7,128 @@ Each class has a single requirement...override render.
 
 """
 
+import time
+
 import tornado.web
 from tornado import escape
 
+from view.constants import PAGE_TYPE, PAGE_NAME, SQ_DATA, RESPONSE_KEY
 from view.elements import xsrf
 from view.elements.base import Element
+from view.app.tab.framework import TabHeader
 from view.app.tab.league import LeagueContentSection
+from view.app.tab.model import ContextModel, PageModel, SessionModel
+
+
+def find_current_person(model, person_id):
+    """ Return the current User's Person from a model's rivals, or None. """
+    return model.get_rival(person_id)
+
+
+class UITabDictionary(tornado.web.UIModule):
+
+    """ Render every fragment of an asynchronous Tab response at once.
+
+    The current Person is found once and shared by every fragment, and
+    each fragment is built as an Element tree and serialized directly
+    instead of going through a template of its own.
+
+    Variables:
+    str     PAGE_NAME           the PAGE_NAME of this Tab
+    Person  _current_person     the current User's Person
+    dict    _timings            milliseconds spent on each fragment
+
+    """
+
+    PAGE_NAME = None
+
+
+    def render(self, model=None, state=None):
+        """ Return a dict of rendered fragments keyed on RESPONSE_KEY. """
+        xsrf.set_xsrf_token(escape.xhtml_escape(self.handler.xsrf_token))
+
+        self._current_person = find_current_person(
+                model,
+                self.current_user.person_id)
+        self._timings = {}
+
+        response = {
+                RESPONSE_KEY.CONTENT: self._render_fragment(
+                        RESPONSE_KEY.CONTENT,
+                        self._construct_content_section,
+                        model),
+                RESPONSE_KEY.HEADER: self._render_fragment(
+                        RESPONSE_KEY.HEADER,
+                        TabHeader,
+                        model.context),
+                RESPONSE_KEY.CONTEXT_MODEL: self._render_fragment(
+                        RESPONSE_KEY.CONTEXT_MODEL,
+                        ContextModel,
+                        model.context),
+                RESPONSE_KEY.SESSION_MODEL: self._render_fragment(
+                        RESPONSE_KEY.SESSION_MODEL,
+                        SessionModel,
+                        model),
+                RESPONSE_KEY.PAGE_STATE_MODEL: self._render_fragment(
+                        RESPONSE_KEY.PAGE_STATE_MODEL,
+                        PageModel,
+                        {
+                            SQ_DATA.PAGE_NAME: self.PAGE_NAME,
+                            SQ_DATA.PAGE_TYPE: PAGE_TYPE.TAB,
+                        }),
+                RESPONSE_KEY.NEXT_CURSOR: self._get_next_cursor(model),
+                }
+
+        response[RESPONSE_KEY.TIMINGS] = self._timings
+
+        return response
+
+
+    def _render_fragment(self, key, construct, *args):
+        """ Construct and serialize one fragment, timing it under key. """
+        start = time.time()
+        markup = Element.to_string(construct(*args))
+        self._timings[key] = (time.time() - start) * 1000.0
+        return markup
+
+
+    def _construct_content_section(self, model):
+        raise NotImplementedError("MUST OVERRIDE")
+
+
+    def _get_next_cursor(self, model):
+        """ Return the cursor for the feed's next page, or None. """
+        return None
+
+
+class UILeagueDictionary(UITabDictionary):
+
+    """ Render every fragment of an asynchronous League response. """
+
+    PAGE_NAME = PAGE_NAME.LEAGUE
+
+
+    def _construct_content_section(self, model):
+        return LeagueContentSection(
+                model.context,
+                model.aggregations,
+                model.objects,
+                self._current_person,
+                model.next_cursor)
+
+
+    def _get_next_cursor(self, model):
+        return model.next_cursor
 
 
-# TODO: Put the dictionary generation for the handlers here. Once that's done
-# you won't need templates/mobile/components or the UILeagueContent class
-# below. You'll also probably not be using UIModules.
+# TODO: once nothing renders League content through templates, remove
+# templates/mobile/components and the UILeagueContent class below.
 class UILeagueContent(tornado.web.UIModule):
 
     def render(self, model=None, state=None):
-        self._current_person = None
-        for rival in model.rivals:
-            if (rival.id == self.current_user.person_id):
-                self._current_person = rival
+        self._current_person = find_current_person(
+                model,
+                self.current_user.person_id)
 
         xsrf.set_xsrf_token(escape.xhtml_escape(self.handler.xsrf_token))
 
@@ -32,4 +136,5 @@ class UILeagueContent(tornado.web.UIModule):
                 model.context,
                 model.aggregations,
                 model.objects,
-                self._current_person))
+                self._current_person,
+                model.next_cursor))
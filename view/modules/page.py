@@ -10,7 +10,7 @@ Basic Hierarchy:
     |
     ----AppPage
     |   |
-    |   ----TabPage > LeaguePage
+    |   ----TabPage > LeaguePage > StreamedLeaguePage
     |   |
     |   ----DialogPage > CreateGameDialog, InviteFriendsDialog
     |
@@ -27,16 +27,20 @@ Each class has a single requirement...override render.
 import tornado.web
 from tornado import escape
 
+from util.assets import static_url
 from view.constants import PAGE_NAME
 from view.elements import xsrf
 from view.elements.base import Element
+from view.elements.fragment import FragmentTemplate
 from view.app.components import CoverPhoto
 from view.app.tab.framework import TabHeader, TabContentWrapper
+from view.app.tab.story import StoryFactory, StoryParts
 from view.app.tab.league import LeagueContentSection
 from view.app.dialog.framework import DialogContentWrapper
 from view.app.dialog.create_game import CreateGameContentSection
 from view.app.dialog.create_game import CreateGameDialogHeader
 from view.app.page.landing import LandingPage
+from view.modules.dictionary import find_current_person
 
 
 class UIAppPage(tornado.web.UIModule):
@@ -86,14 +90,13 @@ class UITabPage(UIAppPage):
 
 
     def _set_current_person(self, model):
-        self._current_person = None
-        for rival in model.rivals:
-            if (rival.id == self.current_user.person_id):
-                self._current_person = rival
+        self._current_person = find_current_person(
+                model,
+                self.current_user.person_id)
 
 
     def _construct_background(self, model):
-        src = "/static/images/covers/throwPhoto.jpg"
+        src = static_url("images/covers/throwPhoto.jpg")
         return CoverPhoto(src, "Scoreboard")
 
 
@@ -114,7 +117,74 @@ class UILeaguePage(UITabPage):
                 model.context,
                 model.aggregations,
                 model.objects,
-                self._current_person)
+                self._current_person,
+                model.next_cursor)
+
+
+class UIStreamedLeaguePage(UILeaguePage):
+
+    """ League Page UI Module, rendered in pieces so it can be streamed.
+
+    The background doesn't depend on the model and the main header only
+    depends on the League, so both can be sent before the rest of the
+    model is loaded. The content is then rendered a few stories at a
+    time. Joined together, the pieces are the same as render()'s output.
+
+    """
+
+    STORIES_PER_CHUNK = 5
+
+
+    def render_background(self):
+        """ Render the background, which doesn't need a model. """
+        xsrf.set_xsrf_token(escape.xhtml_escape(self.handler.xsrf_token))
+        return Element.to_string(self._construct_background(None))
+
+
+    def render_main_header(self, model):
+        """ Render the main header from a model with its context loaded. """
+        return Element.to_string(self._construct_main_header(model))
+
+
+    def render_content(self, model):
+        """ Yield the content markup, a few stories at a time. """
+        xsrf.set_xsrf_token(escape.xhtml_escape(self.handler.xsrf_token))
+
+        self._set_current_person(model)
+
+        content_wrapper_tree = self._construct_content_wrapper(
+                self._construct_content_section(model))
+
+        template = FragmentTemplate(content_wrapper_tree)
+        for markup in template.stream(lambda key: self._stream_stories(model)):
+            yield markup
+
+
+    def _construct_content_section(self, model):
+        """ Construct the content with a Slot for the feed's stories. """
+        return LeagueContentSection(
+                model.context,
+                model.aggregations,
+                None,
+                self._current_person,
+                model.next_cursor)
+
+
+    def _stream_stories(self, model):
+        """ Yield the markup for the feed's stories, a chunk at a time. """
+        parts = StoryParts(self._current_person)
+        stories = []
+        for object in model.objects:
+            stories.append(Element.to_string(StoryFactory.construct_story(
+                    parts,
+                    object)))
+
+            if len(stories) == self.STORIES_PER_CHUNK:
+                yield "".join(stories)
+                stories = []
+
+        if stories:
+            yield "".join(stories)
 
 
 class UIDialogPage(UIAppPage):
@@ -1,11 +1,20 @@
 """ Module: date
 
-A date utility module that wraps python-dateutil.
+A date utility module for formatting timestamps relative to now.
+
+Relative dates are worked out with integer arithmetic on local wall
+clock seconds, which gives the same years, months, days, hours, minutes
+and seconds as dateutil's relativedelta between datetime.now() and
+datetime.fromtimestamp(ts) without building either datetime.
+
+Use a RelativeDates to format every timestamp in a request against a
+single now.
 
 """
 
-from datetime import datetime
-from dateutil import relativedelta
+import calendar
+import math
+import time
 
 YEAR = "year"
 MONTH = "month"
@@ -16,60 +25,168 @@ MINUTE = "minute"
 SECOND = "second"
 PLURAL = "s"
 
+EPOCH = "epoch"
+
+SECONDS_PER_MINUTE = 60
+SECONDS_PER_HOUR = 60 * SECONDS_PER_MINUTE
+SECONDS_PER_DAY = 24 * SECONDS_PER_HOUR
+MONTHS_PER_YEAR = 12
+
+# formatted labels keyed on (value, unit, is_expanded). values are small,
+# so there are only ever a few hundred of these.
+_labels = {}
+
+
+class RelativeDates(object):
+
+    """ RelativeDates formats timestamps relative to one fixed now.
+
+    Variables:
+    struct_time _now_local  now as a local time tuple
+    float       _now_clock  now as local wall clock seconds
+    dict        _values     (value, unit) pairs keyed on timestamp
+
+    """
+
+
+    def __init__(self, now_ts=None):
+        """ Construct RelativeDates.
+
+        Optional:
+        float   now_ts      the timestamp to format relative to
+
+        """
+        # TODO have this incorporate the User's timezone
+        if now_ts is None:
+            now_ts = time.time()
+
+        (self._now_local, self._now_clock) = _wall_clock(now_ts)
+        self._values = {}
+
+
+    def format_long(self, ts):
+        """ Return the time since a timestamp in longform. """
+        return self._format(ts, True)
+
+
+    def format_short(self, ts):
+        """ Return the time since a timestamp in shortform. """
+        return self._format(ts, False)
+
 
-def current_ts():
-    """ Return the current timestamp. """
-    # TODO have this incorporate the User's timezone
-    return datetime.now()
+    def format_all(self, timestamps, is_expanded=True):
+        """ Return the time since each of a list of timestamps.
 
+        Required:
+        list    timestamps  timestamps to format
 
-def _calculate_relative_delta(datetime_first, datetime_second):
-    """ Return the difference between the two timestamps. """
-    return relativedelta.relativedelta(datetime_first, datetime_second)
+        Optional:
+        bool    is_expanded format in longform rather than shortform
 
+        Return:
+        list                formatted relative dates, in order
 
-def _calculate_relative_datetime(ts):
-    """ Return the difference between the timestamp and today as a value
-    and unit tuple. """
-    rd = _calculate_relative_delta(current_ts(), datetime.fromtimestamp(ts))
+        """
+        return [self._format(ts, is_expanded) for ts in timestamps]
 
-    value = -1
-    unit = "epoch"
 
-    if rd.years > 0:
-        value = rd.years
-        unit = YEAR
-    elif rd.months > 0:
-        value = rd.months
-        unit = MONTH
-    elif rd.days > 0:
-        value = rd.days
-        unit = DAY
-    elif rd.hours > 0:
-        value = rd.hours
-        unit = HOUR
-    elif rd.minutes > 0:
-        value = rd. minutes
-        unit = MINUTE
-    elif rd.seconds > 0:
-        value = rd.seconds
-        unit = SECOND
+    def _format(self, ts, is_expanded):
+        """ Return the time since a timestamp, memoized by bucket. """
+        value_and_unit = self._values.get(ts)
+        if value_and_unit is None:
+            value_and_unit = self._calculate_relative_datetime(ts)
+            self._values[ts] = value_and_unit
 
-    if value > 1:
-        unit = unit + PLURAL
+        (value, unit) = value_and_unit
+        key = (value, unit, is_expanded)
 
-    return (value, unit)
+        label = _labels.get(key)
+        if label is None:
+            if is_expanded:
+                label = "{0} {1} ago".format(value, unit)
+            else:
+                label = "{0}{1}".format(value, unit[0])
+            _labels[key] = label
+
+        return label
+
+
+    def _calculate_relative_datetime(self, ts):
+        """ Return the difference between the timestamp and now as a value
+        and unit tuple. """
+        (then_local, then_clock) = _wall_clock(ts)
+        now_local = self._now_local
+
+        value = -1
+        unit = EPOCH
+
+        if then_clock >= self._now_clock:
+            return (value, unit)
+
+        # count whole calendar months like relativedelta does: step the
+        # months between the two dates, then back off one if adding that
+        # many months to the timestamp overshoots now.
+        months = ((now_local.tm_year - then_local.tm_year) * MONTHS_PER_YEAR
+                + now_local.tm_mon - then_local.tm_mon)
+
+        if months > 0:
+            if _add_months(then_local, then_clock, months) > self._now_clock:
+                months -= 1
+
+        seconds = int(self._now_clock - then_clock)
+
+        if months >= MONTHS_PER_YEAR:
+            value = months // MONTHS_PER_YEAR
+            unit = YEAR
+        elif months > 0:
+            value = months
+            unit = MONTH
+        elif seconds >= SECONDS_PER_DAY:
+            value = seconds // SECONDS_PER_DAY
+            unit = DAY
+        elif seconds >= SECONDS_PER_HOUR:
+            value = seconds // SECONDS_PER_HOUR
+            unit = HOUR
+        elif seconds >= SECONDS_PER_MINUTE:
+            value = seconds // SECONDS_PER_MINUTE
+            unit = MINUTE
+        elif seconds > 0:
+            value = seconds
+            unit = SECOND
+
+        if value > 1:
+            unit = unit + PLURAL
+
+        return (value, unit)
+
+
+def _wall_clock(ts):
+    """ Return a timestamp as a local time tuple and as local wall clock
+    seconds, which compare and subtract like naive local datetimes. """
+    whole_ts = int(math.floor(ts))
+    local = time.localtime(whole_ts)
+    return (local, calendar.timegm(local) + (ts - whole_ts))
+
+
+def _add_months(local, clock, months):
+    """ Return wall clock seconds some months after a local time tuple,
+    clamping the day to the end of a shorter month. """
+    (years, month_index) = divmod(local.tm_mon - 1 + months, MONTHS_PER_YEAR)
+    year = local.tm_year + years
+    month = month_index + 1
+    day = min(local.tm_mday, calendar.monthrange(year, month)[1])
+
+    time_of_day = (clock - calendar.timegm(
+            (local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0)))
+
+    return calendar.timegm((year, month, day, 0, 0, 0)) + time_of_day
 
 
 def format_to_long_relative_datetime(ts):
     """ Return the difference between the timestamp and today in longform. """
-    (value, unit) = _calculate_relative_datetime(ts)
-
-    return "{0} {1} ago".format(value, unit)
+    return RelativeDates().format_long(ts)
 
 
 def format_to_short_relative_datetime(ts):
     """ Return the difference between the timestamp and today in shortform. """
-    (value, unit) = _calculate_relative_datetime(ts)
-
-    return "{0}{1}".format(value, unit[0])
+    return RelativeDates().format_short(ts)